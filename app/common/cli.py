@@ -0,0 +1,29 @@
+from app.common.stats import add_stats_arguments, enable_stats
+from app.common.metrics import add_metrics_arguments, enable_metrics
+from app.common.progress import add_progress_arguments, set_progress_mode
+from app.common.profiling import add_profile_arguments, enable_profiling
+
+
+def add_run_arguments(parser):
+    """
+    Add the options shared by all producer and ingest commands: --stats,
+    --profile, --progress and --metrics-*.
+
+    :param parser: the command parser
+    """
+    add_stats_arguments(parser)
+    add_profile_arguments(parser)
+    add_progress_arguments(parser)
+    add_metrics_arguments(parser)
+
+
+def setup_run(args):
+    """
+    Apply the options added by add_run_arguments.
+
+    :param args: the parsed arguments, as a dict or namespace
+    """
+    enable_stats(args)
+    enable_profiling(args)
+    set_progress_mode(args)
+    enable_metrics(args)
@@ -0,0 +1,197 @@
+import struct
+
+from typing import Iterator, Optional
+
+from app.common.jsonformat import get_json_backend
+from app.common.converters import to_bool, to_int, to_float, to_str
+
+
+# The fallback format: the magic, the length-prefixed json list of column names, then record
+# batches of a row count followed by every column as a length-prefixed json array. A row count
+# of 0 ends the file.
+FALLBACK_MAGIC = b"SSCOLS1\n"
+# Arrow IPC streams start with a continuation marker
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+_LENGTH = struct.Struct("<I")
+_NATIVE_TYPES = (str, int, float, bool, type(None))
+# column value type: (converter, arrow type name)
+_ARROW_TYPES = {
+    int: (to_int, 'int64'),
+    float: (to_float, 'float64'),
+    bool: (to_bool, 'bool_'),
+    str: (to_str, 'string'),
+}
+
+
+def have_pyarrow() -> bool:
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
+def column_value(value):
+    """
+    Get the value stored in a column for an attribute value. Strings, numbers,
+    bools and None are stored as they are, uuids and other values as strings.
+
+    :param value: the attribute value
+    :return: the column value
+    """
+    return value if type(value) in _NATIVE_TYPES else str(value)
+
+
+class ColumnarWriter:
+    """
+    Writes record batches of columns to a binary file.
+
+    The file is an Arrow IPC stream when pyarrow is installed, otherwise a
+    simple length-prefixed format with json encoded columns. read_batches
+    reads both, the Arrow stream only when pyarrow is installed.
+    """
+
+    def __init__(self, file, names: list, use_arrow: Optional[bool] = None, types: Optional[list] = None):
+        """
+        :param file: the binary file to write to
+        :param names: the column names
+        :param use_arrow: write an Arrow IPC stream, by default when pyarrow is installed
+        :param types: the value type of each column, int, float, bool or str, for the Arrow
+                      schema. By default the types are taken from the first batch
+        """
+        self.file = file
+        self.names = list(names)
+        self.types = list(types) if types is not None else None
+        self.use_arrow = have_pyarrow() if use_arrow is None else use_arrow
+        self.rows = 0
+        self._arrow_writer = None
+        self._schema = None
+        if not self.use_arrow:
+            header = get_json_backend(fastest=True).dumpb(self.names)
+            file.write(FALLBACK_MAGIC + _LENGTH.pack(len(header)) + header)
+
+    def write_batch(self, columns: list):
+        """
+        Write a record batch.
+
+        :param columns: the values of each column, in column name order
+        """
+        count = len(columns[0]) if columns else 0
+        if count == 0:
+            return
+        if self.use_arrow:
+            self._write_arrow_batch(columns)
+        else:
+            parts = [_LENGTH.pack(count)]
+            dumpb = get_json_backend(fastest=True).dumpb
+            for column in columns:
+                data = dumpb(column)
+                parts.append(_LENGTH.pack(len(data)))
+                parts.append(data)
+            self.file.write(b"".join(parts))
+        self.rows += count
+
+    def close(self):
+        """
+        End the file. The file itself is left open.
+        """
+        if not self.use_arrow:
+            self.file.write(_LENGTH.pack(0))
+            return
+        if self._arrow_writer is None:
+            self._open_arrow(self.types or [str] * len(self.names))
+        self._arrow_writer.close()
+
+    def _open_arrow(self, types: list):
+        import pyarrow as pa
+        types = [getattr(pa, _ARROW_TYPES[t][1])() if t in _ARROW_TYPES else t for t in types]
+        self._schema = pa.schema(list(zip(self.names, types)))
+        self._arrow_writer = pa.ipc.new_stream(self.file, self._schema)
+
+    def _write_arrow_batch(self, columns: list):
+        import pyarrow as pa
+        if self.types is not None:
+            # values are cast to the column type, e.g. an int discount to a float
+            columns = [[None if value is None else _ARROW_TYPES[t][0](value) for value in column]
+                       for column, t in zip(columns, self.types)]
+        if self._schema is None:
+            if self.types is not None:
+                self._open_arrow(self.types)
+            else:
+                # without types, they are taken from the first batch, columns without values are strings
+                types = [pa.array(column).type for column in columns]
+                self._open_arrow([pa.string() if pa.types.is_null(t) else t for t in types])
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, self._schema)]
+        self._arrow_writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+
+
+class _PrefixedReader:
+    """A file whose first bytes were already read, for pyarrow."""
+
+    def __init__(self, prefix: bytes, file):
+        self._prefix = prefix
+        self._file = file
+        self.closed = False
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._file.read(), b""
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(data) < size:
+            data += self._file.read(size - len(data))
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def close(self):
+        self.closed = True
+
+
+def _read_exactly(file, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError('Columnar file is truncated.')
+    return data
+
+
+def read_batches(file) -> Iterator[tuple]:
+    """
+    Read the record batches of a columnar file, one at a time.
+
+    :param file: the binary file to read from
+    :return: an iterator of (column names, columns) for each record batch
+    """
+    magic = file.read(len(FALLBACK_MAGIC))
+    if magic.startswith(ARROW_STREAM_MAGIC):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError('The file is an Arrow IPC stream, pyarrow is required to read it.')
+        reader = pa.ipc.open_stream(_PrefixedReader(magic, file))
+        names = reader.schema.names
+        for batch in reader:
+            yield names, [column.to_pylist() for column in batch.columns]
+        return
+    if magic != FALLBACK_MAGIC:
+        raise ValueError('Not a columnar data file.')
+
+    loads = get_json_backend(fastest=True).loads
+    (size,) = _LENGTH.unpack(_read_exactly(file, _LENGTH.size))
+    names = loads(_read_exactly(file, size))
+    while True:
+        data = file.read(_LENGTH.size)
+        if not data:
+            raise ValueError('Columnar file is truncated.')
+        (count,) = _LENGTH.unpack(data)
+        if count == 0:
+            return
+        columns = []
+        for _ in names:
+            (size,) = _LENGTH.unpack(_read_exactly(file, _LENGTH.size))
+            columns.append(loads(_read_exactly(file, size)))
+        yield names, columns
@@ -1,2 +1,3 @@
 
 DEFAULT_OUTPUT_LIMIT = 10
+DEFAULT_BATCH_SIZE = 500
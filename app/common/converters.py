@@ -1,7 +1,66 @@
-import distutils
+import uuid
 
-from distutils import util
+
+_TRUE_STRINGS = ('y', 'yes', 't', 'true', 'on', '1')
+_FALSE_STRINGS = ('n', 'no', 'f', 'false', 'off', '0')
+
+# Every spelling is looked up directly, so the common cases never call lower()
+_BOOL_TABLE = {}
+for _string in _TRUE_STRINGS:
+    _BOOL_TABLE.update({_string: True, _string.upper(): True, _string.capitalize(): True})
+for _string in _FALSE_STRINGS:
+    _BOOL_TABLE.update({_string: False, _string.upper(): False, _string.capitalize(): False})
+_BOOL_TABLE.update({True: True, False: False, 1: True, 0: False})
+
+
+def to_bool(value) -> bool:
+    """
+    Convert a value to a bool. Accepts the same strings as the old
+    distutils strtobool (y, yes, t, true, on, 1 and n, no, f, false, off, 0)
+    in any case, as well as bools and 0/1.
+
+    :param value: the value to convert
+    :return: the bool value
+    """
+    try:
+        return _BOOL_TABLE[value]
+    except (KeyError, TypeError):
+        pass
+    try:
+        return _BOOL_TABLE[value.lower()]
+    except (KeyError, AttributeError):
+        raise ValueError(f"invalid truth value {value!r}")
+
+
+def to_int(value) -> int:
+    return value if type(value) is int else int(value)
+
+
+def to_float(value) -> float:
+    return value if type(value) is float else float(value)
+
+
+def to_uuid(value) -> uuid.UUID:
+    return value if type(value) is uuid.UUID else uuid.UUID(value)
+
+
+def to_str(value) -> str:
+    return value if type(value) is str else str(value)
 
 
 def string_to_bool(bool_str: str) -> bool:
-    return bool(distutils.util.strtobool(bool_str))
+    return to_bool(bool_str)
+
+
+def nullable(convert):
+    """
+    Wrap a converter for a column that may be NULL. None and empty strings,
+    e.g. the empty values of a csv file or an empty xml element, stay None.
+
+    :param convert: the converter of the values that are set
+    :return: the converter
+    """
+    def _convert(value):
+        return None if value is None or value == '' else convert(value)
+    _convert.__wrapped__ = convert
+    return _convert
@@ -0,0 +1,195 @@
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from app.db.config import Config
+from app.db.database import Database
+from app.common.formatter import AbstractFormatter
+from app.common.schema import Schema, Field
+from app.common.constants import DEFAULT_BATCH_SIZE
+from app.common.stats import STATS
+from app.common.progress import NULL_PROGRESS, start_progress
+from app.common.fileformat import DATA_FORMATS, resolve_format, split_suffix, file_mode, open_file
+
+
+EXPORT_FORMATS = DATA_FORMATS
+
+
+def export_format(path: str) -> str:
+    """
+    Get the export format of a file from its extension. The file may have a
+    compression extension, e.g. users.csv.gz.
+
+    :param path: the file to export to
+    :return: the format, one of EXPORT_FORMATS
+    """
+    fmt = resolve_format(path).format
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"{fmt} output format not supported.")
+    return fmt
+
+
+def part_paths(path: str, parts: int) -> list:
+    """
+    Get the files of an export split into parts, e.g. users.part1.csv,
+    users.part2.csv for users.csv, or users.part1.csv.gz for users.csv.gz.
+
+    :param path: the file to export to
+    :param parts: the number of parts
+    :return: the part files, or just the file for a single part
+    """
+    if parts == 1:
+        return [path]
+    root, ext = split_suffix(path)
+    return [f"{root}.part{i}{ext}" for i in range(1, parts + 1)]
+
+
+def export_query(db: Database, sql: str, formatter: AbstractFormatter, path: str,
+                 fetch_size: int = DEFAULT_BATCH_SIZE, progress=NULL_PROGRESS, params: tuple = None) -> int:
+    """
+    Stream the rows of a query to a file. Rows are fetched ``fetch_size`` at a
+    time, made into objects by the formatter and written as one chunk.
+
+    :param db: the database to read from
+    :param sql: the query, selecting the formatter fields in order
+    :param formatter: the formatter of the objects
+    :param path: the file to write, in the format of its extension
+    :param fetch_size: the number of rows fetched and written at a time
+    :param progress: updated after every chunk
+    :param params: the parameters of the query
+    :return: the number of rows written
+    """
+    fmt = export_format(path)
+    to_object = formatter.create_object_from_string_fields
+    owns_connection = db.conn is None
+    db.open_connection()
+    try:
+        with db.conn.cursor() as cursor, open_file(path, file_mode(fmt, 'w')) as file, \
+                formatter.writer(fmt, file) as writer:
+            cursor.execute(sql, params)
+            while True:
+                with STATS.timer('export.fetch') as timer:
+                    rows = cursor.fetchmany(fetch_size)
+                    timer.rows = len(rows)
+                if not rows:
+                    break
+                writer.write([to_object(row) for row in rows])
+                progress.update(len(rows))
+            return writer.count
+    finally:
+        if owns_connection:
+            db.close_connection()
+
+
+def key_boundaries(db: Database, table: str, key: Field, parts: int) -> list:
+    """
+    Split the keys of a table into ``parts`` ranges of about the same number
+    of rows. The boundary keys are read in one query, every n-th key in key
+    order.
+
+    :param db: the database to read from
+    :param table: the table name (quoted if needed)
+    :param key: the primary key field of the table
+    :param parts: the number of ranges
+    :return: the first key of every range but the first, in key order, as selected by the key field
+    """
+    total = db.run_query(f"SELECT COUNT(*) FROM {table}")[0][0]
+    step = -(-total // parts)
+    if step == 0:
+        return []
+    sql = f"SELECT {key.select} FROM (SELECT {key.name}, ROW_NUMBER() OVER (ORDER BY {key.name}) AS row_num " \
+          f"FROM {table}) ranked WHERE row_num > 1 AND MOD(row_num - 1, {step}) = 0 ORDER BY row_num"
+    return [row[0] for row in db.run_query(sql)]
+
+
+def range_query(select: str, key: Field, low=None, high=None) -> tuple:
+    """
+    Build a query reading the rows of a key range, in key order.
+
+    :param select: the select statement of the table
+    :param key: the primary key field of the table
+    :param low: the first key of the range, None for no lower bound
+    :param high: the key after the range, None for no upper bound
+    :return: the query and its parameters
+    """
+    conditions = []
+    params = []
+    if low is not None:
+        conditions.append(f"{key.name} >= {key.placeholder}")
+        params.append(low)
+    if high is not None:
+        conditions.append(f"{key.name} < {key.placeholder}")
+        params.append(high)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    return f"{select}{where} ORDER BY {key.name}", tuple(params)
+
+
+def export_table(connect: Callable, schema: Schema, table: str, formatter: AbstractFormatter, path: str,
+                 parts: int = 1, fetch_size: int = DEFAULT_BATCH_SIZE, progress=NULL_PROGRESS,
+                 key: str = 'id') -> dict:
+    """
+    Export a table to a file, or to ``parts`` files written in parallel. Each
+    part holds a range of primary keys, split at boundary keys read once, see
+    key_boundaries, and is read on its own connection. Rows inserted or
+    deleted during the export fall into exactly one range. A table with fewer
+    rows than parts leaves the last files empty.
+
+    :param connect: returns a new Database
+    :param schema: the schema of the table rows
+    :param table: the table name (quoted if needed)
+    :param formatter: the formatter of the objects
+    :param path: the file to write, in the format of its extension
+    :param parts: the number of files to split the export into
+    :param fetch_size: the number of rows fetched and written at a time
+    :param progress: updated with the rows written to all files
+    :param key: the name of the primary key field
+    :return: the number of rows written, by file
+    """
+    if parts < 1:
+        raise ValueError('Parts must be greater than 0.')
+    fmt = export_format(path)
+    select = schema.select_sql(table)
+    if parts == 1:
+        return {path: export_query(connect(), select, formatter, path, fetch_size, progress)}
+
+    key_field = next(field for field in schema.fields if field.name == key)
+    bounds = [None] + key_boundaries(connect(), table, key_field, parts) + [None]
+    ranges = list(zip(bounds, bounds[1:]))
+    paths = part_paths(path, parts)
+
+    def _export(i):
+        if i >= len(ranges):
+            with open_file(paths[i], file_mode(fmt, 'w')) as file, formatter.writer(fmt, file):
+                return 0
+        sql, params = range_query(select, key_field, *ranges[i])
+        return export_query(connect(), sql, formatter, paths[i], fetch_size, progress, params)
+
+    with ThreadPoolExecutor(max_workers=parts) as executor:
+        return dict(zip(paths, executor.map(_export, range(parts))))
+
+
+def run_export(args, schema: Schema, table: str, formatter: AbstractFormatter):
+    """
+    Run an export command.
+
+    :param args: the parsed export arguments, with file, parts, fetch_size and json_backend
+    :param schema: the schema of the table rows
+    :param table: the table name (quoted if needed)
+    :param formatter: the formatter of the objects
+    """
+    try:
+        export_format(args.file)
+    except ValueError as ex:
+        print(ex)
+        sys.exit(1)
+
+    formatter.json_backend = args.json_backend
+    config = Config()
+    _type = formatter.get_object_type().__name__.lower() + 's'
+    progress = start_progress(None, f"{_type} exported")
+    counts = export_table(lambda: Database(config), schema, table, formatter, args.file, parts=args.parts,
+                          fetch_size=args.fetch_size, progress=progress)
+    progress.finish()
+    for path, count in counts.items():
+        print(f"{count} {_type} exported to {path}.")
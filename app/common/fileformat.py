@@ -0,0 +1,100 @@
+import os
+
+from typing import NamedTuple, Optional
+
+
+DATA_FORMATS = ('csv', 'json', 'xml', 'arrow', 'msgpack')
+# formats written to and read from binary files
+BINARY_FORMATS = ('arrow', 'msgpack')
+# extension: compression
+COMPRESSIONS = {
+    'gz': 'gzip',
+    'bz2': 'bz2',
+    'xz': 'lzma',
+    'zst': 'zstd',
+}
+
+
+class FileFormat(NamedTuple):
+    """
+    The format of a data file, e.g. ('csv', 'gzip') for users.csv.gz.
+
+    format - the data format, the extension before any compression extension
+    compression - one of COMPRESSIONS, None for an uncompressed file
+    suffix - the format and compression extensions, e.g. '.csv.gz'
+    """
+    format: str
+    compression: Optional[str]
+    suffix: str
+
+
+def resolve_format(path: str) -> FileFormat:
+    """
+    Get the data format and the compression of a file from its extensions.
+    Extensions are not case sensitive.
+
+    :param path: the file
+    :return: the file format. The format is '' for a file without extension
+    """
+    parts = os.path.basename(path).split('.')[1:]
+    if not parts:
+        return FileFormat('', None, '')
+    compression = COMPRESSIONS.get(parts[-1].lower())
+    if compression is not None and len(parts) > 1:
+        return FileFormat(parts[-2].lower(), compression, '.' + '.'.join(parts[-2:]))
+    return FileFormat(parts[-1].lower(), None, '.' + parts[-1])
+
+
+def split_suffix(path: str) -> tuple:
+    """
+    Split the format and compression extensions off a path, e.g. ('out/users', '.csv.gz').
+
+    :param path: the file
+    :return: the path without the extensions, and the extensions
+    """
+    suffix = resolve_format(path).suffix
+    return path[:len(path) - len(suffix)], suffix
+
+
+def file_mode(fmt: str, mode: str = 'r') -> str:
+    """
+    Get the mode to open a file of a data format with.
+
+    :param fmt: the data format
+    :param mode: 'r', 'w' or 'a'
+    :return: the mode, binary for BINARY_FORMATS
+    """
+    return mode + 'b' if fmt in BINARY_FORMATS else mode
+
+
+def open_file(path: str, mode: str = 'r', newline: str = None, encoding: str = None):
+    """
+    Open a data file, compressed or not. Compressed files are streamed through
+    the decompressor or compressor, they are never expanded to a temporary file.
+    zstd needs the zstandard package.
+
+    :param path: the file
+    :param mode: 'r', 'w' or 'a', followed by 'b' for a binary file
+    :param newline: the newline mode of a text file, as for open
+    :param encoding: the encoding of a text file, as for open
+    :return: the file object
+    """
+    compression = resolve_format(path).compression
+    if compression is None:
+        return open(path, mode, newline=newline, encoding=encoding)
+
+    binary = 'b' in mode
+    mode = mode.replace('b', '').replace('t', '')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"zstandard is required to read and write {path}. pip install zstandard")
+        if binary:
+            return zstandard.open(path, mode + 'b')
+        return zstandard.open(path, mode, newline=newline, encoding=encoding)
+
+    module = __import__(compression)
+    if binary:
+        return module.open(path, mode + 'b')
+    return module.open(path, mode + 't', newline=newline, encoding=encoding)
@@ -1,12 +1,20 @@
+import io
 import os
+import csv
 import json
+import operator
 import functools
-import xml.etree.ElementTree as ET
-
-from xml.dom import minidom
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Type, SupportsAbs
+from typing import TypeVar, Generic, Type, SupportsAbs, Optional
 from app.common.exceptions import MissingAttributeException
+from app.common.stats import timed
+from app.common.columnar import ColumnarWriter, column_value, read_batches
+from app.common.records import RecordWriter, read_records
+from app.common.xmlformat import XmlWriter, iter_elements
+from app.common.schema import RequiredFields
+from app.common.jsonformat import get_json_backend
+from app.common.fileformat import open_file
+from app.common.parallel import iter_csv_rows
 
 
 T = TypeVar('T')
@@ -14,7 +22,28 @@ JE = TypeVar('JE', bound=SupportsAbs[json.JSONEncoder])
 JD = TypeVar('JD', bound=SupportsAbs[json.JSONDecoder])
 
 
+class CsvDialect(csv.Dialect):
+    """
+    The csv dialect of the data files: comma separated, values quoted only when
+    they contain a comma, a quote or a line break, rows ending with os.linesep.
+    """
+    delimiter = ','
+    quotechar = '"'
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = os.linesep
+    quoting = csv.QUOTE_MINIMAL
+
+
 class AbstractFormatter(Generic[T], ABC):
+    # the csv dialect, a csv.Dialect subclass or the name of a registered dialect
+    csv_dialect = CsvDialect
+    # the json backend, one of JSON_BACKENDS. None writes with the json backend and
+    # reads with the fastest one installed
+    json_backend = None
+    # the Schema of the objects, if they are created from schema converted fields. Lets
+    # read_csv_file convert rows in worker processes and create the objects in this one
+    schema = None
 
     def pretty(self, item: T) -> str:
         """
@@ -46,37 +75,54 @@ class AbstractFormatter(Generic[T], ABC):
             short_str += f"{attr[0:2]}: {val_str[0:val_len]}{'...' if len(val_str) > val_len else ''}, "
         return short_str[0:-2]
 
-    def to_json(self, items: list[T]):
+    @timed('format.to_json', count_arg=1)
+    def to_json(self, items: list[T], compact: bool = False) -> str:
         """
-        Get formatted json string from list of objects.
+        Get formatted json string from list of objects. Objects are encoded as
+        their attribute dicts, by the json backend.
 
         :param items: the objects to format
+        :param compact: leave out the indentation and line breaks
         :return: the formatted json string
         """
-        return json.dumps(items, indent=4, cls=self.get_json_encoder())
+        return get_json_backend(self.json_backend).dumps(items, pretty=not compact,
+                                                         encoder=self.get_json_encoder())
 
     @abstractmethod
     def get_json_encoder(self) -> Type[JE]:
         """
-        Get the JSONEncoder for the type.
+        Get the JSONEncoder for the type. The orjson backend uses only its default method.
 
         :return: the JSONEncoder
         """
         pass
 
+    @timed('format.from_json')
     def from_json(self, json_str) -> list[T]:
         """
-        Convert a json array of objects into a list of objects.
+        Convert a json array of objects into a list of objects. The array is
+        decoded by the json backend, every object is checked for all attributes
+        before any is created.
 
-        :param json_str: the json string to convert
+        :param json_str: the json string or bytes to convert
         :return: the list of objects
         """
-        return json.loads(json_str, cls=self.get_json_decoder())
+        data = get_json_backend(self.json_backend, fastest=True).loads(json_str)
+        if type(data) is not list or not all(type(entry) is dict for entry in data):
+            return json.loads(json_str, cls=self.get_json_decoder())
+        fields = RequiredFields(self.get_attr_list())
+        for entry in data:
+            name = fields.missing(entry)
+            if name is not None:
+                raise MissingAttributeException(f"'{name}'")
+        create = self.create_object_from_string_dict
+        return [create(entry) for entry in data]
 
     @abstractmethod
     def get_json_decoder(self) -> Type[JD]:
         """
-        Get the JSONDecoder for the type.
+        Get the JSONDecoder for the type, used for json documents that are not
+        an array of objects.
 
         :return: the JSONDecoder
         """
@@ -97,40 +143,134 @@ class AbstractFormatter(Generic[T], ABC):
         except KeyError:
             raise MissingAttributeException(f"'{name}'")
 
-    def to_csv(self, items: list[T]) -> str:
+    @timed('format.to_csv', count_arg=1)
+    def to_csv(self, items: list[T], header: bool = False, dialect=None) -> str:
         """
-        Get formatted json string from a list of objects.
+        Get a csv string from a list of objects. Rows are separated by the line
+        terminator of the dialect, the last row is not terminated.
 
         :param items: the list of objects to format
-        :return: the formatted json string
+        :param header: start with a row of the attribute names
+        :param dialect: the csv dialect, csv_dialect by default
+        :return: the csv string
         """
-        csv_str = ""
-        for item in items:
-            _dict = vars(item)
-            for attr in self.get_attr_list():
-                csv_str += f"{_dict[attr]},"
-            csv_str = csv_str[0:-1] + os.linesep
-        return csv_str[0:-1]
-
-    def from_csv(self, csv_str) -> list[T]:
+        dialect = dialect or self.csv_dialect
+        file = io.StringIO(newline='')
+        self.write_csv(items, file, header=header, dialect=dialect)
+        csv_str = file.getvalue()
+        terminator = (csv.get_dialect(dialect) if isinstance(dialect, str) else dialect).lineterminator
+        return csv_str[:len(csv_str) - len(terminator)] if csv_str else csv_str
+
+    @timed('format.from_csv')
+    def from_csv(self, csv_str: str, header: bool = False, dialect=None) -> list[T]:
         """
         Convert a csv string into a list of objects.
 
         :param csv_str: the csv string to convert
+        :param header: the first row holds the attribute names, in any order
+        :param dialect: the csv dialect, csv_dialect by default
+        :return: the list of objects
+        """
+        return self.read_csv(io.StringIO(csv_str, newline=''), header=header, dialect=dialect)
+
+    def write_csv(self, items: list[T], file, header: bool = False, dialect=None):
+        """
+        Write objects to a csv file, a row per object. None values are written
+        as empty values.
+
+        :param items: the objects to write
+        :param file: the text file to write to, opened with newline=''
+        :param header: start with a row of the attribute names
+        :param dialect: the csv dialect, csv_dialect by default
+        """
+        attrs = self.get_attr_list()
+        writer = csv.writer(file, dialect or self.csv_dialect)
+        if header:
+            writer.writerow(attrs)
+        if len(attrs) == 1:
+            writer.writerows([getattr(item, attrs[0])] for item in items)
+        else:
+            writer.writerows(map(operator.attrgetter(*attrs), items))
+
+    def read_csv(self, file, header: bool = False, dialect=None) -> list[T]:
+        """
+        Read the objects of a csv file. Blank lines are skipped.
+
+        :param file: the text file to read from, opened with newline=''
+        :param header: the first row holds the attribute names, in any order. Other columns are ignored
+        :param dialect: the csv dialect, csv_dialect by default
         :return: the list of objects
         """
+        rows = csv.reader(file, dialect or self.csv_dialect)
+        positions = self._csv_positions(next(rows, [])) if header else None
+        if positions is not None:
+            convert = _CsvRowConverter(self, positions)
+            return [item for item in map(convert, rows) if item is not None]
+
+        # rows in attribute order are checked inline, this is the loop large files spend their time in
+        create = self.create_object_from_string_fields
+        num_attrs = len(self.get_attr_list())
         items = []
-        for line in csv_str.split(os.linesep):
-            if not line.strip():
-                continue
-            fields = line.split(',')
-            num_attrs = len(self.get_attr_list())
-            if len(fields) != num_attrs:
+        append = items.append
+        for row in rows:
+            if len(row) != num_attrs:
+                if not row or (len(row) == 1 and not row[0].strip()):
+                    continue
                 raise IndexError('Incorrect number of fields.')
-            item = self.create_object_from_string_fields(fields)
-            items.append(item)
+            append(create(row))
         return items
 
+    def _csv_positions(self, names: list):
+        """
+        :param names: the column names of a csv header
+        :return: the column of each attribute, None when the columns are in attribute order
+        """
+        attrs = self.get_attr_list()
+        for attr in attrs:
+            if attr not in names:
+                raise MissingAttributeException(f"'{attr}'")
+        if list(names) == list(attrs):
+            return None
+        return [names.index(attr) for attr in attrs]
+
+    @timed('format.read_csv_file')
+    def read_csv_file(self, path: str, workers: int = 1, header: bool = False) -> list[T]:
+        """
+        Read the objects of a csv file. With more than one worker and a schema, a
+        large file is split at line boundaries and the rows of the parts are
+        converted in a pool of processes, to compact values the objects are
+        created from in this process, see iter_csv_rows.
+
+        :param path: the csv file, optionally compressed
+        :param workers: the number of processes to parse the file with
+        :param header: the first row holds the attribute names, in any order
+        :return: the list of objects, in file order
+        """
+        if workers <= 1 or self.schema is None:
+            with open_file(path, newline='') as file:
+                return self.read_csv(file, header=header)
+        start = 0
+        positions = None
+        if header:
+            with open_file(path, 'rb') as file:
+                line = file.readline()
+            start = len(line)
+            positions = self._csv_positions(next(csv.reader([line.decode('utf-8')], self.csv_dialect), []))
+        rows = iter_csv_rows(path, _CsvRowConverter(self, positions, compact=True), workers, start,
+                             dialect=self.csv_dialect)
+        create = self.create_object_from_values
+        return [create(values) for values in rows if values is not None]
+
+    def create_object_from_values(self, values: tuple) -> T:
+        """
+        Create an object from the compact converted values of its schema, see
+        Schema.convert_compact.
+
+        :param values: the compact values, in attribute order
+        :return: the object
+        """
+        return self.get_object_type()(*self.schema.expand_compact(values))
+
     @abstractmethod
     def get_attr_list(self):
         """
@@ -161,29 +301,58 @@ class AbstractFormatter(Generic[T], ABC):
         """
         pass
 
-    def to_xml(self, items: list[T]):
+    @timed('format.to_xml', count_arg=1)
+    def to_xml(self, items: list[T], pretty: bool = True) -> str:
         """
         Format a list of objects into an xml string.
 
         :param items: the list of objects
+        :param pretty: indent the elements and put each on a line
         :return: the formatted xml string
         """
+        file = io.StringIO()
+        self.write_xml(items, file, pretty=pretty)
+        return file.getvalue()
+
+    def write_xml(self, items: list[T], file, pretty: bool = True):
+        """
+        Write objects to an xml file, an element per object.
+
+        :param items: the objects to write
+        :param file: the text file to write to
+        :param pretty: indent the elements and put each on a line
+        """
+        writer = self.xml_writer(file, pretty=pretty)
+        writer.write(self.to_xml_rows(items))
+        writer.close()
+
+    def xml_writer(self, file, pretty: bool = True) -> XmlWriter:
+        """
+        Get a writer for xml files of this type, e.g. a <users> root with a <user> element per object.
+
+        :param file: the text file to write to
+        :param pretty: indent the elements and put each on a line
+        :return: the xml writer
+        """
         _type = self.get_object_type().__name__.lower()
-        doc = minidom.Document()
-        root = doc.createElement(_type + 's')
-        doc.appendChild(root)
+        return XmlWriter(file, _type + 's', _type, self.get_attr_list(), pretty=pretty)
 
+    def to_xml_rows(self, items: list[T]) -> list:
+        """
+        Get the attribute values of objects for an xml writer.
+
+        :param items: the objects
+        :return: the attribute values of each object, in attribute list order
+        """
+        attrs = self.get_attr_list()
+        rows = []
         for item in items:
             _dict = vars(item)
-            el = doc.createElement(_type)
-            for attr in self.get_attr_list():
-                child_el = doc.createElement(attr)
-                val = self.get_attr_or_throw(_dict, attr)
-                child_el.appendChild(doc.createTextNode(str(val)))
-                el.appendChild(child_el)
-            root.appendChild(el)
-
-        return doc.toprettyxml().replace('\t', ' ' * 4)[0:-1]
+            try:
+                rows.append([_dict[attr] for attr in attrs])
+            except KeyError as ex:
+                raise MissingAttributeException(f"'{ex.args[0]}'")
+        return rows
 
     def from_xml(self, xml_str: str) -> list[T]:
         """
@@ -192,24 +361,27 @@ class AbstractFormatter(Generic[T], ABC):
         :param xml_str: the xml string to convert
         :return: the list of objects
         """
-        def _find_or_throw(_item, _name: str):
-            el = _item.find(_name)
-            if el is None:
-                raise MissingAttributeException(f"'{_name}'")
-            return el.text
-
-        _type = self.get_object_type().__name__.lower()
-        tree = ET.fromstring(xml_str)
-        items = []
+        return self.read_xml(io.StringIO(xml_str))
 
-        for item in tree.findall(f"./{_type}"):
-            _dict = {}
-            attr_names = self.get_attr_list()
-            for name in attr_names:
-                _dict[name] = _find_or_throw(item, name)
-            items.append(self.create_object_from_string_dict(_dict))
+    @timed('format.from_xml')
+    def read_xml(self, file) -> list[T]:
+        """
+        Read the objects of an xml file in a single streaming pass. The children
+        of each element are read into a dict at once, the whole file is read
+        before the dicts are checked against the attribute list, so a malformed
+        file fails with a ParseError. Elements with other tags are ignored.
 
-        return items
+        :param file: the xml file to read from, binary or text
+        :return: the list of objects
+        """
+        entries = list(iter_elements(file, self.get_object_type().__name__.lower()))
+        fields = RequiredFields(self.get_attr_list())
+        for values in entries:
+            name = fields.missing(values)
+            if name is not None:
+                raise MissingAttributeException(f"'{name}'")
+        create = self.create_object_from_string_dict
+        return [create(values) for values in entries]
 
     @abstractmethod
     def create_object_from_string_dict(self, _dict) -> T:
@@ -221,6 +393,248 @@ class AbstractFormatter(Generic[T], ABC):
         """
         pass
 
+    @timed('format.to_columns', count_arg=1)
+    def to_columns(self, items: list[T]) -> list:
+        """
+        Get the columns of a list of objects, for the columnar format.
+
+        :param items: the objects
+        :return: the values of each attribute, in attribute list order
+        """
+        return [[column_value(getattr(item, attr)) for item in items] for attr in self.get_attr_list()]
+
+    def column_types(self) -> Optional[list]:
+        """
+        Get the value type of each attribute in the columnar format, from the
+        formatter's schema.
+
+        :return: int, float, bool or str for each attribute, in attribute list order. None without a schema
+        """
+        if self.schema is None:
+            return None
+        types = self.schema.column_types()
+        return [types.get(attr, str) for attr in self.get_attr_list()]
+
+    @timed('format.from_columns')
+    def from_columns(self, columns: list) -> list[T]:
+        """
+        Create objects from columns, in attribute list order. Column values
+        are converted like string fields, values that already have the
+        attribute type are used as they are.
+
+        :param columns: the values of each attribute
+        :return: the list of objects
+        """
+        return [self.create_object_from_string_fields(list(row)) for row in zip(*columns)]
+
+    def read_columnar(self, file) -> list[T]:
+        """
+        Read the objects of a columnar file, one record batch at a time. The
+        columns may be in any order, columns that are not attributes are ignored.
+
+        :param file: the binary file to read from
+        :return: the list of objects
+        """
+        attrs = self.get_attr_list()
+        items = []
+        for names, columns in read_batches(file):
+            for attr in attrs:
+                if attr not in names:
+                    raise MissingAttributeException(f"'{attr}'")
+            by_name = dict(zip(names, columns))
+            items += self.from_columns([by_name[attr] for attr in attrs])
+        return items
+
+    @timed('format.to_records', count_arg=1)
+    def to_records(self, items: list[T]) -> list:
+        """
+        Get the records of a list of objects, for the msgpack record format.
+
+        :param items: the objects
+        :return: the attribute values of each object, in attribute list order
+        """
+        attrs = self.get_attr_list()
+        return [[column_value(getattr(item, attr)) for attr in attrs] for item in items]
+
+    @timed('format.from_records')
+    def read_records(self, file) -> list[T]:
+        """
+        Read the objects of a msgpack record file, one record at a time. The
+        fields may be in any order, fields that are not attributes are ignored.
+
+        :param file: the binary file to read from
+        :return: the list of objects
+        """
+        records = read_records(file)
+        names = next(records, None)
+        if names is None:
+            raise ValueError('Record file is empty.')
+        attrs = self.get_attr_list()
+        for attr in attrs:
+            if attr not in names:
+                raise MissingAttributeException(f"'{attr}'")
+        create = self.create_object_from_string_fields
+        if list(names) == list(attrs):
+            return [create(values) for values in records]
+        positions = [names.index(attr) for attr in attrs]
+        return [create([values[i] for i in positions]) for values in records]
+
+    def read(self, fmt: str, file) -> list[T]:
+        """
+        Read all the objects of a file.
+
+        :param fmt: the format, csv, json, xml, arrow or msgpack
+        :param file: the text file to read from, a binary file for arrow and msgpack
+        :return: the list of objects
+        """
+        if fmt == 'arrow':
+            return self.read_columnar(file)
+        if fmt == 'msgpack':
+            return self.read_records(file)
+        if fmt == 'csv':
+            return self.read_csv(file)
+        if fmt == 'xml':
+            return self.read_xml(file)
+        readers = {'json': self.from_json}
+        if fmt not in readers:
+            raise ValueError(f"{fmt} input format not supported.")
+        return readers[fmt](file.read())
+
+    def writer(self, fmt: str, file) -> 'ChunkWriter':
+        """
+        Get a writer formatting objects to a file in chunks.
+
+        :param fmt: the format, csv, json, xml, arrow or msgpack
+        :param file: the text file to write to, a binary file for arrow and msgpack
+        :return: the chunk writer
+        """
+        return ChunkWriter(self, fmt, file)
+
+
+class _CsvRowConverter:
+    """
+    Converts csv rows to objects, or to compact values in worker processes.
+    Returns None for blank lines.
+    """
+
+    def __init__(self, formatter: AbstractFormatter, positions: list = None, compact: bool = False):
+        """
+        :param formatter: the formatter creating the objects
+        :param positions: the column of each attribute, None when the columns are in attribute order
+        :param compact: return the compact values of the formatter's schema instead of objects
+        """
+        self.formatter = formatter
+        self.positions = positions
+        self.compact = compact
+        self.num_attrs = len(formatter.get_attr_list())
+
+    def __call__(self, row: list):
+        if not row or (len(row) == 1 and not row[0].strip()):
+            return None
+        if self.positions is not None:
+            if len(row) <= max(self.positions):
+                raise IndexError('Incorrect number of fields.')
+            row = [row[i] for i in self.positions]
+        elif len(row) != self.num_attrs:
+            raise IndexError('Incorrect number of fields.')
+        if self.compact:
+            return self.formatter.schema.convert_compact(row)
+        return self.formatter.create_object_from_string_fields(row)
+
+
+class ChunkWriter:
+    """
+    Writes objects to a file in chunks with the to_csv and to_json of a
+    formatter, or its xml writer, so only one chunk is held in memory. The
+    file is the same as when all the objects are formatted at once. In the
+    columnar arrow format, every chunk is a record batch, in the msgpack
+    format every object is a record.
+
+    usage:
+
+        with formatter.writer('json', file) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, formatter: AbstractFormatter, fmt: str, file):
+        """
+        :param formatter: the formatter of the objects
+        :param fmt: the format, csv, json, xml, arrow or msgpack
+        :param file: the text file to write to, a binary file for arrow and msgpack
+        """
+        # format: (format function, document head, document tail, chunk separator)
+        formats = {
+            'csv': (formatter.to_csv, '', '', os.linesep),
+            'json': (formatter.to_json, '[\n', '\n]', ',\n'),
+        }
+        if fmt not in formats and fmt not in ('xml', 'arrow', 'msgpack'):
+            raise ValueError(f"{fmt} output format not supported.")
+        self.formatter = formatter
+        self.fmt = fmt
+        self.file = file
+        self.count = 0
+        self._columnar = None
+        self._records = None
+        self._xml = None
+        if fmt == 'xml':
+            self._xml = formatter.xml_writer(file)
+        elif fmt == 'arrow':
+            self._columnar = ColumnarWriter(file, formatter.get_attr_list(), types=formatter.column_types())
+        elif fmt == 'msgpack':
+            self._records = RecordWriter(file, formatter.get_attr_list())
+        else:
+            self._format, self._head, self._tail, self._separator = formats[fmt]
+
+    def write(self, items: list):
+        """
+        Format a chunk of objects and write it.
+
+        :param items: the objects to write
+        """
+        if not items:
+            return
+        if self._columnar is not None:
+            self._columnar.write_batch(self.formatter.to_columns(items))
+            self.count += len(items)
+            return
+        if self._records is not None:
+            self._records.write(self.formatter.to_records(items))
+            self.count += len(items)
+            return
+        if self._xml is not None:
+            self._xml.write(self.formatter.to_xml_rows(items))
+            self.count += len(items)
+            return
+        # a formatted chunk is a whole document, only the items between its head and tail are kept
+        text = self._format(items)
+        body = text[len(self._head):len(text) - len(self._tail)]
+        self.file.write((self._separator if self.count else self._head) + body)
+        self.count += len(items)
+
+    def close(self):
+        """
+        Finish the document. The file itself is left open.
+        """
+        if self._records is not None:
+            # a record file has no end marker
+            return
+        if self._columnar is not None:
+            self._columnar.close()
+        elif self._xml is not None:
+            self._xml.close()
+        elif self.count:
+            self.file.write(self._tail)
+        else:
+            self.file.write(self._format([]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+
 
 # if __name__ == '__main__':
 #     from app.items.model import Order
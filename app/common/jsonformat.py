@@ -0,0 +1,131 @@
+import json
+
+from typing import Optional
+
+
+def json_default(obj):
+    """
+    Encode a value json does not support: objects as their attribute dict,
+    anything else, e.g. uuids, as a string.
+    """
+    return vars(obj) if hasattr(obj, '__dict__') else str(obj)
+
+
+class JsonBackend:
+    """
+    Encodes and decodes json with the standard library json module.
+    """
+    name = 'json'
+
+    def dumps(self, obj, pretty: bool = False, default=json_default, encoder=None) -> str:
+        """
+        Encode a value.
+
+        :param obj: the value to encode
+        :param pretty: indent the output, 4 spaces per level, instead of compact output
+        :param default: encodes the values json does not support
+        :param encoder: a JSONEncoder class used instead of default
+        :return: the json string
+        """
+        if encoder is not None:
+            default = None
+        if pretty:
+            return json.dumps(obj, indent=4, default=default, cls=encoder)
+        return json.dumps(obj, separators=(',', ':'), default=default, cls=encoder)
+
+    def dumpb(self, obj) -> bytes:
+        """
+        Encode a value of json types as compact UTF-8 json.
+
+        :param obj: the value to encode
+        :return: the json bytes
+        """
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data):
+        """
+        Decode a json document.
+
+        :param data: the json string or bytes
+        :return: the decoded value
+        """
+        return json.loads(data)
+
+
+class OrjsonBackend(JsonBackend):
+    """
+    Encodes and decodes json with orjson. uuids, dataclasses and dicts are
+    encoded natively, other objects through default. Pretty output is
+    indented with 2 spaces, non-ASCII characters are written as UTF-8, so
+    the output differs from the json backend's.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj, pretty: bool = False, default=json_default, encoder=None) -> str:
+        if encoder is not None:
+            default = _encoder_default(encoder)
+        option = self._orjson.OPT_INDENT_2 if pretty else 0
+        return self._orjson.dumps(obj, default=default, option=option).decode('utf-8')
+
+    def dumpb(self, obj) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+def _encoder_default(encoder):
+    """
+    Get the default method of a JSONEncoder class, for a backend that cannot
+    use the class itself.
+
+    :param encoder: the JSONEncoder class
+    :return: the bound default method of an encoder instance
+    :raise ValueError: if the encoder overrides more than default
+    """
+    if encoder.encode is not json.JSONEncoder.encode or encoder.iterencode is not json.JSONEncoder.iterencode:
+        raise ValueError(f"{encoder.__name__} overrides the encoding, it can only be used by the json backend.")
+    return encoder().default
+
+
+# name: backend class, in order of speed
+JSON_BACKENDS = {
+    'orjson': OrjsonBackend,
+    'json': JsonBackend,
+}
+_backends = {}
+
+
+def get_json_backend(name: Optional[str] = None, fastest: bool = False) -> JsonBackend:
+    """
+    Get a json backend. Backends are created once. The json backend is used
+    by default, so formatted output does not depend on the installed packages.
+
+    :param name: one of JSON_BACKENDS
+    :param fastest: without a name, use the first installed backend instead of the json
+                    backend, for decoding and for data only read back by this program
+    :return: the backend
+    """
+    if name is not None and name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown json backend {name}, use one of {', '.join(JSON_BACKENDS)}.")
+    if name is None and not fastest:
+        name = 'json'
+    for backend_name in ([name] if name is not None else JSON_BACKENDS):
+        if backend_name not in _backends:
+            try:
+                _backends[backend_name] = JSON_BACKENDS[backend_name]()
+            except ImportError:
+                if name is not None:
+                    raise
+                continue
+        return _backends[backend_name]
+
+
+def add_json_backend_argument(parser):
+    parser.add_argument('--json-backend', choices=list(JSON_BACKENDS),
+                        help='library JSON files are written with. default json, orjson is faster but indents '
+                             'with 2 spaces and writes non-ASCII characters as UTF-8')
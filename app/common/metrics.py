@@ -0,0 +1,245 @@
+import os
+import math
+import atexit
+import threading
+
+from typing import Callable
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_TEXTFILE_INTERVAL = 10.0
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    type = ''
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def samples(self) -> list:
+        """
+        :return: (name, labels, value) tuples in the text exposition format
+        """
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in sorted(self._values.items())]
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> list:
+        return [(name, _format_labels(labels), value) for name, labels, value in super().samples()]
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._function = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def set_function(self, function: Callable):
+        """
+        Compute the gauge when it is collected.
+
+        :param function: returns the current value
+        """
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> list:
+        if self._function is not None:
+            return [(self.name, '', self._function())]
+        return [(name, _format_labels(labels), value) for name, labels, value in super().samples()]
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[0][i] += 1
+                    break
+            data[1] += value
+            data[2] += 1
+
+    def count(self, **labels) -> int:
+        data = self._values.get(tuple(sorted(labels.items())))
+        return data[2] if data else 0
+
+    def samples(self) -> list:
+        samples = []
+        for _, labels, (counts, total, count) in super().samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", _format_labels(labels, f'le="{_format_value(bound)}"'),
+                                cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(labels), total))
+            samples.append((f"{self.name}_count", _format_labels(labels), count))
+        return samples
+
+
+class Registry:
+    """A set of metrics, exposed in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def expose(self) -> str:
+        return '\n'.join(metric.expose() for metric in self.metrics.values()) + '\n'
+
+
+REGISTRY = Registry()
+
+ROWS_GENERATED = REGISTRY.register(Counter('producer_rows_generated_total', 'Rows generated, by entity.'))
+ROWS_WRITTEN = REGISTRY.register(Counter('producer_rows_written_total', 'Rows written to the database, by table.'))
+ROWS_REJECTED = REGISTRY.register(Counter('producer_rows_rejected_total', 'Rows rejected, by reason.'))
+BATCH_SECONDS = REGISTRY.register(Histogram('producer_batch_seconds',
+                                            'Time to execute and commit a batch, by table.'))
+OPEN_CONNECTIONS = REGISTRY.register(Gauge('producer_db_open_connections', 'Open database connections.'))
+
+
+def start_http_server(port: int, addr: str = '127.0.0.1', registry: Registry = REGISTRY):
+    """
+    Serve the metrics on http://addr:port/metrics from a daemon thread.
+
+    :param port: the port to listen on, 0 for any free port
+    :param addr: the address to listen on
+    :param registry: the metrics to serve
+    :return: the server
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.expose().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    return server
+
+
+class TextfileExporter:
+    """
+    Writes the metrics to a file every ``interval`` seconds, for the node
+    exporter textfile collector. The file is replaced atomically.
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_TEXTFILE_INTERVAL, registry: Registry = REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-textfile', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def write(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            file.write(self.registry.expose())
+        os.replace(tmp_path, self.path)
+
+    def stop(self):
+        self._stopped.set()
+        self.write()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running')
+    parser.add_argument('--metrics-file', type=str, metavar='FILE',
+                        help='write Prometheus metrics to FILE every 10 seconds and at exit')
+
+
+def enable_metrics(args):
+    """
+    Start the metrics endpoint and/or textfile exporter requested by
+    --metrics-port and --metrics-file.
+
+    :param args: the parsed arguments, as a dict or namespace
+    """
+    if not isinstance(args, dict):
+        args = vars(args)
+    if args.get('metrics_port') is not None:
+        start_http_server(args['metrics_port'])
+    if args.get('metrics_file'):
+        exporter = TextfileExporter(args['metrics_file'])
+        exporter.start()
+        atexit.register(exporter.stop)
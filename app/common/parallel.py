@@ -0,0 +1,155 @@
+import io
+import os
+import csv
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator
+
+from app.common.fileformat import resolve_format, open_file
+
+
+# ranges smaller than this are not worth a process
+MIN_RANGE_BYTES = 1 << 20
+# ranges per worker, so results can be used while the other ranges are converted
+RANGES_PER_WORKER = 4
+
+
+def split_ranges(path: str, parts: int, start: int = 0, min_size: int = None) -> list:
+    """
+    Split a file into byte ranges that start and end at line boundaries.
+
+    A line break inside a quoted value is taken for a line boundary, the
+    ranges of such a file are detected when they are read, see read_range.
+
+    :param path: the file to split
+    :param parts: the maximum number of ranges
+    :param start: the offset of the first range, e.g. after a header line
+    :param min_size: the minimum size of a range, MIN_RANGE_BYTES by default
+    :return: the (start, end) offsets of the ranges, in file order
+    """
+    size = os.path.getsize(path)
+    min_size = min_size or MIN_RANGE_BYTES
+    parts = max(1, min(parts, (size - start) // min_size))
+    step = (size - start) // parts
+    origin = start
+    ranges = []
+    with open(path, 'rb') as file:
+        for i in range(1, parts):
+            file.seek(max(origin + i * step - 1, start))
+            # the range ends after the line the boundary falls in
+            file.readline()
+            end = file.tell()
+            if end >= size:
+                break
+            if end > start:
+                ranges.append((start, end))
+                start = end
+    ranges.append((start, size))
+    return ranges
+
+
+class RangeSplitError(Exception):
+    """
+    A range was not split at a row boundary, the file has quoted values with
+    line breaks.
+    """
+
+
+def read_range(path: str, start: int, end: int, encoding: str = 'utf-8', dialect='excel') -> list:
+    """
+    Read the csv rows in a byte range of a file. The rows are read strictly
+    and each row must be a single line, so a range cut inside a quoted value
+    is detected rather than read as wrong rows.
+
+    :param path: the csv file
+    :param start: the offset of the first line
+    :param end: the offset after the last line
+    :param encoding: the encoding of the file
+    :param dialect: the csv dialect
+    :return: the rows
+    :raises RangeSplitError: when a row spans several lines, or the range ends inside a quoted value
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    reader = csv.reader(io.StringIO(data.decode(encoding), newline=''), dialect, strict=True)
+    rows = []
+    try:
+        for row in reader:
+            rows.append(row)
+            if reader.line_num != len(rows):
+                raise RangeSplitError(f"Row {len(rows)} of range {start}-{end} spans several lines.")
+    except csv.Error as ex:
+        raise RangeSplitError(f"Range {start}-{end} is not split at a row boundary: {ex}")
+    return rows
+
+
+def _map_range(path: str, start: int, end: int, convert: Callable, dialect) -> list:
+    return [convert(row) for row in read_range(path, start, end, dialect=dialect)]
+
+
+def _map_serial(path: str, convert: Callable, start: int, dialect) -> list:
+    with open_file(path, 'rb') as file:
+        if resolve_format(path).compression is None:
+            file.seek(start)
+            data = file.read()
+        else:
+            data = file.read()[start:]
+    return [convert(row) for row in csv.reader(io.StringIO(data.decode('utf-8'), newline=''), dialect)]
+
+
+def iter_csv_rows(path: str, convert: Callable, workers: int, start: int = 0, dialect='excel') -> Iterator:
+    """
+    Convert the rows of a csv file in a pool of processes. The file is split
+    into RANGES_PER_WORKER byte ranges per worker, every range is read and
+    converted in a worker process, and the results are yielded in file order
+    as soon as each range is done, so they can be used while the next ranges
+    are converted. convert should return values that are fast to pickle,
+    e.g. tuples of strings and numbers, not objects.
+
+    Compressed files cannot be split and are converted in this process. If a
+    range turns out not to start and end at row boundaries, because quoted
+    values contain line breaks, the rest of the file is converted in this
+    process from the start of that range.
+
+    :param path: the csv file
+    :param convert: a picklable function converting a row, a list of strings
+    :param workers: the number of processes
+    :param start: the offset of the first row, e.g. after a header line
+    :param dialect: the csv dialect
+    :return: an iterator of the converted rows, in file order
+    """
+    if resolve_format(path).compression is not None:
+        yield from _map_serial(path, convert, start, dialect)
+        return
+
+    ranges = split_ranges(path, workers * RANGES_PER_WORKER, start)
+    if len(ranges) == 1:
+        yield from _map_serial(path, convert, start, dialect)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [executor.submit(_map_range, path, range_start, end, convert, dialect)
+                   for range_start, end in ranges]
+        for (range_start, _), future in zip(ranges, futures):
+            try:
+                results = future.result()
+            except RangeSplitError:
+                for pending in futures:
+                    pending.cancel()
+                yield from _map_serial(path, convert, range_start, dialect)
+                return
+            yield from results
+
+
+def map_csv_rows(path: str, convert: Callable, workers: int, start: int = 0, dialect='excel') -> list:
+    """
+    Convert the rows of a csv file in a pool of processes, see iter_csv_rows.
+
+    :param path: the csv file
+    :param convert: a picklable function converting a row, a list of strings
+    :param workers: the number of processes
+    :param start: the offset of the first row, e.g. after a header line
+    :param dialect: the csv dialect
+    :return: the converted rows, in file order
+    """
+    return list(iter_csv_rows(path, convert, workers, start, dialect))
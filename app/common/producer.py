@@ -1,3 +1,4 @@
+import os
 import sys
 
 from abc import abstractmethod, ABC
@@ -5,7 +6,13 @@ from typing import TypeVar, SupportsAbs, Generic, Type
 from app.db.database import Database
 from app.common.formatter import AbstractFormatter
 from app.common.constants import DEFAULT_OUTPUT_LIMIT
+from app.common.constants import DEFAULT_BATCH_SIZE
 from app.common.helpers import print_items_and_confirm
+from app.common.rejects import RejectSink, RejectReason, reject_format_for
+from app.common.stats import STATS
+from app.common.progress import NULL_PROGRESS, start_progress
+from app.common.metrics import ROWS_WRITTEN
+from app.common.fileformat import DATA_FORMATS, resolve_format, file_mode, open_file
 
 
 T = TypeVar('T')
@@ -18,6 +25,12 @@ class AbstractProducer(Generic[T], ABC):
         self.short_output = False
         self.pretty_output = False
         self.output_limit = DEFAULT_OUTPUT_LIMIT
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.workers = 1
+        self.json_backend = None
+        self.reject_file = None
+        self.rejects = RejectSink()
+        self.progress = NULL_PROGRESS
 
     def set_short_output(self, short_output: bool):
         self.short_output = short_output
@@ -28,40 +41,45 @@ class AbstractProducer(Generic[T], ABC):
     def set_output_limit(self, output_limit: int):
         self.output_limit = output_limit
 
+    def set_batch_size(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def set_workers(self, workers: int):
+        self.workers = workers
+
+    def set_json_backend(self, json_backend: str):
+        self.json_backend = json_backend
+
+    def set_reject_file(self, reject_file: str):
+        self.reject_file = reject_file
+
     def convert_files(self, in_file, out_file):
         """
         Convert data file from one format to another. The formatter is an
         implementation of the abstract AbstractFormatter class. Supported formats
-        are csv, json, and xml
+        are csv, json, xml and the columnar arrow format. Either file may be
+        compressed (.gz, .bz2, .xz, .zst).
 
         :param in_file: the path to the input file
         :param out_file: the path to the output file
         """
-        in_ext = in_file.split('.')[-1]
-        out_ext = out_file.split('.')[-1]
+        in_ext = resolve_format(in_file).format
+        out_ext = resolve_format(out_file).format
         formatter = self.get_formatter()
+        formatter.json_backend = self.json_backend
 
-        ext_funcs = {
-            'csv': {'from_func': formatter.from_csv, 'to_func': formatter.to_csv},
-            'json': {'from_func': formatter.from_json, 'to_func': formatter.to_json},
-            'xml': {'from_func': formatter.from_xml, 'to_func': formatter.to_xml}
-        }
-
-        if in_ext not in ext_funcs:
+        if in_ext not in DATA_FORMATS:
             print(f"{in_ext} input format not supported.")
             sys.exit(1)
-        if out_ext not in ext_funcs:
+        if out_ext not in DATA_FORMATS:
             print(f"{out_ext} output format not supported.")
             sys.exit(1)
 
-        with open(in_file) as f:
-            in_contents = f.read()
+        with open_file(in_file, file_mode(in_ext)) as f:
+            items = formatter.read(in_ext, f)
 
-        users = ext_funcs[in_ext]['from_func'](in_contents)
-        out_contents = ext_funcs[out_ext]['to_func'](users)
-
-        with open(out_file, 'w') as f:
-            f.write(out_contents)
+        with open_file(out_file, file_mode(out_ext, 'w')) as f, formatter.writer(out_ext, f) as writer:
+            writer.write(items)
 
     @abstractmethod
     def get_formatter(self) -> F:
@@ -71,8 +89,20 @@ class AbstractProducer(Generic[T], ABC):
     def get_object_type(self) -> Type[T]:
         pass
 
+    def _open_rejects(self, input_format: str):
+        """
+        Start collecting rejected records for an input. Rejects are written to
+        the reject file, if one was set, in a format matching the input.
+
+        :param input_format: the format of the input (csv, json, xml)
+        """
+        self.rejects.close()
+        self.rejects = RejectSink(self.reject_file, fmt=reject_format_for(input_format),
+                                  fields=self.get_formatter().get_attr_list())
+
     def _confirm_and_save(self, items: list[T]):
         if len(items) == 0:
+            self.rejects.close()
             print('No records to insert.')
             sys.exit(0)
 
@@ -80,15 +110,46 @@ class AbstractProducer(Generic[T], ABC):
         answer = print_items_and_confirm(items=items, item_type=_type, print_limit=self.output_limit,
                                          short=self.short_output, pretty=self.pretty_output)
         if answer.strip().lower() == 'n':
+            self.rejects.close()
             print('No records will be inserted.')
             sys.exit(0)
         else:
-            saved = 0
-            for item in items:
-                if self.save(item):
-                    saved += 1
+            self.progress = start_progress(len(items), f"{_type} saved")
+            with STATS.timer('save', rows=len(items)):
+                saved = self.save_all(items)
+            self.progress.finish()
+            self.progress = NULL_PROGRESS
             print(f"{saved} {_type} created successfully.")
+            self.rejects.close()
 
     @abstractmethod
     def save(self, item: T):
         pass
+
+    def save_all(self, items: list[T]) -> int:
+        """
+        Save all items. By default, items are saved one at a time with save.
+        Producers that can write in bulk should override this.
+
+        :param items: the items to save
+        :return: the number of items saved
+        """
+        saved = 0
+        for item in items:
+            if self.save(item):
+                saved += 1
+                ROWS_WRITTEN.inc(table=self.get_object_type().__name__.lower())
+                self.progress.update()
+            else:
+                self.progress.update(rejected=1)
+        return saved
+
+    def _reject(self, item: T, ex: Exception):
+        """
+        Reject an item that could not be saved.
+
+        :param item: the item that was rejected
+        :param ex: the error raised when saving the item
+        """
+        self.rejects.reject(item, RejectReason.DATABASE_ERROR,
+                            f"Problem occurred saving {self.get_object_type().__name__.lower()}: {item}{os.linesep}{ex}")
@@ -0,0 +1,113 @@
+import sys
+import atexit
+
+
+DEFAULT_PROFILE_TOP = 20
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', type=str, metavar='FILE',
+                        help='profile the run and write the stats to FILE (.pstats)')
+    parser.add_argument('--profile-top', type=int, metavar='N', default=DEFAULT_PROFILE_TOP,
+                        help=f'number of hot functions to print. default {DEFAULT_PROFILE_TOP}')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='also trace memory allocations and write a tracemalloc snapshot')
+    parser.add_argument('--profile-sampling', action='store_true',
+                        help='use the pyinstrument sampling profiler instead of cProfile, if installed')
+
+
+class RunProfiler:
+    """
+    Profiles a run with cProfile, or with the pyinstrument sampling profiler
+    when requested and installed, and optionally traces memory allocations
+    with tracemalloc.
+
+    On stop, the profile is written to ``path`` (a .pstats file for cProfile,
+    a text report for pyinstrument) and the ``top`` hot functions are printed
+    to stderr. With ``memory``, the peak traced memory and the top allocation
+    sites are printed and the snapshot is written to ``path`` + '.tracemalloc'.
+    """
+
+    def __init__(self, path: str, top: int = DEFAULT_PROFILE_TOP, memory: bool = False, sampling: bool = False):
+        self.path = path
+        self.top = top
+        self.memory = memory
+        self.sampling = sampling
+        self._profiler = None
+
+    def start(self):
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start()
+
+        if self.sampling:
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+            except ImportError:
+                print('pyinstrument is not installed, using cProfile.', file=sys.stderr)
+                self.sampling = False
+        if not self.sampling:
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+        if self.sampling:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self, file=None):
+        """
+        Stop profiling and write the reports.
+
+        :param file: the stream for the summaries, stderr by default
+        """
+        file = file or sys.stderr
+        if self.sampling:
+            self._profiler.stop()
+            report = self._profiler.output_text()
+            with open(self.path, 'w') as f:
+                f.write(report)
+            print(report, file=file)
+        else:
+            import pstats
+            self._profiler.disable()
+            self._profiler.dump_stats(self.path)
+            stats = pstats.Stats(self._profiler, stream=file)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        print(f"Profile written to {self.path}", file=file)
+
+        if self.memory:
+            self._report_memory(file)
+
+    def _report_memory(self, file):
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        snapshot_path = self.path + '.tracemalloc'
+        snapshot.dump(snapshot_path)
+        print(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", file=file)
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            print(stat, file=file)
+        print(f"Memory snapshot written to {snapshot_path}", file=file)
+
+
+def enable_profiling(args):
+    """
+    Start profiling if requested by --profile. The reports are written when
+    the program exits.
+
+    :param args: the parsed arguments, as a dict or namespace
+    :return: the profiler, or None if profiling was not requested
+    """
+    if not isinstance(args, dict):
+        args = vars(args)
+    if not args.get('profile'):
+        return None
+    profiler = RunProfiler(args['profile'], top=args.get('profile_top') or DEFAULT_PROFILE_TOP,
+                           memory=bool(args.get('profile_memory')), sampling=bool(args.get('profile_sampling')))
+    profiler.start()
+    atexit.register(profiler.stop)
+    return profiler
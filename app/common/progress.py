@@ -0,0 +1,157 @@
+import sys
+import time
+import logging
+import threading
+
+
+PROGRESS_MODES = ['auto', 'bar', 'log', 'off']
+BAR_INTERVAL = 0.25
+LOG_INTERVAL = 5.0
+
+_mode = 'auto'
+_logger = logging.getLogger('app.progress')
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter:
+    """
+    Reports the progress of a long job: rows done, rows/sec, ETA and the
+    number of rejected rows.
+
+    Output is throttled to one update per ``interval`` seconds. In 'bar'
+    mode a single status line is rewritten on the stream, in 'log' mode a
+    structured key=value line is logged to the 'app.progress' logger.
+    A reporter may be shared by several threads.
+    """
+
+    def __init__(self, total: int = None, label: str = 'rows', mode: str = 'bar', stream=None,
+                 interval: float = None, clock=time.monotonic):
+        """
+        :param total: the number of rows of the job, None if unknown
+        :param label: what is being counted, e.g. 'users saved'
+        :param mode: 'bar' or 'log'
+        :param stream: the stream for 'bar' mode, stderr by default
+        :param interval: the minimum number of seconds between updates
+        :param clock: the time source
+        """
+        self.total = total
+        self.label = label
+        self.mode = mode
+        self.stream = stream or sys.stderr
+        self.interval = interval if interval is not None else (LOG_INTERVAL if mode == 'log' else BAR_INTERVAL)
+        self.clock = clock
+        self.done = 0
+        self.rejected = 0
+        self.started = clock()
+        self._next = self.started + self.interval
+        self._lock = threading.Lock()
+
+    def update(self, done: int = 1, rejected: int = 0):
+        """
+        Record finished rows.
+
+        :param done: the number of rows processed, including rejected rows
+        :param rejected: the number of those rows that were rejected
+        """
+        with self._lock:
+            self.done += done
+            self.rejected += rejected
+            now = self.clock()
+            if now >= self._next:
+                self._next = now + self.interval
+                self._emit(now)
+
+    def finish(self):
+        self._emit(self.clock(), final=True)
+
+    def status(self, now: float) -> dict:
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(self.total - self.done, 0) / rate
+        return {'label': self.label, 'done': self.done, 'total': self.total, 'rate': rate, 'eta': eta,
+                'rejected': self.rejected, 'elapsed': elapsed}
+
+    def _emit(self, now: float, final: bool = False):
+        status = self.status(now)
+        if self.mode == 'log':
+            eta = 'none' if status['eta'] is None else f"{status['eta']:.1f}"
+            _logger.info(f"progress label=\"{status['label']}\" done={status['done']} total={status['total']} "
+                         f"rate={status['rate']:.1f} eta={eta} rejected={status['rejected']} "
+                         f"final={str(final).lower()}")
+            return
+
+        if status['total']:
+            done = f"{status['done']}/{status['total']} {status['label']} ({status['done'] * 100 // status['total']}%)"
+        else:
+            done = f"{status['done']} {status['label']}"
+        line = f"{done}, {status['rate']:.0f}/s"
+        if final:
+            line += f", {_format_seconds(status['elapsed'])} elapsed"
+        elif status['eta'] is not None:
+            line += f", ETA {_format_seconds(status['eta'])}"
+        if status['rejected']:
+            line += f", {status['rejected']} rejected"
+        print(f"\r{line}\033[K", end='\n' if final else '', file=self.stream, flush=True)
+
+
+class NullProgress:
+    """Used when progress reporting is off."""
+
+    total = None
+    done = 0
+    rejected = 0
+
+    def update(self, done: int = 1, rejected: int = 0):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_PROGRESS = NullProgress()
+
+
+def add_progress_arguments(parser):
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='auto',
+                        help='progress output: a status line on stderr (bar), structured log lines (log) or none '
+                             '(off). default auto, a status line when stderr is a terminal')
+
+
+def set_progress_mode(args):
+    """
+    Set the progress mode from --progress.
+
+    :param args: the parsed arguments, as a dict or namespace
+    """
+    global _mode
+    if not isinstance(args, dict):
+        args = vars(args)
+    _mode = args.get('progress') or 'auto'
+    if _mode == 'log' and not _logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+
+
+def start_progress(total: int = None, label: str = 'rows'):
+    """
+    Start reporting the progress of a job, in the mode set by --progress.
+
+    :param total: the number of rows of the job, None if unknown
+    :param label: what is being counted
+    :return: a ProgressReporter, or NULL_PROGRESS when progress is off
+    """
+    mode = _mode
+    if mode == 'auto':
+        mode = 'bar' if sys.stderr.isatty() else 'off'
+    if mode == 'off':
+        return NULL_PROGRESS
+    return ProgressReporter(total, label, mode=mode)
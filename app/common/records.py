@@ -0,0 +1,227 @@
+import struct
+
+from typing import Iterator
+
+
+# A record file is a sequence of records, each a 4 byte length followed by a MessagePack
+# array. The first record holds the field names, the others the values of one object.
+_LENGTH = struct.Struct("<I")
+
+_INT8 = struct.Struct(">b")
+_INT16 = struct.Struct(">h")
+_INT32 = struct.Struct(">i")
+_INT64 = struct.Struct(">q")
+_UINT8 = struct.Struct(">B")
+_UINT16 = struct.Struct(">H")
+_UINT32 = struct.Struct(">I")
+_UINT64 = struct.Struct(">Q")
+_FLOAT32 = struct.Struct(">f")
+_FLOAT64 = struct.Struct(">d")
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode('utf-8')
+    size = len(data)
+    if size < 32:
+        return bytes((0xa0 | size,)) + data
+    if size < 0x100:
+        return b"\xd9" + _UINT8.pack(size) + data
+    if size < 0x10000:
+        return b"\xda" + _UINT16.pack(size) + data
+    return b"\xdb" + _UINT32.pack(size) + data
+
+
+def _pack_int(value: int) -> bytes:
+    if 0 <= value < 0x80:
+        return bytes((value,))
+    if -32 <= value < 0:
+        return bytes((value & 0xff,))
+    if -0x8000000000000000 <= value < 0x8000000000000000:
+        return b"\xd3" + _INT64.pack(value)
+    return b"\xcf" + _UINT64.pack(value)
+
+
+def _pack_value(value) -> bytes:
+    _type = type(value)
+    if _type is str:
+        return _pack_str(value)
+    if value is None:
+        return b"\xc0"
+    if _type is bool:
+        return b"\xc3" if value else b"\xc2"
+    if _type is int:
+        return _pack_int(value)
+    if _type is float:
+        return b"\xcb" + _FLOAT64.pack(value)
+    return _pack_str(str(value))
+
+
+def pack_values(values: list) -> bytes:
+    """
+    Encode a list of values as a MessagePack array, with the struct codec.
+
+    :param values: strings, ints, floats, bools or None
+    :return: the encoded array
+    """
+    size = len(values)
+    if size < 16:
+        head = bytes((0x90 | size,))
+    elif size < 0x10000:
+        head = b"\xdc" + _UINT16.pack(size)
+    else:
+        head = b"\xdd" + _UINT32.pack(size)
+    return head + b"".join([_pack_value(value) for value in values])
+
+
+# type byte: struct of the fixed size values
+_FIXED = {
+    0xca: _FLOAT32, 0xcb: _FLOAT64,
+    0xcc: _UINT8, 0xcd: _UINT16, 0xce: _UINT32, 0xcf: _UINT64,
+    0xd0: _INT8, 0xd1: _INT16, 0xd2: _INT32, 0xd3: _INT64,
+}
+# type byte: (length struct, decode) of the str and bin values
+_SIZED = {
+    0xd9: (_UINT8, True), 0xda: (_UINT16, True), 0xdb: (_UINT32, True),
+    0xc4: (_UINT8, False), 0xc5: (_UINT16, False), 0xc6: (_UINT32, False),
+}
+
+
+def _unpack_value(data: bytes, pos: int) -> tuple:
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if 0xa0 <= code <= 0xbf:
+        end = pos + (code & 0x1f)
+        return data[pos:end].decode('utf-8'), end
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code == 0xc0:
+        return None, pos
+    if code == 0xc2:
+        return False, pos
+    if code == 0xc3:
+        return True, pos
+    fixed = _FIXED.get(code)
+    if fixed is not None:
+        return fixed.unpack_from(data, pos)[0], pos + fixed.size
+    sized = _SIZED.get(code)
+    if sized is not None:
+        length, is_str = sized
+        start = pos + length.size
+        end = start + length.unpack_from(data, pos)[0]
+        return (data[start:end].decode('utf-8') if is_str else data[start:end]), end
+    raise ValueError(f"Unsupported MessagePack type 0x{code:02x}.")
+
+
+def unpack_values(data: bytes) -> list:
+    """
+    Decode a MessagePack array of scalar values, with the struct codec.
+
+    :param data: the encoded array
+    :return: the values
+    """
+    code = data[0]
+    if 0x90 <= code <= 0x9f:
+        size, pos = code & 0x0f, 1
+    elif code == 0xdc:
+        size, pos = _UINT16.unpack_from(data, 1)[0], 3
+    elif code == 0xdd:
+        size, pos = _UINT32.unpack_from(data, 1)[0], 5
+    else:
+        raise ValueError('Record is not a MessagePack array.')
+    values = []
+    append = values.append
+    for _ in range(size):
+        # short strings, small ints and bools are decoded inline, they are most of the values
+        code = data[pos]
+        if 0xa0 <= code <= 0xbf:
+            end = pos + 1 + (code & 0x1f)
+            append(data[pos + 1:end].decode('utf-8'))
+            pos = end
+        elif code == 0xd9:
+            end = pos + 2 + data[pos + 1]
+            append(data[pos + 2:end].decode('utf-8'))
+            pos = end
+        elif code < 0x80:
+            append(code)
+            pos += 1
+        elif code == 0xc3 or code == 0xc2:
+            append(code == 0xc3)
+            pos += 1
+        else:
+            value, pos = _unpack_value(data, pos)
+            append(value)
+    return values
+
+
+def _codec() -> tuple:
+    """
+    :return: the (pack, unpack) functions, from msgpack when it is installed
+    """
+    try:
+        import msgpack
+    except ImportError:
+        return pack_values, unpack_values
+    return msgpack.packb, lambda data: msgpack.unpackb(data, raw=False)
+
+
+class RecordWriter:
+    """
+    Writes length-prefixed MessagePack records to a binary file, encoded with
+    msgpack when it is installed and with a struct codec otherwise. Both
+    codecs write standard MessagePack.
+    """
+
+    def __init__(self, file, names: list):
+        """
+        :param file: the binary file to write to
+        :param names: the field names, written as the first record
+        """
+        self.file = file
+        self.count = 0
+        self._pack = _codec()[0]
+        self._write_record(list(names))
+
+    def write(self, records: list):
+        """
+        Write records.
+
+        :param records: the values of each record, in field name order
+        """
+        pack = self._pack
+        length = _LENGTH.pack
+        parts = []
+        for values in records:
+            data = pack(values)
+            parts.append(length(len(data)))
+            parts.append(data)
+        self.file.write(b"".join(parts))
+        self.count += len(records)
+
+    def _write_record(self, values: list):
+        data = self._pack(values)
+        self.file.write(_LENGTH.pack(len(data)) + data)
+
+
+def read_records(file) -> Iterator[list]:
+    """
+    Read the records of a record file, one at a time. The first record holds
+    the field names.
+
+    :param file: the binary file to read from
+    :return: an iterator of the values of each record
+    """
+    unpack = _codec()[1]
+    read = file.read
+    while True:
+        head = read(_LENGTH.size)
+        if not head:
+            return
+        if len(head) != _LENGTH.size:
+            raise ValueError('Record file is truncated.')
+        (size,) = _LENGTH.unpack(head)
+        data = read(size)
+        if len(data) != size:
+            raise ValueError('Record file is truncated.')
+        yield unpack(data)
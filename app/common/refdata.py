@@ -0,0 +1,252 @@
+import os
+import csv
+import mmap
+import pickle
+import struct
+import argparse
+
+from array import array
+from collections.abc import Sequence
+
+
+INDEX_SUFFIX = ".idx"
+# source size and modification time, followed by the line offsets
+_INDEX_HEADER = struct.Struct("<QQ")
+
+DATA_DIR = "./app/data"
+BUNDLE_NAME = "refdata.bundle"
+BUNDLE_VERSION = 2
+# the size of the index at the start of the bundle
+_BUNDLE_HEADER = struct.Struct("<Q")
+
+_indexes = {}
+_entries = {}
+
+
+class LineIndex(Sequence):
+    """
+    A read-only list of the lines of a text file.
+
+    The file is memory-mapped and only the offsets of the lines are kept in
+    memory, so a line is decoded only when it is accessed. Lines are returned
+    without their line ending. Since LineIndex is a Sequence, random.choice
+    picks a random line in constant time.
+
+    The offsets are cached next to the file (path + ".idx") and rebuilt when
+    the file changes.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        """
+        :param path: the text file to index
+        :param encoding: the encoding of the file
+        """
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self.mtime = stat.st_mtime_ns
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        self._offsets = self._load_offsets(stat)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("line index out of range")
+        line = self._mm[self._offsets[i]:self._offsets[i + 1]]
+        return line.decode(self.encoding).rstrip("\r\n")
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def _load_offsets(self, stat: os.stat_result) -> array:
+        index_path = self.path + INDEX_SUFFIX
+        try:
+            with open(index_path, "rb") as index_file:
+                size, mtime = _INDEX_HEADER.unpack(index_file.read(_INDEX_HEADER.size))
+                if size == stat.st_size and mtime == stat.st_mtime_ns:
+                    offsets = array("Q")
+                    offsets.frombytes(index_file.read())
+                    return offsets
+        except (OSError, struct.error, ValueError):
+            pass
+
+        offsets = self._build_offsets(stat.st_size)
+        try:
+            with open(index_path, "wb") as index_file:
+                index_file.write(_INDEX_HEADER.pack(stat.st_size, stat.st_mtime_ns))
+                offsets.tofile(index_file)
+        except OSError:
+            # The data directory may be read-only, the index is rebuilt next time
+            pass
+        return offsets
+
+    def _build_offsets(self, size: int) -> array:
+        offsets = array("Q", [0])
+        find = self._mm.find
+        pos = 0
+        while pos < size:
+            end = find(b"\n", pos)
+            pos = size if end == -1 else end + 1
+            offsets.append(pos)
+        return offsets
+
+
+def load_lines(path: str) -> LineIndex:
+    """
+    Get the line index of a text file. Indexes are shared within a process,
+    so a file is only mapped once.
+
+    :param path: the text file
+    :return: the line index
+    """
+    key = os.path.abspath(path)
+    index = _indexes.get(key)
+    if index is None or os.stat(path).st_mtime_ns != index.mtime:
+        index = LineIndex(path)
+        _indexes[key] = index
+    return index
+
+
+def _read_lines(path: str) -> list:
+    with open(path) as file:
+        return file.read().splitlines()
+
+
+def _read_csv(path: str) -> list:
+    with open(path, newline="") as file:
+        return list(csv.reader(file))
+
+
+# name: (file in the data directory, reader). Text files are served as a LineIndex,
+# the other files are parsed once and kept in the bundle
+REFERENCE_FILES = {
+    "addresses": ("addresses.csv", _read_csv),
+    "first_names": ("first_names.txt", _read_lines),
+    "last_names": ("last_names.txt", _read_lines),
+    "restaurant_names": ("restaurant-names.txt", _read_lines),
+}
+BUNDLED = [name for name, (_, read) in REFERENCE_FILES.items() if read is not _read_lines]
+
+
+def _source_stat(data_dir: str, name: str) -> tuple:
+    stat = os.stat(os.path.join(data_dir, REFERENCE_FILES[name][0]))
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_bundle(data_dir: str = DATA_DIR) -> dict:
+    """
+    Compile the parsed reference data files into a single bundle, written to
+    the data directory. The bundle starts with an index of its entries, each
+    entry is pickled on its own so it can be loaded without the others.
+
+    :param data_dir: the directory with the reference data files
+    :return: the parsed data, by name
+    """
+    entries = {}
+    index = {}
+    blobs = []
+    offset = 0
+    for name in BUNDLED:
+        filename, read = REFERENCE_FILES[name]
+        stat = _source_stat(data_dir, name)
+        entries[name] = read(os.path.join(data_dir, filename))
+        blob = pickle.dumps(entries[name], protocol=pickle.HIGHEST_PROTOCOL)
+        index[name] = (stat, offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    header = pickle.dumps({"version": BUNDLE_VERSION, "entries": index}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    bundle_path = os.path.join(data_dir, BUNDLE_NAME)
+    try:
+        with open(bundle_path + ".tmp", "wb") as file:
+            file.write(_BUNDLE_HEADER.pack(len(header)))
+            file.write(header)
+            file.writelines(blobs)
+        os.replace(bundle_path + ".tmp", bundle_path)
+    except OSError:
+        # The data directory may be read-only, the bundle is rebuilt next time
+        pass
+    return entries
+
+
+def _read_entry(data_dir: str, name: str, stat: tuple):
+    """
+    :return: the entry of the bundle, None if it is not in the bundle or its source changed
+    """
+    with open(os.path.join(data_dir, BUNDLE_NAME), "rb") as file:
+        (size,) = _BUNDLE_HEADER.unpack(file.read(_BUNDLE_HEADER.size))
+        header = pickle.loads(file.read(size))
+        entry = header["entries"].get(name) if header.get("version") == BUNDLE_VERSION else None
+        if entry is None or tuple(entry[0]) != stat:
+            return None
+        _, offset, length = entry
+        file.seek(_BUNDLE_HEADER.size + size + offset)
+        return pickle.loads(file.read(length))
+
+
+def load_entry(name: str, data_dir: str = DATA_DIR):
+    """
+    Load an entry of the reference data bundle. Only the source file of the
+    entry is checked and only the entry is unpickled, once per process. The
+    bundle is rebuilt if it is missing or the source changed since it was built.
+
+    :param name: one of BUNDLED
+    :param data_dir: the directory with the reference data files
+    :return: the parsed data
+    """
+    stat = _source_stat(data_dir, name)
+    cached = _entries.get((data_dir, name))
+    if cached is not None and cached[0] == stat:
+        return cached[1]
+
+    try:
+        data = _read_entry(data_dir, name, stat)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, struct.error):
+        data = None
+    if data is None:
+        data = build_bundle(data_dir)[name]
+    _entries[(data_dir, name)] = (stat, data)
+    return data
+
+
+def reference_data(name: str, path: str = None):
+    """
+    Get reference data by name. Text files, the default ones or others, are
+    served as a LineIndex. The default csv files are loaded from the compiled
+    bundle, other csv files are read directly.
+
+    :param name: one of REFERENCE_FILES
+    :param path: the file to read, None for the default data file
+    :return: the lines of a text file, or the rows of a csv file
+    """
+    filename, read = REFERENCE_FILES[name]
+    default_path = os.path.join(DATA_DIR, filename)
+    if read is _read_lines:
+        return load_lines(path or default_path)
+    if path is None or os.path.abspath(path) == os.path.abspath(default_path):
+        return load_entry(name)
+    return read(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the csv reference data files into a single bundle, "
+                                                 "loaded by the producers at startup")
+    parser.add_argument("--data-dir", type=str, default=DATA_DIR, help="directory with the reference data files")
+    args = parser.parse_args()
+
+    bundle = build_bundle(args.data_dir)
+    counts = ", ".join(f"{len(bundle[name])} {name}" for name in BUNDLED)
+    print(f"Wrote {os.path.join(args.data_dir, BUNDLE_NAME)}: {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import csv
+import json
+
+from typing import Optional
+from app.common.constants import DEFAULT_OUTPUT_LIMIT
+from app.common.stats import STATS
+from app.common.metrics import ROWS_REJECTED
+
+
+REJECT_BUFFER_SIZE = 1000
+
+
+class RejectReason:
+    FIELD_COUNT = 'FIELD_COUNT'
+    MISSING_FIELD = 'MISSING_FIELD'
+    DUPLICATE_ID = 'DUPLICATE_ID'
+    UNKNOWN_CUSTOMER = 'UNKNOWN_CUSTOMER'
+    UNKNOWN_RESTAURANT = 'UNKNOWN_RESTAURANT'
+    UNKNOWN_DELIVERY = 'UNKNOWN_DELIVERY'
+    DATABASE_ERROR = 'DATABASE_ERROR'
+
+
+def reject_format_for(input_format: str) -> str:
+    """
+    Get the reject file format for an input format. Csv input is rejected
+    as csv, everything else as newline delimited json.
+
+    :param input_format: the input format (csv, json, xml)
+    :return: the reject file format (csv or ndjson)
+    """
+    return 'csv' if input_format == 'csv' else 'ndjson'
+
+
+class RejectSink:
+    """
+    Collects records that failed validation or could not be saved.
+
+    Rejected records are counted per reason and, when a path is given, buffered
+    and written to the file with their reason code and message. Only the first
+    ``print_limit`` messages are printed, so a file full of bad rows does not
+    flood stdout.
+    """
+
+    def __init__(self, path: Optional[str] = None, fmt: str = 'csv', fields: Optional[list] = None,
+                 buffer_size: int = REJECT_BUFFER_SIZE, print_limit: int = DEFAULT_OUTPUT_LIMIT):
+        """
+        :param path: the reject file, or None to only count rejects
+        :param fmt: the reject file format, csv or ndjson
+        :param fields: the record field names, used as the csv header
+        :param buffer_size: the number of rejects held before writing to the file
+        :param print_limit: the number of reject messages to print
+        """
+        if fmt not in ('csv', 'ndjson'):
+            raise ValueError(f"{fmt} reject format not supported.")
+        self.path = path
+        self.fmt = fmt
+        self.fields = fields
+        self.buffer_size = buffer_size
+        self.print_limit = print_limit
+        self.counts = {}
+        self.total = 0
+        self._buffer = []
+        self._file = None
+        self._writer = None
+
+    def reject(self, record, reason: str, message: str = ''):
+        """
+        Reject a record.
+
+        :param record: the record as a list of fields, a dict, or a model object
+        :param reason: the reason code, one of RejectReason
+        :param message: a description of the problem
+        """
+        self.counts[reason] = self.counts.get(reason, 0) + 1
+        self.total += 1
+        STATS.count('rejected')
+        ROWS_REJECTED.inc(reason=reason)
+        if self.total <= self.print_limit and message:
+            print(message)
+        if self.path is not None:
+            self._buffer.append((record, reason, message))
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._open()
+        if self.fmt == 'csv':
+            self._writer.writerows(self._csv_row(*reject) for reject in self._buffer)
+        else:
+            self._file.writelines(self._ndjson_line(*reject) for reject in self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """
+        Write any buffered rejects, close the reject file and print a summary.
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+        if self.total > 0:
+            print(self.summary())
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.counts.items()))
+        summary = f"{self.total} records rejected ({counts})."
+        if self.path is not None:
+            summary += f" Rejected records written to {self.path}."
+        return summary
+
+    def _open(self):
+        self._file = open(self.path, 'w', newline='')
+        if self.fmt == 'csv':
+            self._writer = csv.writer(self._file)
+            if self.fields is not None:
+                self._writer.writerow(list(self.fields) + ['reject_reason', 'reject_message'])
+
+    def _to_dict(self, record) -> dict:
+        if isinstance(record, dict):
+            return record
+        if isinstance(record, (list, tuple)):
+            return dict(zip(self.fields or range(len(record)), record))
+        return vars(record)
+
+    def _csv_row(self, record, reason: str, message: str) -> list:
+        if isinstance(record, (list, tuple)):
+            values = list(record)
+        elif self.fields is not None:
+            _dict = self._to_dict(record)
+            values = [_dict.get(field, '') for field in self.fields]
+        else:
+            values = list(self._to_dict(record).values())
+        return values + [reason, message]
+
+    def _ndjson_line(self, record, reason: str, message: str) -> str:
+        line = dict(self._to_dict(record))
+        line['reject_reason'] = reason
+        line['reject_message'] = message
+        return json.dumps(line, default=str) + '\n'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,299 @@
+import uuid
+import operator
+
+from typing import Callable, Optional, Sequence
+from app.common.converters import to_bool, to_int, to_float, to_uuid, to_str, nullable
+
+
+def _uuid_hex(value) -> str:
+    return value.hex if isinstance(value, uuid.UUID) else value
+
+
+def _uuid_int(value: uuid.UUID) -> int:
+    return value.int
+
+
+def _uuid_from_int(value: int) -> uuid.UUID:
+    return uuid.UUID(int=value)
+
+
+# a uuid is sent between processes as its int, unpickling uuid objects is slow
+COMPACT_UUID = (_uuid_int, _uuid_from_int)
+# converter: value type of the column in the columnar format, other columns are strings
+_COLUMN_TYPES = {to_int: int, to_float: float, to_bool: bool}
+
+
+class Field:
+    """
+    A field of an entity.
+
+    :param name: the column name, and the attribute name unless attr is given
+    :param converter: converts a string (or json) value to the field type
+    :param placeholder: the sql placeholder used when inserting the field
+    :param to_db: converts the attribute value to the insert parameter
+    :param select: the sql expression reading the field, the column name by default
+    :param compact: (to, from) functions converting a value that is slow to pickle to a
+                    compact value and back, for values sent between processes
+    :param attr: the attribute holding the value, when it is not named like the column
+    """
+
+    def __init__(self, name: str, converter: Callable = to_str, placeholder: str = '?',
+                 to_db: Optional[Callable] = None, select: Optional[str] = None,
+                 compact: Optional[tuple] = None, attr: Optional[str] = None):
+        self.name = name
+        self.attr = attr or name
+        self.converter = converter
+        self.placeholder = placeholder
+        self.to_db = to_db
+        self.select = select or name
+        self.compact = compact
+
+
+class Schema:
+    """
+    Describes the columns of an entity's table, in csv column order, and how
+    to convert them. Used by formatters to build objects from strings, by
+    Ingest for its converters, and by the database writers for inserts.
+    """
+
+    def __init__(self, name: str, fields: list[Field]):
+        self.name = name
+        self.fields = fields
+        self.names = [field.name for field in fields]
+        self.converters = {field.name: field.converter for field in fields if field.converter is not to_str}
+        self._converter_list = [field.converter for field in fields]
+        self._compact = [(i, field.compact) for i, field in enumerate(fields) if field.compact is not None]
+
+    def convert_fields(self, values: list) -> list:
+        """
+        Convert a row of values, in field order.
+
+        :param values: the string values
+        :return: the converted values
+        """
+        return [convert(value) for convert, value in zip(self._converter_list, values)]
+
+    def convert_compact(self, values: list) -> tuple:
+        """
+        Convert a row of values, in field order, to values that are fast to
+        pickle, e.g. in a worker process. expand_compact turns them into the
+        converted values.
+
+        :param values: the string values
+        :return: the compact converted values
+        """
+        converted = self.convert_fields(values)
+        for i, (to_compact, _) in self._compact:
+            converted[i] = to_compact(converted[i])
+        return tuple(converted)
+
+    def expand_compact(self, values: tuple) -> Sequence:
+        """
+        Expand the values of convert_compact to the converted values.
+
+        :param values: the compact converted values
+        :return: the converted values, in field order
+        """
+        if not self._compact:
+            return values
+        values = list(values)
+        for i, (_, from_compact) in self._compact:
+            values[i] = from_compact(values[i])
+        return values
+
+    def column_types(self) -> dict:
+        """
+        Get the value type of each field in the columnar format, from its
+        converter. Nullable converters have the type of the converter they wrap.
+
+        :return: int, float, bool or str keyed by field name
+        """
+        return {field.name: _COLUMN_TYPES.get(getattr(field.converter, '__wrapped__', field.converter), str)
+                for field in self.fields}
+
+    def convert_dict(self, _dict: dict) -> list:
+        """
+        Convert the values of a dictionary keyed by field name.
+
+        :param _dict: the string values dictionary
+        :return: the converted values, in field order
+        """
+        return [field.converter(_dict[field.name]) for field in self.fields]
+
+    def convert_columns(self, columns: dict) -> dict:
+        """
+        Convert whole columns at once. Each converter is looked up once per
+        column rather than once per value.
+
+        :param columns: lists of values keyed by field name
+        :return: lists of converted values keyed by field name
+        """
+        converted = {}
+        for field in self.fields:
+            if field.name in columns:
+                converted[field.name] = list(map(field.converter, columns[field.name]))
+        return converted
+
+    def insert_sql(self, table: str, exclude: tuple = ()) -> str:
+        """
+        Build a parameterized insert statement for the schema fields.
+
+        :param table: the table name (quoted if needed)
+        :param exclude: field names to leave out of the insert
+        :return: the insert statement
+        """
+        fields = [field for field in self.fields if field.name not in exclude]
+        columns = ", ".join(field.name for field in fields)
+        placeholders = ", ".join(field.placeholder for field in fields)
+        return f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+    def select_sql(self, table: str) -> str:
+        """
+        Build a select statement reading the schema fields in field order, in
+        the string form the formatters create objects from.
+
+        :param table: the table name (quoted if needed)
+        :return: the select statement
+        """
+        return f"SELECT {', '.join(field.select for field in self.fields)} FROM {table}"
+
+    def params_getter(self, exclude: tuple = ()) -> Callable:
+        """
+        Get a function converting an object to insert parameters, matching
+        insert_sql with the same exclude.
+
+        :param exclude: field names to leave out of the insert
+        :return: function returning a tuple of parameters for an object
+        """
+        fields = [field for field in self.fields if field.name not in exclude]
+        getter = operator.attrgetter(*[field.attr for field in fields])
+        to_db = [(i, field.to_db) for i, field in enumerate(fields) if field.to_db is not None]
+        if len(fields) == 1:
+            single_getter = getter
+            getter = lambda item: (single_getter(item),)
+
+        if not to_db:
+            return getter
+
+        def _params(item) -> tuple:
+            params = list(getter(item))
+            for i, convert in to_db:
+                params[i] = convert(params[i])
+            return tuple(params)
+        return _params
+
+
+class RequiredFields:
+    """
+    The fields a record must have, e.g. the children of an xml element or the
+    keys of a json object, checked for a whole record at once.
+    """
+
+    def __init__(self, names: list):
+        """
+        :param names: the field names
+        """
+        self.names = list(names)
+        self._required = frozenset(names)
+
+    def missing(self, values: dict) -> Optional[str]:
+        """
+        :param values: the record, keyed by field name
+        :return: the first field, in field order, that is not in the values. None if none are missing
+        """
+        if self._required <= values.keys():
+            return None
+        for name in self.names:
+            if name not in values:
+                return name
+
+
+_SCHEMAS = {}
+
+
+def register_schema(schema: Schema) -> Schema:
+    _SCHEMAS[schema.name] = schema
+    return schema
+
+
+def get_schema(name: str) -> Schema:
+    """
+    Get a registered schema by entity name.
+
+    :param name: the entity name (user, order, restaurant, driver, menuitem)
+    :return: the schema
+    """
+    try:
+        return _SCHEMAS[name]
+    except KeyError:
+        raise KeyError(f"No schema registered for '{name}'")
+
+
+USER_SCHEMA = register_schema(Schema('user', [
+    Field('id', to_uuid, placeholder='UNHEX(?)', to_db=_uuid_hex, select='HEX(id)', compact=COMPACT_UUID),
+    Field('user_role'),
+    Field('password'),
+    Field('email'),
+    Field('enabled', to_bool),
+    Field('confirmed', to_bool),
+    Field('account_non_expired', to_bool),
+    Field('account_non_locked', to_bool),
+    Field('credentials_non_expired', to_bool),
+]))
+
+ORDER_SCHEMA = register_schema(Schema('order', [
+    Field('id', to_int),
+    Field('customer_id', placeholder='UNHEX(?)', select='LOWER(HEX(customer_id))'),
+    Field('restaurant_id', to_int),
+    Field('delivery_id', to_int),
+    Field('confirmation_code'),
+]))
+
+# the picture of drivers saved without one
+DEFAULT_DRIVER_PICTURE = "https://temp.url/"
+
+
+def _driver_picture(picture: Optional[str]) -> str:
+    return picture or DEFAULT_DRIVER_PICTURE
+
+
+def _driver_status(status: Optional[str]) -> str:
+    # drivers are saved as active, whatever status they were created with
+    return 'active'
+
+RESTAURANT_SCHEMA = register_schema(Schema('restaurant', [
+    Field('id', to_int, attr='restaurant_id'),
+    Field('address_id', to_int),
+    Field('owner_id'),
+    Field('name'),
+    Field('rating', to_float),
+    Field('price_category', to_int),
+    Field('phone'),
+    Field('is_active', to_int),
+    Field('picture'),
+]))
+
+DRIVER_SCHEMA = register_schema(Schema('driver', [
+    Field('id', placeholder='UNHEX(?)'),
+    Field('address_id', to_int),
+    Field('first_name'),
+    Field('last_name'),
+    Field('phone'),
+    Field('dob'),
+    Field('license_num'),
+    Field('rating', to_float),
+    Field('picture', nullable(to_str), to_db=_driver_picture),
+    Field('status', to_db=_driver_status),
+]))
+
+MENUITEM_SCHEMA = register_schema(Schema('menuitem', [
+    Field('id', nullable(to_int)),
+    Field('restaurant_id', to_int),
+    Field('name'),
+    Field('price', to_float),
+    Field('picture', nullable(to_str)),
+    Field('description', nullable(to_str)),
+    Field('is_available', to_int),
+    Field('size', nullable(to_str)),
+    Field('discount', nullable(to_float)),
+]))
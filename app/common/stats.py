@@ -0,0 +1,225 @@
+import sys
+import json
+import time
+import atexit
+import random
+import functools
+
+from typing import Callable
+
+
+MAX_SAMPLES = 10000
+
+
+class StageStats:
+    """
+    The timings of one stage: the number of calls, rows and the total time.
+    Call durations are kept in a reservoir of at most MAX_SAMPLES samples for
+    the percentiles.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.samples = []
+
+    def add(self, seconds: float, rows: int):
+        self.calls += 1
+        self.rows += rows
+        self.total += seconds
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            i = random.randrange(self.calls)
+            if i < MAX_SAMPLES:
+                self.samples[i] = seconds
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'rows': self.rows,
+            'total_seconds': round(self.total, 6),
+            'rows_per_second': round(self.rows / self.total, 2) if self.total else None,
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+        }
+
+
+class _Timer:
+    __slots__ = ('stats', 'stage', 'rows', 'start')
+
+    def __init__(self, stats, stage: str, rows: int):
+        self.stats = stats
+        self.stage = stage
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.stats.record(self.stage, time.perf_counter() - self.start, self.rows)
+
+
+class _NullTimer:
+    """Returned by timer when stats are disabled, rows set on it are ignored."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Stats:
+    """
+    Per-stage timers and counters for a run.
+
+    Stats are disabled by default. While disabled, timer returns a shared
+    no-op context manager and count returns immediately, so instrumented
+    code pays for a single attribute check.
+
+    usage:
+
+        with STATS.timer('parse') as timer:
+            items = parse()
+            timer.rows = len(items)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.started = time.perf_counter()
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    def timer(self, stage: str, rows: int = 1):
+        """
+        Time a block of code.
+
+        :param stage: the name of the stage
+        :param rows: the number of rows processed by the block, may be set on the timer
+        :return: the timer context manager
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage, rows)
+
+    def record(self, stage: str, seconds: float, rows: int = 1):
+        stage_stats = self.stages.get(stage)
+        if stage_stats is None:
+            stage_stats = self.stages[stage] = StageStats(stage)
+        stage_stats.add(seconds, rows)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict:
+        return {
+            'elapsed_seconds': round(time.perf_counter() - self.started, 6),
+            'stages': {name: stage.to_dict() for name, stage in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def report(self, file=None):
+        """
+        Print the per-stage totals, rates and latencies.
+
+        :param file: the stream to print to, stderr by default
+        """
+        file = file or sys.stderr
+        summary = self.summary()
+        print(f"{'stage':<24}{'calls':>10}{'rows':>10}{'total s':>12}{'rows/s':>12}{'p50 ms':>10}{'p99 ms':>10}",
+              file=file)
+        for name, stage in summary['stages'].items():
+            rate = stage['rows_per_second']
+            print(f"{name:<24}{stage['calls']:>10}{stage['rows']:>10}{stage['total_seconds']:>12.3f}"
+                  f"{rate if rate is not None else '-':>12}{stage['p50_ms']:>10.3f}{stage['p99_ms']:>10.3f}",
+                  file=file)
+        for name, value in summary['counters'].items():
+            print(f"{name:<24}{value:>10}", file=file)
+        print(f"elapsed {summary['elapsed_seconds']:.3f}s", file=file)
+
+    def dump(self, path: str):
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+STATS = Stats()
+
+
+def timed(stage: str, count_arg: int = None) -> Callable:
+    """
+    Decorator timing every call of a function. The number of rows is the
+    length of the positional argument at count_arg, or else the length of the
+    returned list.
+
+    :param stage: the name of the stage
+    :param count_arg: the index of the positional argument holding the rows
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not STATS.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            if count_arg is not None and count_arg < len(args):
+                rows = len(args[count_arg])
+            else:
+                rows = len(result) if isinstance(result, list) else 1
+            STATS.record(stage, time.perf_counter() - start, rows)
+            return result
+        return wrapper
+    return decorator
+
+
+def add_stats_arguments(parser):
+    parser.add_argument('--stats', action='store_true', help='print per-stage timings at the end of the run')
+    parser.add_argument('--stats-json', type=str, metavar='FILE', help='write per-stage timings to a JSON file')
+
+
+def enable_stats(args: dict):
+    """
+    Enable stats if requested by --stats or --stats-json. The report is
+    printed, and written to the JSON file, when the program exits.
+
+    :param args: the parsed arguments, as a dict or namespace
+    """
+    if not isinstance(args, dict):
+        args = vars(args)
+    show, json_path = args.get('stats'), args.get('stats_json')
+    if not show and not json_path:
+        return
+    STATS.enable()
+
+    def _finish():
+        if show:
+            STATS.report()
+        if json_path:
+            STATS.dump(json_path)
+    atexit.register(_finish)
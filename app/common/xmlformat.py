@@ -0,0 +1,103 @@
+import xml.etree.ElementTree as ET
+
+from typing import Iterator, Optional
+
+
+XML_DECLARATION = '<?xml version="1.0" ?>'
+INDENT = ' ' * 4
+
+
+def escape_text(text: str) -> str:
+    """
+    Escape the text of an element, as minidom does.
+
+    :param text: the text
+    :return: the escaped text
+    """
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '"' in text:
+        text = text.replace('"', '&quot;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+class XmlWriter:
+    """
+    Writes objects as xml elements to a text file, in chunks, without building
+    a document. A root element holds an element per object, with a child element
+    per field. The document is the same as minidom's toprettyxml with 4 space
+    indents, or its toxml when not pretty printed, without a final line break.
+    """
+
+    def __init__(self, file, root: str, tag: str, names: list, pretty: bool = True):
+        """
+        :param file: the text file to write to
+        :param root: the tag of the root element
+        :param tag: the tag of the object elements
+        :param names: the field names, the tags of the child elements
+        :param pretty: indent the elements and put each on a line
+        """
+        self.file = file
+        self.root = root
+        self.count = 0
+        indent, self._newline = (INDENT, '\n') if pretty else ('', '')
+        self._item_head = f"{indent}<{tag}>{self._newline}"
+        self._item_tail = f"{indent}</{tag}>{self._newline}"
+        self._fields = [(f"{indent * 2}<{name}>", f"</{name}>{self._newline}") for name in names]
+        file.write(XML_DECLARATION + self._newline)
+
+    def write(self, rows: list):
+        """
+        Write object elements.
+
+        :param rows: the values of each object, in field name order
+        """
+        if not rows:
+            return
+        parts = [] if self.count else [f"<{self.root}>{self._newline}"]
+        append = parts.append
+        fields = self._fields
+        for values in rows:
+            append(self._item_head)
+            for (open_tag, close_tag), value in zip(fields, values):
+                append(open_tag)
+                append(escape_text(value if type(value) is str else str(value)))
+                append(close_tag)
+            append(self._item_tail)
+        self.file.write(''.join(parts))
+        self.count += len(rows)
+
+    def close(self):
+        """
+        End the document. The file itself is left open.
+        """
+        self.file.write(f"</{self.root}>" if self.count else f"<{self.root}/>")
+
+
+def iter_elements(file, tag: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream the object elements of an xml document, the children of its root,
+    in a single pass. Each element is turned into a dict of its child tags and
+    texts and dropped once it is read, so the document is never held in memory.
+
+    :param file: the xml file to read from, binary or text
+    :param tag: only read the elements with this tag, by default all children of the root
+    :return: an iterator of {child tag: text} for each element
+    """
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(file, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = elem
+            continue
+        depth -= 1
+        if depth == 1:
+            if tag is None or elem.tag == tag:
+                yield {child.tag: child.text for child in elem}
+            root.clear()
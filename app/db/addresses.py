@@ -0,0 +1,209 @@
+from typing import Optional
+from collections import OrderedDict
+
+from app.db.batch import BatchWriter
+from app.db.database import Database
+from app.common.constants import DEFAULT_BATCH_SIZE
+
+
+DEFAULT_ADDRESS_CACHE_SIZE = 100000
+INSERT_ADDRESS_SQL = "INSERT INTO address (line1, line2, city, state, zip) VALUES (?, ?, ?, ?, ?)"
+SELECT_NEW_ADDRESSES_SQL = "SELECT id, line1, city, state, zip FROM address WHERE id > ? ORDER BY id"
+
+
+def normalize_address(line1: str, city: str, state: str, zipcode: str) -> tuple:
+    """
+    Get the key used to de-duplicate an address. Whitespace is collapsed,
+    line1 and city are case-folded and the state is upper-cased, so
+    '12 Main  St., Reno' and '12 main st., reno' share a key.
+
+    :return: the normalized (line1, city, state, zip) tuple
+    """
+    return (" ".join(str(line1).split()).casefold(), " ".join(str(city).split()).casefold(),
+            str(state).strip().upper(), str(zipcode).strip())
+
+
+def _address_params(address: tuple) -> tuple:
+    line1, city, state, zipcode = address
+    return line1, '', city, state, zipcode
+
+
+class AddressCache:
+    """
+    A bounded cache of address ids keyed by normalized address.
+
+    The cache is warmed from the address table with a single scan. When it
+    holds more than ``max_size`` addresses, the least recently used ones
+    are dropped.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_ADDRESS_CACHE_SIZE):
+        self.max_size = max_size
+        self.warmed = False
+        self._ids = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[int]:
+        address_id = self._ids.get(key)
+        if address_id is not None:
+            self._ids.move_to_end(key)
+        return address_id
+
+    def put(self, key: tuple, address_id: int):
+        self._ids[key] = address_id
+        self._ids.move_to_end(key)
+        if len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def ids(self) -> list:
+        return list(self._ids.values())
+
+    def warm(self, db: Database, fetch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Load existing addresses with a single scan of the address table.
+        Only the first ``max_size`` addresses are kept.
+
+        :param db: the database to read from
+        :param fetch_size: the number of rows fetched at a time
+        """
+        db.open_connection()
+        with db.conn.cursor() as cursor:
+            cursor.execute("SELECT id, line1, city, state, zip FROM address")
+            while len(self._ids) < self.max_size:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    self._ids.setdefault(normalize_address(row[1], row[2], row[3], row[4]), row[0])
+        self.warmed = True
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class AddressResolver:
+    """
+    Resolves addresses to address ids in bulk.
+
+    Addresses are queued with add, which returns a key for the address.
+    Identical addresses share a key. resolve looks the queued addresses up in
+    the address cache, so addresses already in the database reuse their id,
+    then inserts the new addresses in batches, instead of an insert and a
+    SELECT LAST_INSERT_ID() per address. The database assigns the ids, which
+    are read back by normalized address from the rows after the maximum id
+    seen before the insert, so concurrent writers cannot collide with them.
+    """
+
+    def __init__(self, db: Database, batch_size: int = DEFAULT_BATCH_SIZE, cache: AddressCache = None):
+        self.db = db
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else AddressCache()
+        self._ids = {}
+        self._pending = {}
+
+    def add(self, line1: str, city: str, state: str, zipcode: str) -> tuple:
+        """
+        Queue an address to be resolved.
+
+        :return: the key of the address, used with id_for after resolve
+        """
+        key = normalize_address(line1, city, state, zipcode)
+        if key not in self._ids and key not in self._pending:
+            self._pending[key] = (line1, city, state, zipcode)
+        return key
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def resolve(self) -> dict:
+        """
+        Insert all queued addresses.
+
+        :return: the address ids keyed by address key
+        """
+        if not self._pending:
+            return self._ids
+        if not self.cache.warmed:
+            self.cache.warm(self.db)
+
+        new_addresses = {}
+        for key, address in self._pending.items():
+            address_id = self.cache.get(key)
+            if address_id is not None:
+                self._ids[key] = address_id
+            else:
+                new_addresses[key] = address
+        self._pending = {}
+        if not new_addresses:
+            return self._ids
+
+        last_id = self._max_address_id()
+        writer = BatchWriter(self.db, INSERT_ADDRESS_SQL, _address_params, batch_size=self.batch_size)
+        writer.write(new_addresses.values())
+
+        new_ids = self._new_address_ids(last_id, new_addresses)
+        for key, address_id in new_ids.items():
+            self._ids[key] = address_id
+            self.cache.put(key, address_id)
+        failed = len(new_addresses) - len(new_ids)
+        if failed:
+            print(f"{failed} addresses could not be created.")
+        return self._ids
+
+    def resolve_items(self, items: list, key_attr: str = 'address_key', attr: str = 'address_id') -> list:
+        """
+        Insert all queued addresses and set the address ids of items that hold
+        the key of their address, as returned by add.
+
+        :param items: the items, e.g. restaurants
+        :param key_attr: the attribute holding the key of the address
+        :param attr: the attribute set to the address id
+        :return: the items whose address was created
+        """
+        ids = self.resolve()
+        resolved = []
+        for item in items:
+            address_id = ids.get(getattr(item, key_attr))
+            if address_id is not None:
+                setattr(item, attr, address_id)
+                resolved.append(item)
+        return resolved
+
+    def id_for(self, key: tuple) -> Optional[int]:
+        """
+        Get the id of a resolved address.
+
+        :param key: the key returned by add
+        :return: the address id, or None if the address was not created
+        """
+        return self._ids.get(key)
+
+    def _new_address_ids(self, last_id: int, addresses: dict, fetch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+        """
+        Read back the ids the database assigned to inserted addresses.
+
+        :param last_id: the maximum address id before the insert
+        :param addresses: the inserted addresses keyed by address key
+        :param fetch_size: the number of rows fetched at a time
+        :return: the address ids keyed by address key, the lowest id of an address inserted more than once
+        """
+        ids = {}
+        self.db.open_connection()
+        with self.db.conn.cursor() as cursor:
+            cursor.execute(SELECT_NEW_ADDRESSES_SQL, [last_id])
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    key = normalize_address(row[1], row[2], row[3], row[4])
+                    if key in addresses:
+                        ids.setdefault(key, row[0])
+        return ids
+
+    def _max_address_id(self) -> int:
+        self.db.open_connection()
+        with self.db.conn.cursor() as cursor:
+            cursor.execute("SELECT MAX(id) FROM address")
+            max_id = cursor.fetchone()[0]
+        return max_id if max_id is not None else 0
@@ -0,0 +1,108 @@
+import re
+import time
+import logging as log
+
+from typing import Callable, Iterable, Optional
+
+from app.db.database import Database
+from app.common.constants import DEFAULT_BATCH_SIZE
+from app.common.stats import STATS
+from app.common.progress import NULL_PROGRESS
+from app.common.metrics import ROWS_WRITTEN, BATCH_SECONDS
+
+
+def _table_name(sql: str) -> str:
+    match = re.match(r"\s*INSERT\s+INTO\s+`?(\w+)`?", sql, re.IGNORECASE)
+    return match.group(1) if match else 'unknown'
+
+
+class BatchWriter:
+    """
+    Write rows to the database in transactions of ``batch_size`` rows.
+
+    Each batch is sent with a single ``executemany`` and committed. When a batch
+    fails, it is rolled back and split in half, and each half is retried in bulk.
+    This continues until the rows that cannot be written are isolated one by one
+    and handed to ``on_reject`` together with the database error.
+
+    A connection opened by the writer is closed when it is done. A connection
+    that was already open is left open, with autocommit turned back on.
+    """
+
+    def __init__(self, db: Database, sql: str, to_params: Callable, batch_size: int = DEFAULT_BATCH_SIZE,
+                 on_reject: Optional[Callable] = None, progress=NULL_PROGRESS):
+        """
+        :param db: the database to write to
+        :param sql: the parameterized insert statement
+        :param to_params: function converting an item into the statement parameters
+        :param batch_size: the number of rows per transaction
+        :param on_reject: called with (item, error) for every row that could not be written
+        :param progress: updated after every committed batch and rejected row
+        """
+        if batch_size < 1:
+            raise ValueError('Batch size must be greater than 0.')
+        self.db = db
+        self.sql = sql
+        self.to_params = to_params
+        self.batch_size = batch_size
+        self.on_reject = on_reject
+        self.progress = progress
+        self.table = _table_name(sql)
+        self.written = 0
+        self.rejected = 0
+
+    def write(self, items: Iterable) -> int:
+        """
+        Write all items, committing every ``batch_size`` rows.
+
+        :param items: the items to write
+        :return: the number of items written successfully
+        """
+        written = 0
+        owns_connection = self.db.conn is None
+        self.db.open_connection()
+        self.db.set_auto_commit(False)
+        try:
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    written += self._write_batch(batch)
+                    batch = []
+            if batch:
+                written += self._write_batch(batch)
+        finally:
+            if owns_connection:
+                self.db.close_connection()
+            else:
+                self.db.set_auto_commit(True)
+        return written
+
+    def _write_batch(self, batch: list) -> int:
+        import jaydebeapi
+        try:
+            start = time.perf_counter()
+            with STATS.timer('db.execute', rows=len(batch)), self.db.conn.cursor() as cursor:
+                cursor.executemany(self.sql, [self.to_params(item) for item in batch])
+            with STATS.timer('db.commit', rows=len(batch)):
+                self.db.conn.commit()
+            BATCH_SECONDS.observe(time.perf_counter() - start, table=self.table)
+            ROWS_WRITTEN.inc(len(batch), table=self.table)
+            self.written += len(batch)
+            self.progress.update(len(batch))
+            return len(batch)
+        except jaydebeapi.Error as ex:
+            self.db.conn.rollback()
+            if len(batch) == 1:
+                self._reject(batch[0], ex)
+                return 0
+            mid = len(batch) // 2
+            return self._write_batch(batch[:mid]) + self._write_batch(batch[mid:])
+
+    def _reject(self, item, ex: Exception):
+        self.rejected += 1
+        self.progress.update(1, rejected=1)
+        if self.on_reject is not None:
+            self.on_reject(item, ex)
+        else:
+            log.error(f"Could not write {item}: {ex}")
@@ -1,21 +1,33 @@
-
 import os
 
 from os import environ
-from dotenv import load_dotenv
 
 
 class Config:
-    def __init__(self):
-        load_dotenv(os.getenv('ENV_FILE') or '.env')
+    def __init__(self, env_file: str = None):
+        """
+        :param env_file: read the configuration from this .env file, without changing the process environment.
+                         By default, ENV_FILE or .env is loaded into the environment and the environment is used.
+        """
+        if env_file is None:
+            from dotenv import load_dotenv
+            load_dotenv(os.getenv('ENV_FILE') or '.env')
+            values = environ
+        else:
+            from dotenv import dotenv_values
+            if not os.path.isfile(env_file):
+                raise FileNotFoundError(f"No such env file: {env_file}")
+            values = {**environ, **{k: v for k, v in dotenv_values(env_file).items() if v is not None}}
         # Database configuration
-        self.db_user = environ.get('DATABASE_USERNAME')
-        self.db_password = environ.get('DATABASE_PASSWORD')
-        self.db_url = environ.get('DATABASE_URL')
-        self.db_driver = environ.get('DATABASE_DRIVER')
-        self.db_jarfile = environ.get('DATABASE_JARFILE')
+        self.db_user = values.get('DATABASE_USERNAME')
+        self.db_password = values.get('DATABASE_PASSWORD')
+        self.db_url = values.get('DATABASE_URL')
+        self.db_driver = values.get('DATABASE_DRIVER')
+        self.db_jarfile = values.get('DATABASE_JARFILE')
+        # JVM configuration, e.g. DATABASE_JVM_HEAP=512m, DATABASE_JVM_OPTIONS='-Xss1m -XX:+UseSerialGC'
+        self.db_jvm_heap = values.get('DATABASE_JVM_HEAP')
+        self.db_jvm_options = values.get('DATABASE_JVM_OPTIONS')
 
     def __str__(self):
         return f"driver: {self.db_driver}, jar: {self.db_jarfile}, url: {self.db_url}, " \
                 f"user: {self.db_user}, pass: {self.db_password}"
-
@@ -0,0 +1,162 @@
+import sys
+import argparse
+import logging as log
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from app.db.config import Config
+from app.db.database import Database
+from app.db.batch import BatchWriter
+from app.db.jvm import ensure_jvm
+from app.common.constants import DEFAULT_BATCH_SIZE
+from app.common.cli import add_run_arguments, setup_run
+from app.common.progress import start_progress, NULL_PROGRESS
+
+
+# Tables in foreign key order. A table only references tables of the previous levels,
+# so the tables of a level can be copied in parallel.
+COPY_LEVELS = [
+    ['user', 'address'],
+    ['owner', 'customer', 'driver'],
+    ['restaurant', 'delivery'],
+    ['order', 'menuitem'],
+]
+COPY_TABLES = [table for level in COPY_LEVELS for table in level]
+DEFAULT_COPY_WORKERS = 4
+
+
+def copy_levels(tables: list = None) -> list:
+    """
+    Order tables for copying.
+
+    :param tables: the tables to copy, None for all of COPY_TABLES
+    :return: the levels of COPY_LEVELS holding the tables, in foreign key order
+    """
+    if tables is None:
+        return [list(level) for level in COPY_LEVELS]
+    unknown = [table for table in tables if table not in COPY_TABLES]
+    if unknown:
+        raise ValueError(f"Cannot copy {', '.join(unknown)}. Tables: {', '.join(COPY_TABLES)}")
+    levels = [[table for table in level if table in tables] for level in COPY_LEVELS]
+    return [level for level in levels if level]
+
+
+def _is_binary(type_code) -> bool:
+    import jaydebeapi
+    return type_code is not None and type_code == jaydebeapi.BINARY
+
+
+def _fetch(cursor, fetch_size: int):
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def copy_table(source: Database, dest: Database, table: str, batch_size: int = DEFAULT_BATCH_SIZE,
+               on_reject: Callable = None, progress=NULL_PROGRESS) -> BatchWriter:
+    """
+    Stream the rows of a table from one database into the same table of another.
+
+    Rows are fetched ``batch_size`` at a time and inserted with a BatchWriter, so a
+    table is never held in memory. Binary columns, e.g. the user ids, are read with
+    HEX and written back with UNHEX.
+
+    :param source: the database to read from
+    :param dest: the database to write to
+    :param table: the table to copy
+    :param batch_size: the number of rows fetched and inserted at a time
+    :param on_reject: called with (row, error) for every row that could not be inserted
+    :param progress: updated after every inserted batch
+    :return: the writer, with the number of rows written and rejected
+    """
+    owns_connection = source.conn is None
+    source.open_connection()
+    try:
+        with source.conn.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM `{table}` WHERE 1 = 0")
+            columns = [(column[0], _is_binary(column[1])) for column in cursor.description]
+            select = ', '.join(f"HEX(`{name}`) AS `{name}`" if binary else f"`{name}`" for name, binary in columns)
+            names = ', '.join(f"`{name}`" for name, _ in columns)
+            values = ', '.join('UNHEX(?)' if binary else '?' for _, binary in columns)
+
+            writer = BatchWriter(dest, f"INSERT INTO `{table}` ({names}) VALUES ({values})", tuple,
+                                 batch_size=batch_size, on_reject=on_reject, progress=progress)
+            cursor.execute(f"SELECT {select} FROM `{table}`")
+            writer.write(_fetch(cursor, batch_size))
+            return writer
+    finally:
+        if owns_connection:
+            source.close_connection()
+
+
+def copy_tables(source_config: Config, dest_config: Config, tables: list = None,
+                batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_COPY_WORKERS,
+                database: Callable = Database, progress=NULL_PROGRESS, start_jvm: Callable = ensure_jvm) -> dict:
+    """
+    Copy tables from one database to another, level by level in foreign key order.
+    The tables of a level are copied in parallel, each worker with its own source and
+    destination connections. The JVM is started first, in this thread, with the JDBC
+    driver jars of both databases.
+
+    :param source_config: the configuration of the database to read from
+    :param dest_config: the configuration of the database to write to
+    :param tables: the tables to copy, None for all of COPY_TABLES
+    :param batch_size: the number of rows fetched and inserted at a time
+    :param workers: the maximum number of tables copied at the same time
+    :param database: creates a Database from a configuration
+    :param progress: updated with the rows copied from all tables
+    :param start_jvm: starts the JVM with the configurations of both databases
+    :return: the (written, rejected) row counts by table
+    """
+    if workers < 1:
+        raise ValueError('Workers must be greater than 0.')
+    start_jvm(source_config, dest_config)
+
+    def _copy(table):
+        source, dest = database(source_config), database(dest_config)
+        try:
+            writer = copy_table(source, dest, table, batch_size=batch_size, progress=progress)
+            log.info(f"Copied {writer.written} rows of {table}, {writer.rejected} rejected.")
+            return writer.written, writer.rejected
+        finally:
+            source.close_connection()
+            dest.close_connection()
+
+    results = {}
+    for level in copy_levels(tables):
+        with ThreadPoolExecutor(max_workers=min(workers, len(level))) as executor:
+            # a failed table stops the copy before the tables referencing it
+            for table, counts in zip(level, executor.map(_copy, level)):
+                results[table] = counts
+    return results
+
+
+def main(_args):
+    parser = argparse.ArgumentParser(description="Copy the producer tables from one database to another")
+    parser.add_argument('--source', type=str, required=True, metavar='ENV_FILE',
+                        help='.env file with the DATABASE_* variables of the database to copy from')
+    parser.add_argument('--dest', type=str, required=True, metavar='ENV_FILE',
+                        help='.env file with the DATABASE_* variables of the database to copy to')
+    parser.add_argument('--tables', type=str, nargs='+', choices=COPY_TABLES, metavar='TABLE',
+                        help=f"tables to copy, in any order. default all: {', '.join(COPY_TABLES)}")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'number of rows fetched and inserted at a time. default {DEFAULT_BATCH_SIZE}')
+    parser.add_argument('--workers', type=int, default=DEFAULT_COPY_WORKERS,
+                        help=f'maximum number of tables copied at the same time. default {DEFAULT_COPY_WORKERS}')
+    add_run_arguments(parser)
+    args = parser.parse_args(_args)
+    setup_run(args)
+
+    progress = start_progress(None, 'rows copied')
+    results = copy_tables(Config(args.source), Config(args.dest), tables=args.tables, batch_size=args.batch_size,
+                          workers=args.workers, progress=progress)
+    progress.finish()
+    for table, (written, rejected) in results.items():
+        print(f"{table}: {written} rows copied, {rejected} rejected")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
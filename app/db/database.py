@@ -1,9 +1,15 @@
 
 import sys
-import pymysql
+import weakref
 import logging as log
 
-import jaydebeapi
+from app.db.jvm import ensure_jvm
+from app.common.stats import STATS
+from app.common.metrics import OPEN_CONNECTIONS
+
+
+_databases = weakref.WeakSet()
+OPEN_CONNECTIONS.set_function(lambda: sum(1 for db in list(_databases) if db.conn is not None))
 
 
 class Database:
@@ -14,17 +20,24 @@ class Database:
         self.db_password = config.db_password
         self.db_driver = config.db_driver
         self.db_jarfile = config.db_jarfile
+        self.config = config
         self.conn = None
+        _databases.add(self)
 
     def open_connection(self):
+        # jaydebeapi loads JPype, so it is only imported once a connection is needed
+        import pymysql
+        import jaydebeapi
         try:
             if self.conn is None:
-                self.conn = jaydebeapi.connect(
-                    self.db_driver,
-                    self.db_url,
-                    {'user': self.db_user, 'password': self.db_password},
-                    self.db_jarfile
-                )
+                with STATS.timer('db.connect'):
+                    ensure_jvm(self.config)
+                    self.conn = jaydebeapi.connect(
+                        self.db_driver,
+                        self.db_url,
+                        {'user': self.db_user, 'password': self.db_password},
+                        self.db_jarfile
+                    )
         except pymysql.MySQLError as e:
             print('Could not connect to the database. '
                   'Check environment variables and database accessibility.')
@@ -33,10 +46,21 @@ class Database:
         finally:
             log.info('Connection opened successfully.')
 
+    def close_connection(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+            log.info('Database connection closed.')
+
+    def set_auto_commit(self, auto_commit: bool):
+        self.open_connection()
+        self.conn.jconn.setAutoCommit(auto_commit)
+
     def run_query(self, query):
+        import pymysql
         try:
             self.open_connection()
-            with self.conn.cursor() as cur:
+            with STATS.timer('db.query'), self.conn.cursor() as cur:
                 records = []
                 cur.execute(query)
                 result = cur.fetchall()
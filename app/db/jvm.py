@@ -0,0 +1,67 @@
+import os
+import threading
+import logging as log
+
+
+_lock = threading.Lock()
+# the classpath the JVM was started with by ensure_jvm
+_started_classpath = []
+
+
+def jvm_args(config) -> list:
+    """
+    Get the JVM options for a database configuration.
+
+    :param config: the database configuration
+    :return: the JVM options
+    """
+    args = []
+    if config.db_jvm_heap:
+        args.append(f"-Xmx{config.db_jvm_heap}")
+    if config.db_jvm_options:
+        args += config.db_jvm_options.split()
+    return args
+
+
+def jvm_classpath(*configs) -> list:
+    """
+    Get the JVM classpath for database configurations: the JDBC driver jars
+    of all the configurations, without duplicates, followed by the entries of
+    the CLASSPATH environment variable.
+
+    :param configs: the database configurations
+    :return: the classpath entries
+    """
+    classpath = []
+    for config in configs:
+        if config.db_jarfile and config.db_jarfile not in classpath:
+            classpath.append(config.db_jarfile)
+    if os.environ.get('CLASSPATH'):
+        classpath += os.environ['CLASSPATH'].split(os.path.pathsep)
+    return classpath
+
+
+def ensure_jvm(*configs):
+    """
+    Start the JVM used by the JDBC driver, if it is not running yet. The JVM
+    can only be started once per process, so every Database shares it and
+    jaydebeapi reuses it instead of starting its own. jaydebeapi cannot add
+    jars to a running JVM, so a program connecting to several databases
+    passes all their configurations before the first connection.
+
+    :param configs: the database configurations, the JVM options are taken from the first one
+    """
+    import jpype
+    with _lock:
+        if jpype.isJVMStarted():
+            missing = [config.db_jarfile for config in configs
+                       if config.db_jarfile and config.db_jarfile not in _started_classpath]
+            if missing:
+                log.warning(f"The JVM is already running, {', '.join(missing)} is not on its classpath.")
+            return
+        args = jvm_args(configs[0])
+        classpath = jvm_classpath(*configs)
+        log.info(f"Starting JVM with {' '.join(args) or 'default options'}, classpath: {classpath}")
+        jpype.startJVM(jpype.getDefaultJVMPath(), *args, classpath=classpath,
+                       ignoreUnrecognized=True, convertStrings=True)
+        _started_classpath.extend(classpath)
@@ -1,12 +1,14 @@
 import argparse
 import logging as log
 
-from jaydebeapi import Error
-
 from app.db.config import Config
 from app.db.database import Database
 from app.driver.model import Driver
+from app.common.refdata import reference_data
 from app.producers.helpers import print_items_and_confirm
+from app.common.cli import add_run_arguments, setup_run
+from app.common.progress import start_progress
+from app.common.metrics import ROWS_GENERATED, ROWS_WRITTEN
 
 
 class DriverArgParser:
@@ -21,6 +23,7 @@ First and last names are pulled from a file, which can be specified using comman
         self.parser.add_argument("--last-names", type=str,
                                  help="Filepath to a txt document with a list of last names to draw from")
         self.parser.add_argument("--num", type=int, help="Number of drivers to create")
+        add_run_arguments(self.parser)
 
     def get_args(self):
         return self.parser.parse_args()
@@ -35,8 +38,8 @@ class DriverProducer:
         self.user_ids = self.get_driver_users()
         self.address_ids = self.get_address_ids()
 
-        self.first_names = self.get_items_from_file(self.first_name_path)
-        self.last_names = self.get_items_from_file(self.last_name_path)
+        self.first_names = reference_data("first_names", self.first_name_path)
+        self.last_names = reference_data("last_names", self.last_name_path)
 
         if len(self.user_ids) == 0:
             log.error("No users are present in the database that can be assigned as drivers!")
@@ -58,6 +61,7 @@ class DriverProducer:
             return clean_lines
 
     def get_address_ids(self):
+        from jaydebeapi import Error
         try:
             with self.database.conn.cursor() as cursor:
                 records = []
@@ -72,6 +76,7 @@ class DriverProducer:
             print(e)
 
     def get_driver_users(self):
+        from jaydebeapi import Error
         try:
             with self.database.conn.cursor() as cursor:
                 records = []
@@ -98,13 +103,20 @@ class DriverProducer:
                 driver = Driver()
                 driver.create_random(self)
                 created.append(driver)
+                ROWS_GENERATED.inc(entity='driver')
 
             answer = print_items_and_confirm(items=created, item_type="drivers")
             num_created = 0
             if answer.strip().lower() == "y":
+                progress = start_progress(len(created), "drivers saved")
                 for driver in created:
                     if driver.save(self.database):
                         num_created += 1
+                        ROWS_WRITTEN.inc(table='driver')
+                        progress.update()
+                    else:
+                        progress.update(rejected=1)
+                progress.finish()
 
                 print(f"Created {num_created} drivers in the database!")
             else:
@@ -112,10 +124,10 @@ class DriverProducer:
 
 
 def main():
+    args = vars(DriverArgParser().get_args())
+    setup_run(args)
     db = Database(Config())
     db.open_connection()
-
-    args = vars(DriverArgParser().get_args())
     producer = DriverProducer(db, args["first_names"], args["last_names"])
     producer.create_drivers(args["num"])
 
@@ -2,6 +2,8 @@ import argparse
 
 from app.driver.model import Driver
 from app.ingestBase import Ingest
+from app.common.schema import DRIVER_SCHEMA
+from app.common.cli import add_run_arguments, setup_run
 
 
 class DriverIngestArgParser:
@@ -9,25 +11,27 @@ class DriverIngestArgParser:
         self.parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter,
                                               description="""Ingests driver data from a CSV, XML, or JSON file.
 The required fields are address_id,first_name,last_name,phone,dob,license_num,rating,status""")
-        self.parser.add_argument("--path", type=str, help="Filepath to the csv, json, or xml to import")
+        self.parser.add_argument("--path", type=str,
+                                 help="Filepath to the csv, json, xml, arrow, or msgpack file to import")
+        self.parser.add_argument("--rejects", type=str, help="Filepath to write rejected records to")
+        self.parser.add_argument("--workers", type=int, default=1,
+                                 help="Number of processes to parse a large CSV file with")
+        add_run_arguments(self.parser)
 
     def get_args(self):
         return self.parser.parse_args()
 
 
-def handle_data(ingest: Ingest, data: dict):
-    return [
-        data["user_id"], data["address_id"], data["first_name"], data["last_name"], data["phone"],
-        data["dob"], data["license_num"], data["rating"], data["status"],
-    ]
-
-
 def main():
+    # args are in Driver constructor order, so rows are used to construct drivers directly
     args = ["user_id", "address_id", "first_name", "last_name", "phone", "dob", "license_num", "rating", "status"]
     user_args = vars(DriverIngestArgParser().get_args())
+    setup_run(user_args)
     path = user_args["path"] or "./app/data/driver-ingest-test.csv"
 
-    ingest = Ingest(path, args, "drivers", Driver, handle_data)
+    ingest = Ingest(path, args, "drivers", Driver, None, user_args["rejects"],
+                    converters=DRIVER_SCHEMA.converters, workers=user_args["workers"],
+                    table=DRIVER_SCHEMA.name)
     ingest.parse()
 
 
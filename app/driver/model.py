@@ -1,9 +1,12 @@
 import random
 from datetime import date
 
-from jaydebeapi import Error
-
 from app.db.database import Database
+from app.common.schema import DRIVER_SCHEMA
+
+
+INSERT_DRIVER_SQL = DRIVER_SCHEMA.insert_sql('driver')
+_driver_params = DRIVER_SCHEMA.params_getter()
 
 
 class Driver:
@@ -16,7 +19,8 @@ class Driver:
                  dob: str = None,
                  license_num: str = None,
                  rating: float = None,
-                 status: str = None
+                 status: str = None,
+                 picture: str = None
                  ):
         self.id = id
         self.address_id = address_id
@@ -28,6 +32,7 @@ class Driver:
         self.license_num = license_num
         self.rating = rating
         self.status = status
+        self.picture = picture
 
     def create_random(self, producer):
         self.id = random.choice(producer.user_ids)
@@ -42,17 +47,10 @@ class Driver:
         self.status = "waiting"
 
     def save(self, database: Database):
+        from jaydebeapi import Error
         try:
             with database.conn.cursor() as cursor:
-                sql = "INSERT INTO driver (id, address_id, first_name, last_name, " \
-                      "phone, dob, license_num, rating, picture, status) " \
-                      "VALUES (UNHEX(?),?,?,?,?,?,?,?,?,?)"
-                values = (
-                    self.id, self.address_id, self.first_name, self.last_name,
-                    self.phone, self.dob, self.license_num, self.rating, "https://temp.url/", "active"
-                )
-
-                cursor.execute(sql, values)
+                cursor.execute(INSERT_DRIVER_SQL, _driver_params(self))
                 cursor.close()
                 return True
         except Error as e:
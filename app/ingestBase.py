@@ -1,49 +1,157 @@
 import csv
-import json
-import xml.etree.ElementTree as ET
+import operator
 from typing import List
 
-from jaydebeapi import Error
-
 from app.db.config import Config
 from app.db.database import Database
+from app.db.addresses import AddressResolver
 from app.producers.helpers import print_items_and_confirm
+from app.common.rejects import RejectSink, RejectReason, reject_format_for
 from app.restaurant.model import Restaurant
+from app.common.schema import RESTAURANT_SCHEMA, RequiredFields
+from app.common.stats import STATS
+from app.common.progress import start_progress
+from app.common.metrics import ROWS_WRITTEN
+from app.common.fileformat import resolve_format, open_file
+from app.common.columnar import read_batches
+from app.common.records import read_records
+from app.common.xmlformat import iter_elements
+from app.common.jsonformat import get_json_backend
+from app.common.parallel import iter_csv_rows
+
+VALID_TYPES = ["csv", "json", "xml", "arrow", "msgpack"]
+
+
+class RowPlan:
+    """
+    A column plan, compiled once per file from the file's column mapping.
 
-VALID_TYPES = ["csv", "json", "xml"]
+    The plan holds the position of each target arg in a row and the converter
+    for each field, so a row is turned into a tuple of converted values, in
+    target_args order, with a single itemgetter call.
+    """
+
+    def __init__(self, mapping: List[str], target_args: List[str], converters: dict = None):
+        """
+        :param mapping: the name of each column in the file, None for columns that are not used
+        :param target_args: the names of the values to extract
+        :param converters: functions to convert string values, keyed by target arg
+        """
+        positions = {}
+        for i, name in enumerate(mapping):
+            if name is not None:
+                positions.setdefault(name, i)
+
+        self.mapping = mapping
+        self.target_args = target_args
+        self.converters = converters
+        self.width = max(positions.values()) + 1 if positions else 0
+        self.missing = [arg for arg in target_args if arg not in positions]
+        indices = [positions[arg] for arg in target_args if arg in positions]
+        if not indices:
+            self._getter = lambda row: ()
+        elif len(indices) == 1:
+            index = indices[0]
+            self._getter = lambda row: (row[index],)
+        else:
+            self._getter = operator.itemgetter(*indices)
+        converters = converters or {}
+        self._converters = [(i, converters[arg]) for i, arg in enumerate(target_args) if arg in converters]
+
+    def extract(self, row) -> tuple:
+        """
+        Extract and convert the target values from a row.
+
+        :param row: a csv row
+        :return: the converted values in target_args order
+        """
+        values = self._getter(row)
+        if not self._converters:
+            return values
+        values = list(values)
+        for i, convert in self._converters:
+            values[i] = convert(values[i])
+        return tuple(values)
+
+    def __reduce__(self):
+        # the getters are lambdas, a plan is pickled for worker processes by recompiling it
+        return RowPlan, (self.mapping, self.target_args, self.converters)
+
+
+class _RowExtractor:
+    """
+    Extracts the values of csv rows in worker processes. Rows that are too
+    short for the plan are returned as they are, to be rejected.
+    """
+
+    def __init__(self, plan: RowPlan):
+        self.plan = plan
+
+    def __call__(self, row: list):
+        if len(row) < self.plan.width:
+            return row
+        return self.plan.extract(row)
 
 
 class Ingest:
     """
-    filepath - Path to the file to parse, must have an extension that matches one of VALID_TYPES
+    filepath - Path to the file to parse, must have an extension that matches one of VALID_TYPES, optionally
+               followed by a compression extension (.gz, .bz2, .xz, .zst)
     target_args - List of names to look for in a file, will be passed as a dict to handle_data
     item - One of the data models with a save method
-    handle_data - A method to call for each item, should return a list to be used to construct item
+    handle_data - A method to call for each item, should return a list to be used to construct item.
+                  If None, the values of target_args are used to construct the item directly
+    reject_path - Optional file to write rejected records to, csv for csv input, otherwise ndjson
+    converters - Optional functions to convert string values, keyed by target arg
+    before_save - Optional method called with the items once the user confirms, returns the items to save
+    workers - Optional number of processes to parse a large csv file with
+    table - Optional name of the table the items are saved to, labels the rows written metric. Defaults to the
+            lower case name of the item class
     """
 
-    def __init__(self, filepath: str, target_args: List[str], item_type: str, item, handle_data):
-        self.type = filepath[filepath.rfind(".") + 1:]
+    def __init__(self, filepath: str, target_args: List[str], item_type: str, item, handle_data,
+                 reject_path: str = None, converters: dict = None, before_save=None, workers: int = 1,
+                 table: str = None):
+        self.type = resolve_format(filepath).format
         self.path = filepath
         self.target_args = target_args
         self.item = item
         self.handle_data = handle_data
         self.item_type = item_type
+        self.converters = converters or {}
+        self.before_save = before_save
+        self.workers = workers
+        self.table = table if table is not None or item is None else item.__name__.lower()
+        self._plan = None
+        self._dict_plan = RowPlan(target_args, target_args, self.converters)
+        self._dict_fields = RequiredFields(target_args)
+        self._dict_getter = operator.itemgetter(*target_args) if len(target_args) > 1 else \
+            (lambda entry: (entry[target_args[0]],))
 
         if self.type not in VALID_TYPES:
             valid = ", ".join(VALID_TYPES)
             print(f"\"{self.type}\" is not a valid file type. Please use one of the following: {valid}")
             exit()
+        self.rejects = RejectSink(reject_path, fmt=reject_format_for(self.type), fields=target_args)
         self.database = Database(Config())
         self.database.open_connection()
+        self.address_resolver = AddressResolver(self.database)
 
     def parse(self):
         data = []
-        if self.type == "csv":
-            data = self.handle_csv()
-        elif self.type == "json":
-            data = self.handle_json()
-        elif self.type == "xml":
-            data = self.handle_xml()
+        with STATS.timer(f"ingest.parse_{self.type}") as timer:
+            if self.type == "csv":
+                data = self.handle_csv()
+            elif self.type == "json":
+                data = self.handle_json()
+            elif self.type == "xml":
+                data = self.handle_xml()
+            elif self.type == "arrow":
+                data = self.handle_arrow()
+            elif self.type == "msgpack":
+                data = self.handle_msgpack()
+            timer.rows = len(data)
+        self.rejects.close()
 
         self.create_and_save(data)
 
@@ -55,145 +163,197 @@ class Ingest:
         answer = print_items_and_confirm(items=items, item_type=self.item_type)
         num_created = 0
         if answer.strip().lower() == "y":
-            for item in items:
-                if item.save(self.database):
-                    num_created += 1
+            if self.before_save is not None:
+                with STATS.timer("ingest.before_save", rows=len(items)):
+                    items = self.before_save(self, items)
+            progress = start_progress(len(items), f"{self.item_type} saved")
+            with STATS.timer("ingest.save", rows=len(items)):
+                for item in items:
+                    if item.save(self.database):
+                        num_created += 1
+                        ROWS_WRITTEN.inc(table=self.table)
+                        progress.update()
+                    else:
+                        progress.update(rejected=1)
+            progress.finish()
             print(f"Created {num_created} {self.item_type} in the database")
 
     def try_resolve_csv_headers(self, row: List[str]):
-        default_mapping = []
-        for i in range(len(self.target_args)):
-            default_mapping.append(self.target_args[i])
-
-        mapping = []
-        for i in range(len(row)):
-            if row[i] in default_mapping:
-                mapping.append(row[i])
-
-        use_default = False
-        for key in default_mapping:
-            if key not in mapping:
-                default_format = ", ".join(self.target_args)
-                print("CSV is either header-less, or is missing some required fields");
-                print(f"Using default format: {default_format}")
-                use_default = True
-                break
-
-        if use_default:
-            return [True, default_mapping]
-        else:
-            return [False, mapping]
+        """
+        Map the columns of a csv header to target args. Columns that are not
+        target args are mapped to None. If the header does not contain all
+        target args, the file is assumed to be header-less and in target_args order.
+
+        :param row: the first row of the file
+        :return: [is_default, mapping]
+        """
+        targets = set(self.target_args)
+        mapping = [name if name in targets else None for name in row]
+
+        if not targets.issubset(row):
+            default_format = ", ".join(self.target_args)
+            print("CSV is either header-less, or is missing some required fields")
+            print(f"Using default format: {default_format}")
+            return [True, list(self.target_args)]
+        return [False, mapping]
+
+    def _compile_plan(self, mapping: List[str]) -> RowPlan:
+        if self._plan is None or self._plan.mapping is not mapping:
+            self._plan = RowPlan(mapping, self.target_args, self.converters)
+        return self._plan
+
+    def _build(self, values: tuple):
+        if self.handle_data is None:
+            return values
+        return self.handle_data(self, dict(zip(self.target_args, values)))
 
     def parse_row(self, row, row_number, mapping):
-        data_dict = {}
-        if len(row) < len(mapping):
-            print(f"CSV data length miss-match, got {len(row)}, needed {len(mapping)} for row {row_number}")
+        plan = self._compile_plan(mapping)
+        if len(row) < plan.width:
+            self._reject_short_row(row, row_number, plan)
+            return
+        if plan.missing:
+            self.rejects.reject(row, RejectReason.MISSING_FIELD,
+                                f"{plan.missing[0]} is missing in CSV row {row_number}")
             return
-        for j in range(len(mapping)):
-            data_dict[mapping[j]] = row[j]
 
-        # Make sure that all values are present
-        is_valid = True
-        for arg in self.target_args:
-            if arg not in data_dict.keys():
-                print(f"{arg} is missing in CSV row {row_number}")
-                is_valid = False
-                break
+        return self._build(plan.extract(row))
 
-        if is_valid:
-            parsed = self.handle_data(self, data_dict)
-            return parsed
+    def _reject_short_row(self, row, row_number, plan: RowPlan):
+        self.rejects.reject(row, RejectReason.FIELD_COUNT, f"CSV data length miss-match, got {len(row)}, "
+                                                           f"needed {plan.width} for row {row_number}")
+
+    def _parse_dict(self, entry: dict, missing_message: str):
+        missing = self._dict_fields.missing(entry)
+        if missing is not None:
+            self.rejects.reject(entry, RejectReason.MISSING_FIELD, missing_message.format(missing))
+            return
+        return self._build(self._dict_plan.extract(self._dict_getter(entry)))
 
     def handle_json(self):
         parsed_data = []
-        print(self.path)
-        with open(self.path) as json_file:
-            data = json.load(json_file)
+        with open_file(self.path, "rb") as json_file:
+            data = get_json_backend(fastest=True).loads(json_file.read())
             for entry in data:
-                is_valid = True
-
-                for arg in self.target_args:
-                    if arg not in entry:
-                        is_valid = False
-                        print(f"Entry is missing key {arg}")
-
-                if is_valid:
-                    parsed_data.append(self.handle_data(self, entry))
+                parsed = self._parse_dict(entry, "Entry is missing key {}")
+                if parsed is not None:
+                    parsed_data.append(parsed)
 
         return parsed_data
 
     def handle_csv(self):
-        rows = []
-        with open(self.path) as csv_file:
+        with open_file(self.path, newline="") as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=',')
-            for row in csv_reader:
-                rows.append(row)
+            header = next(csv_reader, None)
+            if header is None:
+                print("Target file appears to have no data")
+                exit()
+            [is_default, mapping] = self.try_resolve_csv_headers(header)
+            self.rejects.fields = mapping if is_default else header
+            if self.workers > 1 and not self._compile_plan(mapping).missing:
+                return self._handle_csv_parallel(mapping, is_default)
+
+            data = []
+            if is_default:
+                parsed = self.parse_row(header, 0, mapping)
+                if parsed is not None:
+                    data.append(parsed)
+            for i, row in enumerate(csv_reader, start=1):
+                parsed = self.parse_row(row, i, mapping)
+                if parsed is not None:
+                    data.append(parsed)
 
-        header = rows[0]
-        if header is None:
-            print("Target file appears to have no data")
-            exit()
-        [is_default, mapping] = self.try_resolve_csv_headers(header)
-        data = []
-        for i in range(len(rows)):
-            if not is_default and i == 0:
-                continue
-            parsed = self.parse_row(rows[i], i, mapping)
-            if parsed is not None:
-                data.append(parsed)
+        return data
 
+    def _handle_csv_parallel(self, mapping: List[str], is_default: bool):
+        """
+        Parse and convert the rows of a csv file in worker processes, see iter_csv_rows.
+        Rejects and handle_data run in this process, in file order, as the rows arrive.
+        """
+        start = 0
+        if not is_default:
+            with open_file(self.path, 'rb') as csv_file:
+                start = len(csv_file.readline())
+
+        plan = self._compile_plan(mapping)
+        data = []
+        rows = iter_csv_rows(self.path, _RowExtractor(plan), self.workers, start)
+        for i, values in enumerate(rows, start=0 if is_default else 1):
+            if type(values) is list:
+                self._reject_short_row(values, i, plan)
+            else:
+                data.append(self._build(values))
         return data
 
-    def handle_xml(self):
-        tree = ET.parse(self.path)
-        data = tree.getroot()
-        item_data = []
-        for entry in data:
-            data_dict = {}
-            # print(key.tag, key.attrib, key.text)
-            for key in entry:
-                data_dict[key.tag] = key.text
+    def handle_arrow(self):
+        """
+        Parse a columnar file, one record batch at a time. Columns are mapped
+        to target args by name, values are used without text parsing.
+        """
+        data = []
+        row_number = 0
+        with open_file(self.path, "rb") as arrow_file:
+            for names, columns in read_batches(arrow_file):
+                self.rejects.fields = names
+                for row in zip(*columns):
+                    parsed = self.parse_row(row, row_number, names)
+                    if parsed is not None:
+                        data.append(parsed)
+                    row_number += 1
 
-            is_valid = True
-            for arg in self.target_args:
-                if arg not in data_dict:
-                    print(f"{arg} is missing!")
-                    is_valid = False
+        return data
 
-            if is_valid:
-                item_data.append(self.handle_data(self, data_dict))
+    def handle_msgpack(self):
+        """
+        Parse a msgpack record file. Fields are mapped to target args by the
+        names in the first record, values are used without text parsing.
+        """
+        data = []
+        with open_file(self.path, "rb") as msgpack_file:
+            records = read_records(msgpack_file)
+            names = next(records, None)
+            if names is None:
+                print("Target file appears to have no data")
+                exit()
+            self.rejects.fields = names
+            for i, row in enumerate(records):
+                parsed = self.parse_row(row, i, names)
+                if parsed is not None:
+                    data.append(parsed)
 
-        return item_data
+        return data
 
+    def handle_xml(self):
+        # the file is read before any entry is parsed, so a malformed file fails without rejects
+        with open_file(self.path, "rb") as xml_file:
+            entries = list(iter_elements(xml_file))
+        item_data = []
+        for entry in entries:
+            parsed = self._parse_dict(entry, "{} is missing!")
+            if parsed is not None:
+                item_data.append(parsed)
 
-def create_address(database, street, city, state, zip):
-    uid = 0
-    try:
-        with database.conn.cursor() as cursor:
-            sql = "INSERT INTO address (line1,line2,city,state,zip) " \
-                  "VALUES (?,?,?,?,?);"
-            cursor.execute(sql, (street, "", city, state, zip))
-            cursor.execute("SELECT LAST_INSERT_ID();")
-            uid = cursor.fetchall()[0][0]
-            cursor.close()
-    except Error as e:
-        print(e)
-    finally:
-        return uid
+        return item_data
 
 
 def handle_data(ingest: Ingest, data: dict):
-    address_id = create_address(ingest.database, data["street"], data["city"], data["state"], data["zip"])
+    address_key = ingest.address_resolver.add(data["street"], data["city"], data["state"], data["zip"])
     return [
-        None, address_id, data["owner_id"], data["name"], float(data["rating"]),
-        int(data["price_category"]), data["phone"], int(data["is_active"]), data["picture"]
+        None, None, data["owner_id"], data["name"], data["rating"],
+        data["price_category"], data["phone"], data["is_active"], data["picture"], address_key
     ]
 
 
+def resolve_addresses(ingest: Ingest, restaurants: list) -> list:
+    return ingest.address_resolver.resolve_items(restaurants)
+
+
 def main():
     args = ["street", "city", "state", "zip", "owner_id", "name", "rating", "price_category",
             "phone", "is_active", "picture"]
-    ingest = Ingest("./app/data/restaurants-ingest-test.xml", args, "restaurants", Restaurant, handle_data)
+    ingest = Ingest("./app/data/restaurants-ingest-test.xml", args, "restaurants", Restaurant, handle_data,
+                    converters=RESTAURANT_SCHEMA.converters, before_save=resolve_addresses,
+                    table=RESTAURANT_SCHEMA.name)
     ingest.parse()
 
 
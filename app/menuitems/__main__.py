@@ -0,0 +1,7 @@
+import sys
+
+from app.menuitems.main import main
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,58 @@
+import json
+
+from typing import Type
+from app.menuitems.model import MenuItem
+from app.common.formatter import AbstractFormatter
+from app.common.schema import MENUITEM_SCHEMA
+
+
+class MenuItemFormatter(AbstractFormatter[MenuItem]):
+    schema = MENUITEM_SCHEMA
+
+    class MenuItemJsonDecoder(json.JSONDecoder):
+        def __init__(self, *args, **kwargs):
+            json.JSONDecoder.__init__(self, object_hook=MenuItemFormatter.MenuItemJsonDecoder._object_hook,
+                                      *args, **kwargs)
+
+        @classmethod
+        def _object_hook(cls, dct) -> MenuItem:
+            return MenuItem(*MENUITEM_SCHEMA.convert_fields([cls._get(dct, name) for name in MENUITEM_SCHEMA.names]))
+
+        @classmethod
+        def _get(cls, dct, name):
+            # null stays None rather than becoming the string 'None'
+            if name in dct and dct[name] is None:
+                return None
+            return AbstractFormatter.get_attr_or_throw(dct, name)
+
+    class MenuItemJsonEncoder(json.JSONEncoder):
+        def default(self, obj):
+            return obj.__dict__
+
+    def get_json_encoder(self) -> Type[MenuItemJsonEncoder]:
+        return MenuItemFormatter.MenuItemJsonEncoder
+
+    def get_json_decoder(self) -> Type[MenuItemJsonDecoder]:
+        return MenuItemFormatter.MenuItemJsonDecoder
+
+    def get_attr_list(self):
+        return MENUITEM_SCHEMA.names
+
+    def get_object_type(self) -> Type[MenuItem]:
+        return MenuItem
+
+    def create_object_from_string_fields(self, fields: list[str]):
+        return MenuItem(*MENUITEM_SCHEMA.convert_fields(fields))
+
+    def create_object_from_string_dict(self, _dict) -> MenuItem:
+        return MenuItem(*MENUITEM_SCHEMA.convert_dict(_dict))
+
+    def to_xml_rows(self, items: list[MenuItem]) -> list:
+        """
+        Get the attribute values of menu items for an xml writer. Missing
+        values are written as empty elements, which are read back as None.
+
+        :param items: the menu items
+        :return: the attribute values of each item, in attribute list order
+        """
+        return [['' if value is None else value for value in row] for row in super().to_xml_rows(items)]
@@ -0,0 +1,73 @@
+import random
+
+from itertools import repeat
+from app.menuitems.model import MenuItem
+from app.common.metrics import ROWS_GENERATED
+
+
+MIN_ITEMS = 50
+MAX_ITEMS = 200
+
+ADJECTIVES = ('Classic', 'Spicy', 'Grilled', 'Crispy', 'Smoked', 'Roasted', 'Garlic', 'Honey Glazed',
+              'Lemon Pepper', 'Sweet Chili', 'Truffle', 'Loaded', 'House', 'Chef\'s', 'Teriyaki', 'Cajun')
+DISHES = ('Burger', 'Chicken Sandwich', 'Pizza', 'Tacos', 'Burrito', 'Ramen', 'Pad Thai', 'Fried Rice',
+          'Salad', 'Wings', 'Pasta', 'Salmon', 'Steak', 'Curry', 'Dumplings', 'Quesadilla', 'Fries',
+          'Soup', 'Nachos', 'Sushi Roll', 'Meatballs', 'Pork Chop', 'Shrimp', 'Wrap')
+SIDES = ('fries', 'rice', 'a side salad', 'seasonal vegetables', 'mashed potatoes', 'garlic bread',
+         'coleslaw', 'chips')
+SIZES = (None, 'Small', 'Medium', 'Large')
+# most items are not discounted
+DISCOUNTS = (None, 0.05, 0.1, 0.15, 0.2, 0.25)
+DISCOUNT_WEIGHTS = (80, 4, 6, 4, 4, 2)
+# menu prices from 3.99 to 39.99
+PRICES = tuple(round(dollars + 0.99, 2) for dollars in range(3, 40))
+
+
+class MenuItemGenerator:
+    @classmethod
+    def generate_menu_item(cls, restaurant_id: int) -> MenuItem:
+        """
+        Generate a MenuItem object.
+
+        :param restaurant_id: int id of restaurant
+        :return: the MenuItem
+        """
+        return cls.generate_menu(restaurant_id, 1)[0]
+
+    @classmethod
+    def generate_menu(cls, restaurant_id: int, count: int) -> list[MenuItem]:
+        """
+        Generate the menu items of a restaurant. Each field is drawn for the
+        whole menu at once, rather than item by item.
+
+        :param restaurant_id: int id of restaurant
+        :param count: the number of items to generate
+        :return: the MenuItems
+        """
+        adjectives = random.choices(ADJECTIVES, k=count)
+        dishes = random.choices(DISHES, k=count)
+        names = [f"{adjective} {dish}" for adjective, dish in zip(adjectives, dishes)]
+        descriptions = [f"{name} served with {side}" for name, side in zip(names, random.choices(SIDES, k=count))]
+        prices = random.choices(PRICES, k=count)
+        available = random.choices((1, 0), weights=(9, 1), k=count)
+        sizes = random.choices(SIZES, k=count)
+        discounts = random.choices(DISCOUNTS, weights=DISCOUNT_WEIGHTS, k=count)
+        ROWS_GENERATED.inc(count, entity='menuitem')
+        return list(map(MenuItem, repeat(None, count), repeat(restaurant_id, count), names, prices,
+                        repeat(None, count), descriptions, available, sizes, discounts))
+
+    @classmethod
+    def generate_menus(cls, restaurant_ids: list, min_items: int = MIN_ITEMS,
+                       max_items: int = MAX_ITEMS) -> list[MenuItem]:
+        """
+        Generate a menu for each restaurant, with a random number of items.
+
+        :param restaurant_ids: int ids of restaurants
+        :param min_items: the minimum number of items of a menu
+        :param max_items: the maximum number of items of a menu
+        :return: the MenuItems of all restaurants, restaurant by restaurant
+        """
+        items = []
+        for restaurant_id in restaurant_ids:
+            items += cls.generate_menu(restaurant_id, random.randint(min_items, max_items))
+        return items
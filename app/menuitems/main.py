@@ -0,0 +1,91 @@
+import os
+import sys
+
+from app.db.config import Config
+from app.db.database import Database
+from app.menuitems.parser import MenuItemsArgParser
+from app.menuitems.producer import MenuItemProducer
+from app.menuitems.producer import get_restaurant_ids
+from app.menuitems.formatter import MenuItemFormatter
+from app.menuitems.generator import MenuItemGenerator
+from app.common.cli import setup_run
+from app.common.export import run_export
+from app.common.schema import MENUITEM_SCHEMA
+
+
+def main(_args):
+    parser = MenuItemsArgParser(_args)
+    args = parser.args
+    setup_run(args)
+    if args.command == 'export':
+        run_export(args, MENUITEM_SCHEMA, 'menuitem', MenuItemFormatter())
+        return
+
+    database = Database(Config())
+    producer = MenuItemProducer(database)
+
+    producer.set_short_output(args.short)
+    producer.set_pretty_output(args.pretty)
+    producer.set_output_limit(args.limit)
+    producer.set_batch_size(args.batch_size)
+    producer.set_reject_file(args.rejects)
+
+    # run producer program
+    if args.command == 'produce':
+        min_items, max_items = args.per_restaurant
+        if min_items < 1 or max_items < min_items:
+            print("The items per restaurant must be a range of counts greater than 0.")
+            return
+        if args.restaurants is not None and args.restaurants < 1:
+            print("A restaurant count greater than 0 must be provided.")
+            return
+
+        rest_ids = get_restaurant_ids(database, limit=args.restaurants)
+        if len(rest_ids) == 0:
+            print('There are no restaurants in the database. Please add some.')
+            return
+
+        producer.produce_random(rest_ids=rest_ids, min_items=min_items, max_items=max_items)
+
+    # run ingestor program
+    elif args.command == 'ingest':
+        producer.set_workers(args.workers)
+        producer.set_json_backend(args.json_backend)
+
+        def _check_file(file):
+            if not os.path.isfile(file):
+                print(f"{file} does not exist.")
+                sys.exit(1)
+
+        if args.convert:
+            _check_file(args.convert[0])
+            producer.convert_files(in_file=args.convert[0], out_file=args.convert[1])
+            return
+
+        item = MenuItemGenerator.generate_menu_item(restaurant_id=5678)
+        item.id = 1234
+
+        if args.csv_format:
+            print('ID,RESTAURANT_ID,NAME,PRICE,PICTURE,DESCRIPTION,IS_AVAILABLE,SIZE,DISCOUNT')
+            print(MenuItemFormatter().to_csv([item]))
+            print(os.linesep + 'Headers should not be included in the file.')
+            return
+        if args.json_format:
+            print(MenuItemFormatter().to_json([item]))
+            return
+        if args.xml_format:
+            print(MenuItemFormatter().to_xml([item]))
+            return
+
+        def _produce_from_file(file, _produce_func):
+            _check_file(file)
+            _produce_func(file)
+
+        if args.csv:
+            _produce_from_file(args.csv, producer.produce_from_csv)
+        elif args.json:
+            _produce_from_file(args.json, producer.produce_from_json)
+        elif args.xml:
+            _produce_from_file(args.xml, producer.produce_from_xml)
+        elif args.arrow:
+            _produce_from_file(args.arrow, producer.produce_from_arrow)
@@ -0,0 +1,42 @@
+
+
+class MenuItem:
+    id = None
+    restaurant_id = None
+    name = None
+    price = None
+    picture = None
+    description = None
+    is_available = None
+    size = None
+    discount = None
+
+    def __init__(self, item_id, restaurant_id: int, name: str, price: float, picture, description,
+                 is_available: int, size, discount):
+        """
+        Constructor for creating a MenuItem.
+
+        :param item_id: int id of the menu item, None for a new item
+        :param restaurant_id: int id of restaurant
+        :param name: string name of the item
+        :param price: float price of the item
+        :param picture: string picture url, or None
+        :param description: string description, or None
+        :param is_available: 1 if the item can be ordered, otherwise 0
+        :param size: string size, or None
+        :param discount: float discount as a fraction of the price, or None
+        """
+        self.id = item_id
+        self.restaurant_id = restaurant_id
+        self.name = name
+        self.price = price
+        self.picture = picture
+        self.description = description
+        self.is_available = is_available
+        self.size = size
+        self.discount = discount
+
+    def __str__(self):
+        return f"id: {self.id}, restaurant_id: {self.restaurant_id}, name: {self.name}, price: {self.price}, " \
+               f"picture: {self.picture}, description: {self.description}, is_available: {self.is_available}, " \
+               f"size: {self.size}, discount: {self.discount}"
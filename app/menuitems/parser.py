@@ -0,0 +1,123 @@
+import argparse
+
+from argparse import RawTextHelpFormatter
+from app.common.constants import DEFAULT_OUTPUT_LIMIT
+from app.common.constants import DEFAULT_BATCH_SIZE
+from app.common.cli import add_run_arguments
+from app.common.jsonformat import add_json_backend_argument
+from app.menuitems.generator import MIN_ITEMS, MAX_ITEMS
+
+
+class MenuItemsArgParser:
+    def __init__(self, args):
+
+        self.parser = argparse.ArgumentParser(formatter_class=RawTextHelpFormatter,
+                                              description="""Run Menu Item producer or ingestion programs.
+
+Menu item producer and ingestion programs can be run using either the 'produce'
+argument or the 'ingest' argument. Tables can be exported to data files with
+the 'export' argument. To see the help menu for these programs, append --help
+to the program name.
+
+examples:
+
+    python -m app.menuitems ingest --help
+    python -m app.menuitems produce --help
+    python -m app.menuitems export --help""")
+        subparsers = self.parser.add_subparsers(help='commands', dest='command')
+
+        produce_parser = subparsers.add_parser('produce', help='run menu item producer program',
+                                               formatter_class=RawTextHelpFormatter,
+                                               description=f"""Generate random menus in MySQL database.
+
+Menu items belong to a restaurant. A menu of {MIN_ITEMS} to {MAX_ITEMS} random items is created
+for every restaurant in the database, or for the first restaurants, by id, with
+the --restaurants option. The number of items per restaurant can be changed with
+--per-restaurant.
+
+Output can be controlled with --pretty, --short, and --limit options.
+
+examples:
+
+    python -m app.menuitems produce
+    python -m app.menuitems produce --restaurants 10 --per-restaurant 20 40
+    python -m app.menuitems produce --batch-size 2000 --short""")
+        produce_parser.add_argument('--restaurants', type=int, metavar='COUNT',
+                                    help='number of restaurants to create menus for. default all')
+        produce_parser.add_argument('--per-restaurant', type=int, nargs=2, metavar=('MIN', 'MAX'),
+                                    default=[MIN_ITEMS, MAX_ITEMS],
+                                    help=f"range of items per restaurant. default {MIN_ITEMS} {MAX_ITEMS}")
+        produce_parser.add_argument('--short', action='store_true', help='print short output for menu items')
+        produce_parser.add_argument('--pretty', action='store_true', help='print pretty output for menu items')
+        produce_parser.add_argument('--limit', type=int, help='limit the menu item creation output. default 10',
+                                    default=DEFAULT_OUTPUT_LIMIT)
+        produce_parser.add_argument('--batch-size', type=int, help='menu items saved per transaction. default 500',
+                                    default=DEFAULT_BATCH_SIZE)
+        produce_parser.add_argument('--rejects', type=str, metavar='FILE', help='file for menu items that fail to save')
+        add_run_arguments(produce_parser)
+
+        ingest_parser = subparsers.add_parser('ingest', help='run menu item ingestion program',
+                                              formatter_class=RawTextHelpFormatter,
+                                              description="""Generate menu item data in MySQL database from data files.
+
+A CSV, JSON, XML, or columnar arrow file with a dataset may be provided as an
+argument using the --csv, --json, --xml, or --arrow option, respectively. To see
+the expected format, use the --<type>-format option. Files may also be converted
+from one format to another.
+
+If any items from the files have ids already in the database, or restaurant ids
+not in the database, the item will not be created.
+
+Output can be controlled with --pretty, --short, and --limit options.
+
+examples:
+
+    python -m app.menuitems ingest --csv menuitems.csv --short --limit 5
+    python -m app.menuitems ingest --json menuitems.json --short
+    python -m app.menuitems ingest --xml menuitems.xml --pretty
+    python -m app.menuitems ingest --json-format
+    python -m app.menuitems ingest --convert menuitems.csv menuitems.json""")
+        ingest_parser.add_argument('--csv', type=str, help='a CSV file with menu item data.')
+        ingest_parser.add_argument('--csv-format', action='store_true', help='show CSV format')
+        ingest_parser.add_argument('--json', type=str, help='a JSON file with menu item data.')
+        ingest_parser.add_argument('--json-format', action='store_true', help='show the JSON format')
+        ingest_parser.add_argument('--xml', type=str, help='an XML file with menu item data.')
+        ingest_parser.add_argument('--xml-format', action='store_true', help='show the XML format')
+        ingest_parser.add_argument('--arrow', type=str, help='a columnar arrow file with menu item data.')
+        ingest_parser.add_argument('--convert', nargs=2, metavar=('FROM', 'TO'), type=str,
+                                   help='convert one file format to another.')
+        ingest_parser.add_argument('--short', action='store_true', help='print short output for menu items')
+        ingest_parser.add_argument('--pretty', action='store_true', help='print pretty output for menu items')
+        ingest_parser.add_argument('--limit', type=int, help='limit the menu item creation output. default 10',
+                                   default=DEFAULT_OUTPUT_LIMIT)
+        ingest_parser.add_argument('--batch-size', type=int, help='menu items saved per transaction. default 500',
+                                   default=DEFAULT_BATCH_SIZE)
+        ingest_parser.add_argument('--rejects', type=str, metavar='FILE', help='file for menu items that fail to save')
+        ingest_parser.add_argument('--workers', type=int, default=1,
+                                   help='processes to parse a large CSV file with. default 1')
+        add_json_backend_argument(ingest_parser)
+        add_run_arguments(ingest_parser)
+
+        export_parser = subparsers.add_parser('export', help='run menu item export program',
+                                              formatter_class=RawTextHelpFormatter,
+                                              description="""Export the menuitem table to a data file.
+
+Rows are read from the database in chunks and written as CSV, JSON, XML,
+columnar arrow, or msgpack records, depending on the file extension, in the
+same format the ingest program reads.
+The export may be split into several files, written in parallel, with --parts.
+
+examples:
+
+    python -m app.menuitems export menuitems.csv
+    python -m app.menuitems export menuitems.json --parts 4""")
+        export_parser.add_argument('file', type=str,
+                                   help='the file to export to (.csv, .json, .xml, .arrow, or .msgpack)')
+        export_parser.add_argument('--parts', type=int, default=1,
+                                   help='number of files to split the export into, e.g. menuitems.part1.csv. default 1')
+        export_parser.add_argument('--fetch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                                   help='menu items read from the database at a time. default 500')
+        add_json_backend_argument(export_parser)
+        add_run_arguments(export_parser)
+
+        self.args = self.parser.parse_args(args)
@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import logging as log
+
+from typing import Type
+from app.db.batch import BatchWriter
+from app.db.database import Database
+from app.menuitems.model import MenuItem
+from app.menuitems.formatter import MenuItemFormatter
+from app.menuitems.generator import MenuItemGenerator, MIN_ITEMS, MAX_ITEMS
+from app.common.producer import AbstractProducer
+from app.common.fileformat import open_file
+from app.common.exceptions import MissingAttributeException
+from app.common.rejects import RejectReason
+from app.common.schema import MENUITEM_SCHEMA
+from app.common.stats import timed
+
+
+INSERT_MENUITEM_SQL = MENUITEM_SCHEMA.insert_sql('menuitem', exclude=('id',))
+INSERT_MENUITEM_WITH_ID_SQL = MENUITEM_SCHEMA.insert_sql('menuitem')
+_menuitem_params = MENUITEM_SCHEMA.params_getter(exclude=('id',))
+_menuitem_with_id_params = MENUITEM_SCHEMA.params_getter()
+
+
+class MenuItemProducer(AbstractProducer[MenuItem]):
+    def __init__(self, db: Database):
+        super(MenuItemProducer, self).__init__(db)
+        self._rest_ids = None
+        self._item_ids = None
+
+    def save(self, item: MenuItem):
+        return self.save_menu_item(item)
+
+    def save_menu_item(self, item: MenuItem) -> bool:
+        """
+        Create a row in the menuitem table.
+
+        :param item: the menu item to save
+        :return: true if the item was saved successfully, otherwise false
+        """
+        import jaydebeapi
+        try:
+            self.db.open_connection()
+            with self.db.conn.cursor() as cursor:
+                if item.id is None:
+                    cursor.execute(INSERT_MENUITEM_SQL, _menuitem_params(item))
+                else:
+                    cursor.execute(INSERT_MENUITEM_WITH_ID_SQL, _menuitem_with_id_params(item))
+            return True
+        except jaydebeapi.DatabaseError as ex:
+            print(f"{os.linesep}Problem occurred saving menu item: {item}{os.linesep}")
+            log.error(ex)
+            return False
+        finally:
+            if self.db.conn:
+                self.db.conn.close()
+                self.db.conn = None
+                log.info('Database connection closed.')
+
+    def save_all(self, items: list[MenuItem]) -> int:
+        """
+        Create menu item rows in batches. Items with and without ids are written
+        with separate statements. Items that cannot be saved are rejected
+        without failing the rest of their batch.
+
+        :param items: the menu items to save
+        :return: the number of items saved
+        """
+        new_items = [item for item in items if item.id is None]
+        existing_items = [item for item in items if item.id is not None]
+        saved = 0
+        if new_items:
+            writer = BatchWriter(self.db, INSERT_MENUITEM_SQL, _menuitem_params, batch_size=self.batch_size,
+                                 on_reject=self._reject, progress=self.progress)
+            saved += writer.write(new_items)
+        if existing_items:
+            writer = BatchWriter(self.db, INSERT_MENUITEM_WITH_ID_SQL, _menuitem_with_id_params,
+                                 batch_size=self.batch_size, on_reject=self._reject, progress=self.progress)
+            saved += writer.write(existing_items)
+        return saved
+
+    def produce_random(self, rest_ids: list, min_items: int = MIN_ITEMS, max_items: int = MAX_ITEMS):
+        """
+        Create a random menu for each restaurant. The restaurant ids are taken
+        from the database, so the items are not validated.
+
+        :param rest_ids: the ids of the restaurants to create menus for
+        :param min_items: the minimum number of items per restaurant
+        :param max_items: the maximum number of items per restaurant
+        """
+        if len(rest_ids) == 0:
+            return
+        self._open_rejects('csv')
+        items = MenuItemGenerator.generate_menus(rest_ids, min_items=min_items, max_items=max_items)
+        self._confirm_and_save(items)
+
+    def produce_from_csv(self, csv_path: str):
+        """
+        Create menu items from a csv file. The csv file should be in the format (no header)
+        id,restaurant_id,name,price,picture,description,is_available,size,discount
+
+        The id, picture, description, size and discount may be empty.
+
+        :param csv_path: the path to the csv file
+        """
+        self._open_rejects('csv')
+        try:
+            _items = MenuItemFormatter().read_csv_file(csv_path, workers=self.workers)
+        except IndexError:
+            print(f"There are missing fields. Rows must contain all properties.")
+            _items = []
+
+        items = [item for item in _items if self._validate_menu_item(item)]
+        self._confirm_and_save(items)
+
+    def produce_from_json(self, json_file: str):
+        """
+        Create menu items from a json file. All fields are required, they may be null.
+
+        :param json_file: the path to the json file
+        """
+        self._open_rejects('json')
+        with open_file(json_file) as f:
+            try:
+                _items = MenuItemFormatter().from_json(f.read())
+            except json.decoder.JSONDecodeError:
+                print('JSON is not valid format.')
+                sys.exit(1)
+            except MissingAttributeException as k_ex:
+                print(f"Menu item missing {k_ex}. All fields are required.")
+                sys.exit(1)
+            except ValueError as v_ex:
+                print(v_ex)
+                sys.exit(1)
+
+        items = [item for item in _items if self._validate_menu_item(item)]
+        self._confirm_and_save(items)
+
+    def produce_from_xml(self, xml_file: str):
+        """
+        Create menu items from an xml file. All fields must be present, they may be empty.
+
+        :param xml_file: the path to the xml file
+        """
+        import xml.etree.ElementTree
+        self._open_rejects('xml')
+        with open_file(xml_file, 'rb') as f:
+            try:
+                _items = MenuItemFormatter().read_xml(f)
+            except xml.etree.ElementTree.ParseError as p_ex:
+                print(f"Malformed XML: {p_ex}")
+                sys.exit(1)
+            except MissingAttributeException as k_ex:
+                print(f"Menu item missing {k_ex}. All fields are required.")
+                sys.exit(1)
+
+        items = [item for item in _items if self._validate_menu_item(item)]
+        self._confirm_and_save(items)
+
+    def produce_from_arrow(self, arrow_file: str):
+        """
+        Create menu items from a columnar file. All fields are required.
+
+        :param arrow_file: the path to the columnar file
+        """
+        self._open_rejects('arrow')
+        with open_file(arrow_file, 'rb') as f:
+            try:
+                _items = MenuItemFormatter().read_columnar(f)
+            except MissingAttributeException as k_ex:
+                print(f"Menu item missing {k_ex}. All fields are required.")
+                sys.exit(1)
+            except ValueError as v_ex:
+                print(v_ex)
+                sys.exit(1)
+
+        items = [item for item in _items if self._validate_menu_item(item)]
+        self._confirm_and_save(items)
+
+    @timed('validate')
+    def _validate_menu_item(self, item: MenuItem) -> bool:
+        """
+        Validate a menu item to make sure its restaurant is in the database,
+        and its id, if it has one, is not. The ids are read from the database
+        once, the menu item ids only when an item with an id is validated.
+
+        :param item: the MenuItem to validate
+        :return: True if the item is valid or False if it is not
+        """
+        if item.id is not None:
+            if self._item_ids is None:
+                self._item_ids = set(get_menu_item_ids(self.db))
+            if item.id in self._item_ids:
+                self.rejects.reject(item, RejectReason.DUPLICATE_ID, f"Menu item with id {item.id} already exists.")
+                return False
+        if self._rest_ids is None:
+            self._rest_ids = set(get_restaurant_ids(self.db))
+        if item.restaurant_id not in self._rest_ids:
+            self.rejects.reject(item, RejectReason.UNKNOWN_RESTAURANT,
+                                f"Restaurant with id {item.restaurant_id} does not exist.")
+            return False
+        return True
+
+    def get_formatter(self) -> MenuItemFormatter:
+        return MenuItemFormatter()
+
+    def get_object_type(self) -> Type[MenuItem]:
+        return MenuItem
+
+
+def _get_ids(db: Database, sql: str) -> list:
+    results = db.run_query(sql)
+    return list(map(lambda result: result[0], results))
+
+
+def get_menu_item_ids(db: Database) -> list:
+    return _get_ids(db, "SELECT id FROM menuitem")
+
+
+def get_restaurant_ids(db: Database, limit: int = None) -> list:
+    """
+    Get restaurant ids in a single scan of the primary key index, in id order.
+
+    :param db: the database
+    :param limit: the maximum number of ids, all of them by default
+    :return: the restaurant ids
+    """
+    sql = "SELECT id FROM restaurant ORDER BY id"
+    return _get_ids(db, sql if limit is None else f"{sql} LIMIT {int(limit)}")
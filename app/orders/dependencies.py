@@ -4,7 +4,7 @@ import string
 import random
 
 from app.db.database import Database
-from app.producers.users import UserGenerator
+from app.users.generator import UserGenerator
 
 
 class GeneratedIds:
@@ -292,6 +292,7 @@ class DeliveryData:
         curr_id = get_last_insert_id(db, 'delivery')
 
         db.open_connection()
+        db.conn.jconn.setAutoCommit(False)
         with db.conn.cursor() as cursor:
             for _ in range(count):
                 driver_id = random.choice(driver_ids)
@@ -301,6 +302,7 @@ class DeliveryData:
                                "VALUES (?, ?, UNHEX(?))",
                                (curr_id, address_id, driver_id))
                 delivery_ids.append(curr_id)
+        db.conn.commit()
         db.conn.close()
         db.conn = None
         return GeneratedIds(deliv_ids=delivery_ids, user_ids=driver_ids, addr_ids=address_ids)
@@ -1,6 +1,7 @@
 import uuid
 
 from app.orders.model import Order
+from app.common.metrics import ROWS_GENERATED
 
 
 class OrderGenerator:
@@ -15,5 +16,6 @@ class OrderGenerator:
         :return: the Order
         """
         conf_code = str(uuid.uuid4()).replace('-', '')[0:10]
+        ROWS_GENERATED.inc(entity='order')
         return Order(order_id=None, customer_id=cust_id, restaurant_id=restaurant_id, delivery_id=deliv_id,
                      confirmation_code=conf_code)
@@ -12,17 +12,27 @@ from app.orders.producer import get_restaurant_ids
 from app.orders.formatter import OrderFormatter
 from app.orders.generator import OrderGenerator
 from app.orders.dependencies import OrderDependencies
+from app.common.cli import setup_run
+from app.common.export import run_export
+from app.common.schema import ORDER_SCHEMA
 
 
 def main(_args):
-    database = Database(Config())
-    producer = OrderProducer(database)
     parser = OrdersArgParser(_args)
     args = parser.args
+    setup_run(args)
+    if args.command == 'export':
+        run_export(args, ORDER_SCHEMA, '`order`', OrderFormatter())
+        return
+
+    database = Database(Config())
+    producer = OrderProducer(database)
 
     producer.set_short_output(args.short)
     producer.set_pretty_output(args.pretty)
     producer.set_output_limit(args.limit)
+    producer.set_batch_size(args.batch_size)
+    producer.set_reject_file(args.rejects)
 
     # run producer program
     if args.command == 'produce':
@@ -56,6 +66,9 @@ def main(_args):
 
     # run ingestor program
     elif args.command == 'ingest':
+        producer.set_workers(args.workers)
+        producer.set_json_backend(args.json_backend)
+
         def _check_file(file):
             if not os.path.isfile(file):
                 print(f"{file} does not exist.")
@@ -91,3 +104,5 @@ def main(_args):
             _produce_from_file(args.json, producer.produce_from_json)
         elif args.xml:
             _produce_from_file(args.xml, producer.produce_from_xml)
+        elif args.arrow:
+            _produce_from_file(args.arrow, producer.produce_from_arrow)
@@ -2,6 +2,9 @@ import argparse
 
 from argparse import RawTextHelpFormatter
 from app.common.constants import DEFAULT_OUTPUT_LIMIT
+from app.common.constants import DEFAULT_BATCH_SIZE
+from app.common.cli import add_run_arguments
+from app.common.jsonformat import add_json_backend_argument
 
 
 class OrdersArgParser:
@@ -11,13 +14,15 @@ class OrdersArgParser:
                                               description="""Run Order producer or ingestion programs.
 
 Order producer and ingestion programs can be run using either the 'produce'
-argument or the 'ingest' argument. To see the help menu for these programs,
-append --help to the program name.
+argument or the 'ingest' argument. Tables can be exported to data files with
+the 'export' argument. To see the help menu for these programs, append --help
+to the program name.
 
 examples:
 
     python -m app.orders ingest --help
-    python -m app.orders produce --help""")
+    python -m app.orders produce --help
+    python -m app.orders export --help""")
         subparsers = self.parser.add_subparsers(help='commands', dest='command')
 
         produce_parser = subparsers.add_parser('produce', help='run user producer program',
@@ -44,14 +49,19 @@ examples:
         produce_parser.add_argument('--pretty', action='store_true', help='print pretty output for orders')
         produce_parser.add_argument('--limit', type=int, help='limit the order creation output. default 10',
                                     default=DEFAULT_OUTPUT_LIMIT)
+        produce_parser.add_argument('--batch-size', type=int, help='orders saved per transaction. default 500',
+                                    default=DEFAULT_BATCH_SIZE)
+        produce_parser.add_argument('--rejects', type=str, metavar='FILE', help='file for orders that fail to save')
+        add_run_arguments(produce_parser)
 
         ingest_parser = subparsers.add_parser('ingest', help='run user ingestion program',
                                               formatter_class=RawTextHelpFormatter,
                                               description="""Generate order data in MySQL database from data files.
 
-A CSV, JSON, or XML file with a dataset may be provided as an argument using the
---csv, --json, or --xml option, respectively. To see the expected format, use the
---<type>-format option. Files may also be converted from one format to another.
+A CSV, JSON, XML, or columnar arrow file with a dataset may be provided as an
+argument using the --csv, --json, --xml, or --arrow option, respectively. To see
+the expected format, use the --<type>-format option. Files may also be converted
+from one format to another.
 
 If any items from the files have order ids already in the database, or customer,
 restaurant, delivery ids not in the database, the order will not be created.
@@ -64,18 +74,50 @@ examples:
     python -m app.orders ingest --json orders.json --short
     python -m app.orders ingest --xml orders.xml --pretty
     python -m app.orders ingest --json-format
-    python -m app.orders ingest --convert orders.csv orders.json""")
+    python -m app.orders ingest --convert orders.csv orders.json
+    python -m app.orders ingest --convert orders.csv orders.arrow
+    python -m app.orders ingest --convert orders.csv orders.msgpack""")
         ingest_parser.add_argument('--csv', type=str, help='a CSV file with order data.')
         ingest_parser.add_argument('--csv-format', action='store_true', help='show CSV format')
         ingest_parser.add_argument('--json', type=str, help='a JSON file with order data.')
         ingest_parser.add_argument('--json-format', action='store_true', help='show the JSON format')
         ingest_parser.add_argument('--xml', type=str, help='an XML file with order data.')
         ingest_parser.add_argument('--xml-format', action='store_true', help='show the XML format')
+        ingest_parser.add_argument('--arrow', type=str, help='a columnar arrow file with order data.')
         ingest_parser.add_argument('--convert', nargs=2, metavar=('FROM', 'TO'), type=str,
                                    help='convert one file format to another.')
         ingest_parser.add_argument('--short', action='store_true', help='print short output for orders')
         ingest_parser.add_argument('--pretty', action='store_true', help='print pretty output for orders')
         ingest_parser.add_argument('--limit', type=int, help='limit the order creation output. default 10',
                                    default=DEFAULT_OUTPUT_LIMIT)
+        ingest_parser.add_argument('--batch-size', type=int, help='orders saved per transaction. default 500',
+                                   default=DEFAULT_BATCH_SIZE)
+        ingest_parser.add_argument('--rejects', type=str, metavar='FILE', help='file for orders that fail to save')
+        ingest_parser.add_argument('--workers', type=int, default=1,
+                                   help='processes to parse a large CSV file with. default 1')
+        add_json_backend_argument(ingest_parser)
+        add_run_arguments(ingest_parser)
+
+        export_parser = subparsers.add_parser('export', help='run order export program',
+                                              formatter_class=RawTextHelpFormatter,
+                                              description="""Export the order table to a data file.
+
+Rows are read from the database in chunks and written as CSV, JSON, XML,
+columnar arrow, or msgpack records, depending on the file extension, in the
+same format the ingest program reads.
+The export may be split into several files, written in parallel, with --parts.
+
+examples:
+
+    python -m app.orders export orders.csv
+    python -m app.orders export orders.json --parts 4""")
+        export_parser.add_argument('file', type=str,
+                                   help='the file to export to (.csv, .json, .xml, .arrow, or .msgpack)')
+        export_parser.add_argument('--parts', type=int, default=1,
+                                   help='number of files to split the export into, e.g. orders.part1.csv. default 1')
+        export_parser.add_argument('--fetch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                                   help='orders read from the database at a time. default 500')
+        add_json_backend_argument(export_parser)
+        add_run_arguments(export_parser)
 
         self.args = self.parser.parse_args(args)
@@ -1,18 +1,27 @@
 import sys
 import json
 import random
-import pymysql
 import logging as log
-import xml.etree.ElementTree
 
 from typing import Type
+from app.db.batch import BatchWriter
 from app.db.database import Database
 from app.orders.model import Order
 from app.orders.formatter import OrderFormatter
 from app.orders.generator import OrderGenerator
 from app.common.producer import AbstractProducer
+from app.common.fileformat import open_file
 from app.common.constants import DEFAULT_OUTPUT_LIMIT
 from app.common.exceptions import MissingAttributeException
+from app.common.rejects import RejectReason
+from app.common.schema import ORDER_SCHEMA
+from app.common.stats import timed
+
+
+INSERT_ORDER_SQL = ORDER_SCHEMA.insert_sql('`order`', exclude=('id',))
+INSERT_ORDER_WITH_ID_SQL = ORDER_SCHEMA.insert_sql('`order`')
+_order_params = ORDER_SCHEMA.params_getter(exclude=('id',))
+_order_with_id_params = ORDER_SCHEMA.params_getter()
 
 
 class OrderProducer(AbstractProducer[Order]):
@@ -33,20 +42,14 @@ class OrderProducer(AbstractProducer[Order]):
 
         :param order: the order to save
         """
+        import pymysql
         try:
             self.db.open_connection()
             with self.db.conn.cursor() as cursor:
                 if order.id is None:
-                    cursor.execute(
-                        "INSERT INTO `order` (customer_id,restaurant_id,delivery_id,confirmation_code) "
-                        "VALUES (UNHEX(?), ?, ?, ?)",
-                        (order.customer_id, order.restaurant_id, order.delivery_id, order.confirmation_code))
+                    cursor.execute(INSERT_ORDER_SQL, _order_params(order))
                 else:
-                    cursor.execute(
-                        "INSERT INTO `order` "
-                        "(id,customer_id,restaurant_id,delivery_id,confirmation_code) "
-                        "VALUES (?, UNHEX(?), ?, ?, ?)",
-                        (order.id, order.customer_id, order.restaurant_id, order.delivery_id, order.confirmation_code))
+                    cursor.execute(INSERT_ORDER_WITH_ID_SQL, _order_with_id_params(order))
             return True
         except pymysql.MySQLError as ex:
             print(f"Problem occurred saving order: {order}")
@@ -57,6 +60,28 @@ class OrderProducer(AbstractProducer[Order]):
                 self.db.conn = None
                 log.info('Database connection closed.')
 
+    def save_all(self, orders: list[Order]) -> int:
+        """
+        Create order rows in batches. Orders with and without ids are written
+        with separate statements. Orders that cannot be saved are rejected
+        without failing the rest of their batch.
+
+        :param orders: the orders to save
+        :return: the number of orders saved
+        """
+        new_orders = [order for order in orders if order.id is None]
+        existing_orders = [order for order in orders if order.id is not None]
+        saved = 0
+        if new_orders:
+            writer = BatchWriter(self.db, INSERT_ORDER_SQL, _order_params, batch_size=self.batch_size,
+                                 on_reject=self._reject, progress=self.progress)
+            saved += writer.write(new_orders)
+        if existing_orders:
+            writer = BatchWriter(self.db, INSERT_ORDER_WITH_ID_SQL, _order_with_id_params,
+                                 batch_size=self.batch_size, on_reject=self._reject, progress=self.progress)
+            saved += writer.write(existing_orders)
+        return saved
+
     def produce_random(self, num_orders: int, cust_ids: list, deliv_ids: list, rest_ids: list):
         """
         Create random items. Customer ids will be chosen randomly to create items.
@@ -69,6 +94,7 @@ class OrderProducer(AbstractProducer[Order]):
         """
         if len(cust_ids) == 0 or len(deliv_ids) == 0 or rest_ids == 0:
             return
+        self._open_rejects('csv')
 
         orders = []
         for _ in range(num_orders):
@@ -87,19 +113,17 @@ class OrderProducer(AbstractProducer[Order]):
 
         :param csv_path: the path to the csv file
         """
+        self._open_rejects('csv')
         orders = []
-        with open(csv_path) as file:
-            try:
-                _orders = OrderFormatter().from_csv(file.read())
-            except IndexError:
-                print(f"There are missing fields. Rows must contain all properties.")
-                _orders = []
-
-            for order in _orders:
-                if not self._validate_order(order):
-                    print("Order will not be created.")
-                else:
-                    orders.append(order)
+        try:
+            _orders = OrderFormatter().read_csv_file(csv_path, workers=self.workers)
+        except IndexError:
+            print(f"There are missing fields. Rows must contain all properties.")
+            _orders = []
+
+        for order in _orders:
+            if self._validate_order(order):
+                orders.append(order)
 
         self._confirm_and_save(orders)
 
@@ -109,8 +133,9 @@ class OrderProducer(AbstractProducer[Order]):
 
         :param json_file: the path to the json file
         """
+        self._open_rejects('json')
         orders = []
-        with open(json_file) as f:
+        with open_file(json_file) as f:
             try:
                 _orders = OrderFormatter().from_json(f.read())
             except json.decoder.JSONDecodeError:
@@ -124,9 +149,7 @@ class OrderProducer(AbstractProducer[Order]):
                 sys.exit(1)
 
         for order in _orders:
-            if not self._validate_order(order):
-                print("Order will not be created.")
-            else:
+            if self._validate_order(order):
                 orders.append(order)
 
         self._confirm_and_save(orders)
@@ -137,10 +160,12 @@ class OrderProducer(AbstractProducer[Order]):
 
         :param xml_file: the path to the xml file
         """
+        import xml.etree.ElementTree
+        self._open_rejects('xml')
         orders = []
-        with open(xml_file) as f:
+        with open_file(xml_file, 'rb') as f:
             try:
-                _orders = OrderFormatter().from_xml(f.read())
+                _orders = OrderFormatter().read_xml(f)
             except xml.etree.ElementTree.ParseError as p_ex:
                 print(f"Malformed XML: {p_ex}")
                 sys.exit(1)
@@ -149,13 +174,32 @@ class OrderProducer(AbstractProducer[Order]):
                 sys.exit(1)
 
         for order in _orders:
-            if not self._validate_order(order):
-                print("Order will not be created.")
-            else:
+            if self._validate_order(order):
                 orders.append(order)
 
         self._confirm_and_save(orders)
 
+    def produce_from_arrow(self, arrow_file):
+        """
+        Create orders from a columnar file. All fields are required.
+
+        :param arrow_file: the path to the columnar file
+        """
+        self._open_rejects('arrow')
+        with open_file(arrow_file, 'rb') as f:
+            try:
+                _orders = OrderFormatter().read_columnar(f)
+            except MissingAttributeException as k_ex:
+                print(f"Order missing {k_ex}. All fields are required.")
+                sys.exit(1)
+            except ValueError as v_ex:
+                print(v_ex)
+                sys.exit(1)
+
+        orders = [order for order in _orders if self._validate_order(order)]
+        self._confirm_and_save(orders)
+
+    @timed('validate')
     def _validate_order(self, order: Order) -> bool:
         """
         Validate order to make sure it contains valid referential ids.
@@ -166,16 +210,19 @@ class OrderProducer(AbstractProducer[Order]):
         :return: True if the order is valid or False if it is not
         """
         if order.id in self._order_ids:
-            print(f"Order with id {order.id} already exists.")
+            self.rejects.reject(order, RejectReason.DUPLICATE_ID, f"Order with id {order.id} already exists.")
             return False
         if order.customer_id not in self._cust_ids:
-            print(f"Customer with id {order.customer_id} does not exist.")
+            self.rejects.reject(order, RejectReason.UNKNOWN_CUSTOMER,
+                                f"Customer with id {order.customer_id} does not exist.")
             return False
         if order.restaurant_id not in self._rest_ids:
-            print(f"Restaurant with id {order.restaurant_id} does not exist.")
+            self.rejects.reject(order, RejectReason.UNKNOWN_RESTAURANT,
+                                f"Restaurant with id {order.restaurant_id} does not exist.")
             return False
         if order.delivery_id not in self._deliv_ids:
-            print(f"Delivery with id {order.delivery_id} does not exist.")
+            self.rejects.reject(order, RejectReason.UNKNOWN_DELIVERY,
+                                f"Delivery with id {order.delivery_id} does not exist.")
             return False
         return True
 
@@ -1,6 +1,6 @@
 import os
-import distutils
-from distutils import util
+
+from app.common.converters import to_bool
 
 
 def print_items_and_confirm(items: list, item_type: str, print_limit: int = 10,
@@ -39,4 +39,4 @@ def print_items_and_confirm(items: list, item_type: str, print_limit: int = 10,
 
 
 def string_to_bool(bool_str: str) -> bool:
-    return bool(distutils.util.strtobool(bool_str))
+    return to_bool(bool_str)
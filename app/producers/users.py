@@ -18,6 +18,7 @@ from app.db.config import Config
 from app.db.database import Database
 from app.producers.helpers import string_to_bool
 from app.producers.helpers import print_items_and_confirm
+from app.common.fileformat import resolve_format, open_file
 
 
 class UsersArgParser:
@@ -363,7 +364,7 @@ class UsersProducer:
         :param csv_path: the path to the csv file
         """
         users = []
-        with open(csv_path) as file:
+        with open_file(csv_path) as file:
             try:
                 users += UserFormatter.from_csv(file.read())
             except IndexError:
@@ -377,7 +378,7 @@ class UsersProducer:
 
         :param json_file: the path to the json file
         """
-        with open(json_file) as f:
+        with open_file(json_file) as f:
             try:
                 users = UserFormatter.from_json(f.read())
             except json.decoder.JSONDecodeError:
@@ -399,7 +400,7 @@ class UsersProducer:
         :param xml_file: the path to the xml file
         """
         users = []
-        with open(xml_file) as f:
+        with open_file(xml_file) as f:
             try:
                 users += UserFormatter.from_xml(f.read())
             except xml.etree.ElementTree.ParseError as p_ex:
@@ -414,13 +415,14 @@ class UsersProducer:
     @staticmethod
     def convert_files(in_file, out_file):
         """
-        Convert user data file from one format to another.
+        Convert user data file from one format to another. Either file may be
+        compressed (.gz, .bz2, .xz, .zst).
 
         :param in_file: the path to the input file
         :param out_file: the path to the output file
         """
-        in_ext = in_file.split('.')[-1]
-        out_ext = out_file.split('.')[-1]
+        in_ext = resolve_format(in_file).format
+        out_ext = resolve_format(out_file).format
 
         ext_funcs = {
             'csv': {'from_func': UserFormatter.from_csv, 'to_func': UserFormatter.to_csv},
@@ -435,13 +437,13 @@ class UsersProducer:
             print(f"{out_ext} output format not supported.")
             sys.exit(1)
 
-        with open(in_file) as f:
+        with open_file(in_file) as f:
             in_contents = f.read()
 
         users = ext_funcs[in_ext]['from_func'](in_contents)
         out_contents = ext_funcs[out_ext]['to_func'](users)
 
-        with open(out_file, 'w') as f:
+        with open_file(out_file, 'w') as f:
             f.write(out_contents)
 
 
@@ -1,9 +1,9 @@
 import argparse
 
-from jaydebeapi import Error
-
 from app.ingestBase import Ingest
 from app.restaurant.model import Restaurant
+from app.common.schema import RESTAURANT_SCHEMA
+from app.common.cli import add_run_arguments, setup_run
 
 
 class RestaurantIngestArgParser:
@@ -12,43 +12,43 @@ class RestaurantIngestArgParser:
                                               description="""Ingests restaurant data from a CSV, XML, or JSON file
 The required fields are street, city, state, zip, owner_id, name, rating, 
 price_category, phone, is_active, picture.""")
-        self.parser.add_argument("--path", type=str, help="Filepath to the csv, json, or xml to import")
+        self.parser.add_argument("--path", type=str,
+                                 help="Filepath to the csv, json, xml, arrow, or msgpack file to import")
+        self.parser.add_argument("--rejects", type=str, help="Filepath to write rejected records to")
+        self.parser.add_argument("--workers", type=int, default=1,
+                                 help="Number of processes to parse a large CSV file with")
+        add_run_arguments(self.parser)
 
     def get_args(self):
         return self.parser.parse_args()
 
 
-def create_address(database, street, city, state, zip):
-    uid = 0
-    try:
-        with database.conn.cursor() as cursor:
-            sql = "INSERT INTO address (line1,line2,city,state,zip) " \
-                  "VALUES (?,?,?,?,?);"
-            cursor.execute(sql, (street, "", city, state, zip))
-            cursor.execute("SELECT LAST_INSERT_ID();")
-            uid = cursor.fetchall()[0][0]
-            cursor.close()
-    except Error as e:
-        print(e)
-    finally:
-        return uid
-
-
 def handle_data(ingest: Ingest, data: dict):
-    address_id = create_address(ingest.database, data["street"], data["city"], data["state"], data["zip"])
+    address_key = ingest.address_resolver.add(data["street"], data["city"], data["state"], data["zip"])
     return [
-        None, address_id, data["owner_id"], data["name"], float(data["rating"]),
-        int(data["price_category"]), data["phone"], int(data["is_active"]), data["picture"]
+        None, None, data["owner_id"], data["name"], data["rating"],
+        data["price_category"], data["phone"], data["is_active"], data["picture"], address_key
     ]
 
 
+def resolve_addresses(ingest: Ingest, restaurants: list) -> list:
+    """
+    Create the addresses of the restaurants in bulk and set their address ids.
+    Restaurants whose address could not be created are not saved.
+    """
+    return ingest.address_resolver.resolve_items(restaurants)
+
+
 def main():
     args = ["street", "city", "state", "zip", "owner_id", "name", "rating", "price_category",
             "phone", "is_active", "picture"]
     user_args = vars(RestaurantIngestArgParser().get_args())
+    setup_run(user_args)
     path = user_args["path"] or "./app/data/restaurants-ingest-test.json"
 
-    ingest = Ingest(path, args, "restaurants", Restaurant, handle_data)
+    ingest = Ingest(path, args, "restaurants", Restaurant, handle_data, user_args["rejects"],
+                    converters=RESTAURANT_SCHEMA.converters, before_save=resolve_addresses,
+                    workers=user_args["workers"], table=RESTAURANT_SCHEMA.name)
     ingest.parse()
 
 
@@ -1,8 +1,11 @@
 import random
 
-from jaydebeapi import Error
-
 from app.db.database import Database
+from app.common.schema import RESTAURANT_SCHEMA
+
+
+INSERT_RESTAURANT_SQL = RESTAURANT_SCHEMA.insert_sql('restaurant', exclude=('id',))
+_restaurant_params = RESTAURANT_SCHEMA.params_getter(exclude=('id',))
 
 
 class Restaurant:
@@ -16,7 +19,8 @@ class Restaurant:
                  price_category: int = None,
                  phone: str = None,
                  is_active: bool = None,
-                 picture: str = None
+                 picture: str = None,
+                 address_key: tuple = None
                  ):
         self.restaurant_id = restaurant_id
         self.address_id = address_id
@@ -27,9 +31,11 @@ class Restaurant:
         self.phone = phone
         self.is_active = is_active
         self.picture = picture
+        # the key of an address queued with an AddressResolver, until its id is resolved
+        self.address_key = address_key
 
     def create_random(self, producer):
-        self.address_id = producer.create_random_address()
+        self.address_key = producer.create_random_address()
         self.owner_id = random.choice(producer.restaurant_owners)[0]
         self.name = random.choice(producer.names)
         self.rating = random.random() * 5
@@ -43,16 +49,10 @@ class Restaurant:
         return "".join(output)
 
     def save(self, database: Database):
+        from jaydebeapi import Error
         try:
             with database.conn.cursor() as cursor:
-                sql = "INSERT INTO restaurant (address_id, owner_id, name, rating, price_category, phone, is_active, picture) " \
-                      "VALUES (?,?,?,?,?,?,?,?)"
-                values = (
-                    self.address_id, self.owner_id, self.name, self.rating,
-                    self.price_category,
-                    self.phone, self.is_active, self.picture)
-
-                cursor.execute(sql, values)
+                cursor.execute(INSERT_RESTAURANT_SQL, _restaurant_params(self))
                 cursor.close()
                 return True
         except Error as e:
@@ -1,14 +1,16 @@
 import argparse
-import csv
 import logging as log
 import random
 
-from jaydebeapi import Error
-
 from app.db.config import Config
 from app.db.database import Database
+from app.db.addresses import AddressResolver
+from app.common.refdata import reference_data
 from app.producers.helpers import print_items_and_confirm
 from app.restaurant.model import Restaurant
+from app.common.cli import add_run_arguments, setup_run
+from app.common.progress import start_progress
+from app.common.metrics import ROWS_GENERATED, ROWS_WRITTEN
 
 
 class RestaurantArgParser:
@@ -24,6 +26,7 @@ File should not have a header, and have the following columns (address,city,stat
         self.parser.add_argument("--names", type=str,
                                  help="Filepath to a txt document with a list of names to draw from")
         self.parser.add_argument("--num", type=int, help="Number of restaurants to create")
+        add_run_arguments(self.parser)
 
     def get_args(self):
         return self.parser.parse_args()
@@ -34,6 +37,7 @@ class RestaurantProducer:
         self.addr_csv_path = addr_csv_path or "./app/data/addresses.csv"
         self.rest_names_path = rest_names_path or "./app/data/restaurant-names.txt"
         self.database = database
+        self.address_resolver = AddressResolver(database)
 
         # [address,city,state,zip]
         self.addresses = self.get_addresses_from_csv()
@@ -47,18 +51,13 @@ class RestaurantProducer:
             return
 
     def get_addresses_from_csv(self) -> list:
-        addresses = []
-        with open(self.addr_csv_path) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=',')
-            for row in csv_reader:
-                addresses.append(row)
-        return addresses
+        return reference_data("addresses", self.addr_csv_path)
 
-    def get_restaurant_names_from_file(self) -> list:
-        with open(self.rest_names_path) as file:
-            return file.readlines()
+    def get_restaurant_names_from_file(self):
+        return reference_data("restaurant_names", self.rest_names_path)
 
     def get_all_from(self, table) -> list:
+        from jaydebeapi import Error
         try:
             with self.database.conn.cursor() as cursor:
                 records = []
@@ -72,20 +71,23 @@ class RestaurantProducer:
             print(e)
 
     def create_random_address(self):
-        uid = 0
-        try:
-            addr = random.choice(self.addresses)
-            with self.database.conn.cursor() as cursor:
-                sql = "INSERT INTO address (line1,line2,city,state,zip) " \
-                      "VALUES (?,?,?,?,?);"
-                cursor.execute(sql, (addr[0], "", addr[1], addr[2], addr[3]))
-                cursor.execute("SELECT LAST_INSERT_ID();")
-                uid = cursor.fetchall()[0][0]
-                cursor.close()
-        except Error as e:
-            print(e)
-        finally:
-            return uid
+        """
+        Pick a random address for a restaurant. The address is created in the
+        database, together with all other queued addresses, by resolve_addresses.
+
+        :return: the key of the address
+        """
+        addr = random.choice(self.addresses)
+        return self.address_resolver.add(addr[0], addr[1], addr[2], addr[3])
+
+    def resolve_addresses(self, restaurants: list) -> list:
+        """
+        Create the queued addresses in bulk and set the address ids of the restaurants.
+
+        :param restaurants: restaurants with address keys from create_random_address
+        :return: the restaurants whose address was created
+        """
+        return self.address_resolver.resolve_items(restaurants)
 
     def create_restaurants(self, quantity: int):
         if quantity is None or quantity < 0:
@@ -100,13 +102,21 @@ class RestaurantProducer:
                 restaurant.producer = self
                 restaurant.create_random(self)
                 created.append(restaurant)
+                ROWS_GENERATED.inc(entity='restaurant')
 
             answer = print_items_and_confirm(items=created, item_type="restaurants")
             num_created = 0
             if answer.strip().lower() == "y":
+                created = self.resolve_addresses(created)
+                progress = start_progress(len(created), "restaurants saved")
                 for restaurant in created:
                     if restaurant.save(self.database):
                         num_created += 1
+                        ROWS_WRITTEN.inc(table='restaurant')
+                        progress.update()
+                    else:
+                        progress.update(rejected=1)
+                progress.finish()
 
                 print(f"Created {num_created} restaurants in the database!")
             else:
@@ -114,10 +124,10 @@ class RestaurantProducer:
 
 
 def main():
+    args = vars(RestaurantArgParser().get_args())
+    setup_run(args)
     db = Database(Config())
     db.open_connection()
-
-    args = vars(RestaurantArgParser().get_args())
     producer = RestaurantProducer(db, args["addrs"], args["names"])
     producer.create_restaurants(args["num"])
 
@@ -1,9 +1,10 @@
 import uuid
 import string
-import bcrypt
 import random
 
 from app.users.model import User
+from app.common.stats import STATS, timed
+from app.common.metrics import ROWS_GENERATED
 
 
 class UserGenerator:
@@ -23,7 +24,9 @@ class UserGenerator:
         password = "".join(random.sample(all_chars, password_len))
 
         def _salt_and_hash(_password: str):
-            return bcrypt.hashpw(_password.encode('utf-8'), bcrypt.gensalt(rounds=10, prefix=b"2a"))
+            import bcrypt
+            with STATS.timer('bcrypt'):
+                return bcrypt.hashpw(_password.encode('utf-8'), bcrypt.gensalt(rounds=10, prefix=b"2a"))
 
         return _salt_and_hash(password).decode('utf-8')
 
@@ -46,6 +49,7 @@ class UserGenerator:
         return finale
 
     @classmethod
+    @timed('generate')
     def generate_user(cls, role) -> User:
         """
         Generate a random User.
@@ -57,4 +61,5 @@ class UserGenerator:
         email = cls.generate_email(min_len=4, max_len=12)
         user_id = uuid.uuid4()
         user = User(user_id=user_id, user_role=role, password=password, email=email)
+        ROWS_GENERATED.inc(entity='user')
         return user
\ No newline at end of file
@@ -3,17 +3,23 @@ import sys
 import json
 from typing import Type
 
-import jaydebeapi
 import logging as log
-import xml.etree.ElementTree
 
+from app.db.batch import BatchWriter
 from app.db.database import Database
 from app.users.model import User
 from app.users.formatter import UserFormatter
 from app.users.generator import UserGenerator
 
 from app.common.producer import AbstractProducer
+from app.common.fileformat import open_file
 from app.common.exceptions import MissingAttributeException
+from app.common.schema import USER_SCHEMA
+from app.common.progress import start_progress
+
+
+INSERT_USER_SQL = USER_SCHEMA.insert_sql('user')
+_user_params = USER_SCHEMA.params_getter()
 
 
 class UsersProducer(AbstractProducer[User]):
@@ -31,15 +37,11 @@ class UsersProducer(AbstractProducer[User]):
         :param user: the user to save
         :return: true if the user was saved successfully, otherwise false
         """
+        import jaydebeapi
         try:
             self.db.open_connection()
             with self.db.conn.cursor() as cursor:
-                sql = "INSERT INTO user (id, user_role, password, email, enabled, confirmed, account_non_expired, " \
-                      "account_non_locked, credentials_non_expired) " \
-                      "VALUES (UNHEX(?), ?, ?, ?, ?, ?, ?, ?, ?)"
-                cursor.execute(sql, (user.id.hex, user.user_role, user.password, user.email, user.enabled,
-                                     user.confirmed, user.account_non_expired, user.account_non_locked,
-                                     user.credentials_non_expired))
+                cursor.execute(INSERT_USER_SQL, _user_params(user))
             return True
         except jaydebeapi.DatabaseError as ex:
             print(f"{os.linesep}Problem occurred saving user:{os.linesep * 2}"
@@ -52,6 +54,18 @@ class UsersProducer(AbstractProducer[User]):
                 self.db.conn = None
                 log.info('Database connection closed.')
 
+    def save_all(self, users: list[User]) -> int:
+        """
+        Create user rows in batches. Users that cannot be saved are rejected
+        without failing the rest of their batch.
+
+        :param users: the users to save
+        :return: the number of users saved
+        """
+        writer = BatchWriter(self.db, INSERT_USER_SQL, _user_params, batch_size=self.batch_size,
+                             on_reject=self._reject, progress=self.progress)
+        return writer.write(users)
+
     def produce_random(self, num_custs=0, num_admins=0, num_emps=0, num_drivers=0):
         """
         Create random users (customers, admins, employees).
@@ -61,15 +75,15 @@ class UsersProducer(AbstractProducer[User]):
         :param num_emps: the number of employees to create
         :param num_drivers: the number of drivers to create
         """
+        self._open_rejects('csv')
         users = []
-        for _ in range(num_custs):
-            users.append(UserGenerator.generate_user(role=User.Role.CUSTOMER))
-        for _ in range(num_admins):
-            users.append(UserGenerator.generate_user(role=User.Role.ADMIN))
-        for _ in range(num_emps):
-            users.append(UserGenerator.generate_user(role=User.Role.EMPLOYEE))
-        for _ in range(num_drivers):
-            users.append(UserGenerator.generate_user(role=User.Role.DRIVER))
+        progress = start_progress(num_custs + num_admins + num_emps + num_drivers, 'users generated')
+        for role, count in ((User.Role.CUSTOMER, num_custs), (User.Role.ADMIN, num_admins),
+                            (User.Role.EMPLOYEE, num_emps), (User.Role.DRIVER, num_drivers)):
+            for _ in range(count):
+                users.append(UserGenerator.generate_user(role=role))
+                progress.update()
+        progress.finish()
 
         self._confirm_and_save(users)
 
@@ -81,12 +95,12 @@ class UsersProducer(AbstractProducer[User]):
 
         :param csv_path: the path to the csv file
         """
+        self._open_rejects('csv')
         users = []
-        with open(csv_path) as file:
-            try:
-                users += UserFormatter().from_csv(file.read())
-            except IndexError:
-                print(f"There are missing fields. Rows must contain all properties.")
+        try:
+            users += UserFormatter().read_csv_file(csv_path, workers=self.workers)
+        except IndexError:
+            print(f"There are missing fields. Rows must contain all properties.")
 
         self._confirm_and_save(users)
 
@@ -96,7 +110,8 @@ class UsersProducer(AbstractProducer[User]):
 
         :param json_file: the path to the json file
         """
-        with open(json_file) as f:
+        self._open_rejects('json')
+        with open_file(json_file) as f:
             try:
                 users = UserFormatter().from_json(f.read())
             except json.decoder.JSONDecodeError:
@@ -117,10 +132,12 @@ class UsersProducer(AbstractProducer[User]):
 
         :param xml_file: the path to the xml file
         """
+        import xml.etree.ElementTree
+        self._open_rejects('xml')
         users = []
-        with open(xml_file) as f:
+        with open_file(xml_file, 'rb') as f:
             try:
-                users += UserFormatter().from_xml(f.read())
+                users += UserFormatter().read_xml(f)
             except xml.etree.ElementTree.ParseError as p_ex:
                 print(f"Malformed XML: {p_ex}")
                 sys.exit(1)
@@ -130,6 +147,25 @@ class UsersProducer(AbstractProducer[User]):
 
         self._confirm_and_save(users)
 
+    def produce_from_arrow(self, arrow_file: str):
+        """
+        Create users from a columnar file. All fields must be present.
+
+        :param arrow_file: the path to the columnar file
+        """
+        self._open_rejects('arrow')
+        with open_file(arrow_file, 'rb') as f:
+            try:
+                users = UserFormatter().read_columnar(f)
+            except MissingAttributeException as m_ex:
+                print(f"User missing {m_ex}. All fields are required.")
+                sys.exit(1)
+            except ValueError as v_ex:
+                print(v_ex)
+                sys.exit(1)
+
+        self._confirm_and_save(users)
+
     def get_formatter(self) -> UserFormatter:
         return UserFormatter()
 
@@ -0,0 +1,121 @@
+import io
+import os
+import shutil
+
+import pytest
+
+from app.common.columnar import FALLBACK_MAGIC, ColumnarWriter, read_batches, column_value
+from app.users.producer import UsersProducer
+from app.users.formatter import UserFormatter
+from app.users.generator import UserGenerator
+from app.users.model import User
+from app.menuitems.formatter import MenuItemFormatter
+from app.menuitems.model import MenuItem
+from test.db.common import FakeDatabase
+
+
+TEST_DATA_DIR = "./tmp/test-columnar"
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    yield
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def _write(batches, names=('id', 'name', 'active'), use_arrow=False, types=None) -> bytes:
+    file = io.BytesIO()
+    writer = ColumnarWriter(file, names, use_arrow=use_arrow, types=types)
+    for columns in batches:
+        writer.write_batch(columns)
+    writer.close()
+    return file.getvalue()
+
+
+def test_column_value():
+    assert column_value('a') == 'a'
+    assert column_value(1) == 1
+    assert column_value(True) is True
+    assert column_value(None) is None
+    user = UserGenerator.generate_user(User.Role.ADMIN)
+    assert column_value(user.id) == str(user.id)
+
+
+def test_fallback_round_trip():
+    batches = [[[1, 2], ['a', 'b'], [True, False]], [[3], [None], [True]]]
+    data = _write(batches)
+
+    assert data.startswith(FALLBACK_MAGIC)
+    assert list(read_batches(io.BytesIO(data))) == [(['id', 'name', 'active'], columns) for columns in batches]
+
+
+def test_fallback_without_batches():
+    assert list(read_batches(io.BytesIO(_write([])))) == []
+
+
+def test_read_truncated_file():
+    data = _write([[[1, 2], ['a', 'b'], [True, False]]])
+
+    with pytest.raises(ValueError):
+        list(read_batches(io.BytesIO(data[:-10])))
+
+
+def test_read_not_columnar():
+    with pytest.raises(ValueError):
+        list(read_batches(io.BytesIO(b'id,name\n1,a\n')))
+
+
+def test_arrow_round_trip():
+    pytest.importorskip('pyarrow')
+    batches = [[[1, 2], ['a', 'b'], [True, False]], [[3], [None], [True]]]
+
+    assert list(read_batches(io.BytesIO(_write(batches, use_arrow=True)))) == \
+        [(['id', 'name', 'active'], columns) for columns in batches]
+
+
+def test_arrow_null_first_batch():
+    pytest.importorskip('pyarrow')
+    batches = [[[1], [None], [None]], [[2], [0.5], [True]], [[3], [1], [None]]]
+    data = _write(batches, names=('id', 'discount', 'active'), use_arrow=True, types=[int, float, bool])
+
+    assert [columns for _, columns in read_batches(io.BytesIO(data))] == \
+        [[[1], [None], [None]], [[2], [0.5], [True]], [[3], [1.0], [None]]]
+
+
+def test_formatter_columnar_null_first_batch():
+    formatter = MenuItemFormatter()
+    items = [MenuItem(i, 1, f"item {i}", 4.99, None, None, 1, None, None if i < 2 else 0.1) for i in range(4)]
+    file = io.BytesIO()
+    with formatter.writer('arrow', file) as writer:
+        writer.write(items[:2])
+        writer.write(items[2:])
+
+    file.seek(0)
+    assert formatter.to_csv(formatter.read_columnar(file)) == formatter.to_csv(items)
+
+
+def test_formatter_columnar_round_trip():
+    formatter = UserFormatter()
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(5)]
+    file = io.BytesIO()
+    with formatter.writer('arrow', file) as writer:
+        writer.write(users[:3])
+        writer.write(users[3:])
+
+    file.seek(0)
+    assert formatter.to_csv(formatter.read_columnar(file)) == formatter.to_csv(users)
+
+
+def test_convert_files_to_and_from_columnar():
+    formatter = UserFormatter()
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(5)]
+    with open(f"{TEST_DATA_DIR}/users.json", 'w') as file:
+        file.write(formatter.to_json(users))
+    producer = UsersProducer(FakeDatabase())
+
+    producer.convert_files(f"{TEST_DATA_DIR}/users.json", f"{TEST_DATA_DIR}/users.arrow.gz")
+    producer.convert_files(f"{TEST_DATA_DIR}/users.arrow.gz", f"{TEST_DATA_DIR}/users.csv")
+
+    with open(f"{TEST_DATA_DIR}/users.csv") as file:
+        assert file.read() == formatter.to_csv(users)
@@ -0,0 +1,33 @@
+import uuid
+import pytest
+
+from app.common.converters import to_bool, to_int, to_float, to_uuid, string_to_bool
+
+
+def test_to_bool():
+    for value in ['y', 'Yes', 'TRUE', 'true', 'True', 'on', '1', True, 1]:
+        assert to_bool(value) is True
+    for value in ['n', 'No', 'FALSE', 'false', 'False', 'off', '0', False, 0]:
+        assert to_bool(value) is False
+    assert to_bool('tRuE') is True
+
+
+def test_to_bool_invalid():
+    with pytest.raises(ValueError):
+        to_bool('maybe')
+    with pytest.raises(ValueError):
+        to_bool(None)
+
+
+def test_string_to_bool():
+    assert string_to_bool('True') is True
+    assert string_to_bool('false') is False
+
+
+def test_numeric_and_uuid_converters():
+    user_id = uuid.uuid4()
+
+    assert to_int('12') == 12
+    assert to_float('2.5') == 2.5
+    assert to_uuid(str(user_id)) == user_id
+    assert to_uuid(user_id) is user_id
@@ -0,0 +1,148 @@
+import gzip
+import os
+import re
+import shutil
+
+import pytest
+
+from app.common.export import export_format, part_paths, export_query, export_table
+from app.users.formatter import UserFormatter
+from app.users.generator import UserGenerator
+from app.users.model import User
+from app.common.schema import USER_SCHEMA
+from test.db.common import FakeDatabase, FakeCursor
+
+
+TEST_DATA_DIR = "./tmp/test-export"
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    yield
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def _user_rows(count):
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(count)]
+    # the database returns hex ids and 0/1 flags
+    rows = [(user.id.hex.upper(), user.user_role, user.password, user.email, 1, 1, 1, 0, 1) for user in users]
+    for user in users:
+        user.account_non_locked = False
+    return users, rows
+
+
+class FakeKeyedCursor(FakeCursor):
+    def execute(self, sql, params=None):
+        # applies the key range of a part, the rows are keyed by their first value
+        super().execute(sql, params)
+        rows = self.conn.table_rows
+        params = list(params or ())
+        if 'id >= ' in sql:
+            low = params.pop(0)
+            rows = [row for row in rows if row[0] >= low]
+        if 'id < ' in sql:
+            high = params.pop(0)
+            rows = [row for row in rows if row[0] < high]
+        self.conn.fetch_rows = sorted(rows)
+
+
+class FakeKeyedDatabase(FakeDatabase):
+    def __init__(self, rows):
+        super().__init__()
+        self.fake_conn.table_rows = list(rows)
+        self.fake_conn.cursor = lambda: FakeKeyedCursor(self.fake_conn)
+
+    def run_query(self, query):
+        self.fake_conn.queries.append(query)
+        rows = self.fake_conn.table_rows
+        if query.startswith('SELECT COUNT(*)'):
+            return [(len(rows),)]
+        step = int(re.search(r"MOD\(row_num - 1, (\d+)\)", query).group(1))
+        return [(row[0],) for row in sorted(rows)[step::step]]
+
+
+def test_export_format():
+    assert export_format('users.csv') == 'csv'
+    assert export_format('./data/users.json') == 'json'
+    with pytest.raises(ValueError):
+        export_format('users.txt')
+
+
+def test_part_paths():
+    assert part_paths('users.csv', 1) == ['users.csv']
+    assert part_paths('out/users.json', 2) == ['out/users.part1.json', 'out/users.part2.json']
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'json', 'xml'])
+def test_export_query_streams_rows_to_file(fmt):
+    users, rows = _user_rows(5)
+    db = FakeDatabase()
+    db.fake_conn.fetch_rows = rows
+    path = f"{TEST_DATA_DIR}/users.{fmt}"
+
+    count = export_query(db, USER_SCHEMA.select_sql('user'), UserFormatter(), path, fetch_size=2)
+
+    assert count == 5
+    assert db.fake_conn.queries == ["SELECT HEX(id), user_role, password, email, enabled, confirmed, "
+                                    "account_non_expired, account_non_locked, credentials_non_expired FROM user"]
+    assert db.conn is None
+    with open(path) as file:
+        assert file.read() == getattr(UserFormatter(), f"to_{fmt}")(users)
+
+
+def _export_parts(rows, parts):
+    databases = []
+
+    def connect():
+        databases.append(FakeKeyedDatabase(rows))
+        return databases[-1]
+
+    counts = export_table(connect, USER_SCHEMA, 'user', UserFormatter(), f"{TEST_DATA_DIR}/users.csv", parts=parts)
+    return counts, databases
+
+
+def test_export_table_in_parts():
+    users, rows = _user_rows(5)
+    by_id = {user.id.hex.upper(): user for user in users}
+
+    counts, databases = _export_parts(rows, 2)
+
+    paths = [f"{TEST_DATA_DIR}/users.part1.csv", f"{TEST_DATA_DIR}/users.part2.csv"]
+    assert counts == {paths[0]: 3, paths[1]: 2}
+    assert databases[0].fake_conn.queries[1] == \
+        "SELECT HEX(id) FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS row_num FROM user) ranked " \
+        "WHERE row_num > 1 AND MOD(row_num - 1, 3) = 0 ORDER BY row_num"
+    queries = sorted(db.fake_conn.queries[0] for db in databases[1:])
+    assert queries[0].endswith("FROM user WHERE id < UNHEX(?) ORDER BY id")
+    assert queries[1].endswith("FROM user WHERE id >= UNHEX(?) ORDER BY id")
+
+    # the parts are disjoint, in key order, and hold every row
+    read = [UserFormatter().read_csv_file(path) for path in paths]
+    ids = [user.id.hex.upper() for part in read for user in part]
+    assert ids == sorted(by_id)
+    assert UserFormatter().to_csv([user for part in read for user in part]) == \
+        UserFormatter().to_csv([by_id[_id] for _id in ids])
+
+
+def test_export_table_more_parts_than_rows():
+    users, rows = _user_rows(2)
+
+    counts, _ = _export_parts(rows, 4)
+
+    assert list(counts.values()) == [1, 1, 0, 0]
+    with open(f"{TEST_DATA_DIR}/users.part4.csv") as file:
+        assert file.read() == ''
+
+
+def test_export_query_compressed():
+    users, rows = _user_rows(3)
+    db = FakeDatabase()
+    db.fake_conn.fetch_rows = rows
+    path = f"{TEST_DATA_DIR}/users.json.gz"
+
+    export_query(db, USER_SCHEMA.select_sql('user'), UserFormatter(), path)
+
+    with gzip.open(path, 'rt') as file:
+        assert file.read() == UserFormatter().to_json(users)
+    assert part_paths(path, 2) == [f"{TEST_DATA_DIR}/users.part1.json.gz", f"{TEST_DATA_DIR}/users.part2.json.gz"]
@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+
+from app.common.fileformat import FileFormat, resolve_format, split_suffix, open_file
+
+
+TEST_DATA_DIR = "./tmp/test-fileformat"
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    yield
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_resolve_format():
+    assert resolve_format('users.csv') == FileFormat('csv', None, '.csv')
+    assert resolve_format('./data/users.csv.gz') == FileFormat('csv', 'gzip', '.csv.gz')
+    assert resolve_format('users.JSON.zst') == FileFormat('json', 'zstd', '.JSON.zst')
+    assert resolve_format('v1.2/users.xml.bz2') == FileFormat('xml', 'bz2', '.xml.bz2')
+    assert resolve_format('users.xml.xz') == FileFormat('xml', 'lzma', '.xml.xz')
+    assert resolve_format('users') == FileFormat('', None, '')
+
+
+def test_split_suffix():
+    assert split_suffix('out/users.csv.gz') == ('out/users', '.csv.gz')
+    assert split_suffix('out/users.json') == ('out/users', '.json')
+
+
+@pytest.mark.parametrize('ext', ['', '.gz', '.bz2', '.xz'])
+def test_open_file_round_trip(ext):
+    path = f"{TEST_DATA_DIR}/users.csv{ext}"
+    with open_file(path, 'w') as file:
+        file.write('a,b\nc,d\n')
+
+    with open_file(path) as file:
+        assert file.read() == 'a,b\nc,d\n'
+    with open_file(path, 'rb') as file:
+        assert file.read() == b'a,b\nc,d\n'
+    if ext:
+        with open(path, 'rb') as file:
+            assert file.read() != b'a,b\nc,d\n'
+
+
+def test_open_file_zstd():
+    pytest.importorskip('zstandard')
+    path = f"{TEST_DATA_DIR}/users.json.zst"
+    with open_file(path, 'w') as file:
+        file.write('[]')
+
+    with open_file(path) as file:
+        assert file.read() == '[]'
@@ -1,3 +1,5 @@
+import io
+import os
 import json
 import pytest
 import xml.etree.ElementTree as ET
@@ -123,6 +125,48 @@ def test_formatter_to_csv():
     assert fields[1] == item.name
 
 
+def test_formatter_csv_quoting_round_trip():
+    items = [Item(item_id=1, name='Smith, Jones & "Sons"'), Item(item_id=2, name='two\nlines'),
+             Item(item_id=3, name='$2b$12$abc,def')]
+
+    csv_str = ItemFormatter().to_csv(items)
+    read = ItemFormatter().from_csv(csv_str)
+
+    assert [(item.id, item.name) for item in read] == [(item.id, item.name) for item in items]
+
+
+def test_formatter_to_csv_rows():
+    items = [Item(item_id=1, name='a'), Item(item_id=2, name=None)]
+
+    assert ItemFormatter().to_csv(items) == f"1,a{os.linesep}2,"
+    assert ItemFormatter().to_csv([]) == ''
+
+
+def test_formatter_csv_header():
+    item = Item(item_id=1234, name='smoothstack')
+
+    csv_str = ItemFormatter().to_csv([item], header=True)
+    assert csv_str.split(os.linesep)[0] == 'id,name'
+
+    items = ItemFormatter().from_csv('name,other,id\nsmoothstack,x,1234', header=True)
+    assert (items[0].id, items[0].name) == (1234, 'smoothstack')
+
+
+def test_formatter_csv_header_missing_attribute():
+    with pytest.raises(MissingAttributeException) as ex:
+        ItemFormatter().from_csv('id\n1234', header=True)
+
+    assert 'name' in str(ex)
+
+
+def test_formatter_csv_dialect():
+    items = [Item(item_id=1, name='a,b')]
+
+    csv_str = ItemFormatter().to_csv(items, dialect='excel-tab')
+    assert csv_str == '1\ta,b'
+    assert ItemFormatter().from_csv(csv_str, dialect='excel-tab')[0].name == 'a,b'
+
+
 def test_formatter_to_xml():
     item = Item(item_id=1234, name='smoothstack')
     xml_str = ItemFormatter().to_xml([item])
@@ -166,3 +210,55 @@ def test_formatter_from_xml_missing_property():
         ItemFormatter().from_xml(xml_str)
 
     assert 'name' in str(ex)
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'json', 'xml'])
+def test_chunk_writer_matches_formatting_all_items(fmt):
+    formatter = ItemFormatter()
+    items = [Item(item_id=i, name=f"item {i}") for i in range(7)]
+    to_func = getattr(formatter, f"to_{fmt}")
+
+    for chunk_size in (1, 3, 7):
+        file = io.StringIO()
+        with formatter.writer(fmt, file) as writer:
+            for i in range(0, len(items), chunk_size):
+                writer.write(items[i:i + chunk_size])
+
+        assert file.getvalue() == to_func(items)
+        assert writer.count == 7
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'json', 'xml'])
+def test_chunk_writer_without_items(fmt):
+    formatter = ItemFormatter()
+    file = io.StringIO()
+    with formatter.writer(fmt, file) as writer:
+        writer.write([])
+
+    assert file.getvalue() == getattr(formatter, f"to_{fmt}")([])
+
+
+def test_chunk_writer_unsupported_format():
+    with pytest.raises(ValueError):
+        ItemFormatter().writer('yaml', io.StringIO())
+
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_formatter_json_backends(backend):
+    if backend != 'json':
+        pytest.importorskip(backend)
+    formatter = ItemFormatter()
+    formatter.json_backend = backend
+    items = [Item(item_id=i, name=f"item {i}") for i in range(3)]
+
+    for compact in (False, True):
+        read = formatter.from_json(formatter.to_json(items, compact=compact))
+        assert [(item.id, item.name) for item in read] == [(item.id, item.name) for item in items]
+    assert '\n' not in formatter.to_json(items, compact=True)
+
+
+def test_formatter_to_json_default_backend():
+    formatter = ItemFormatter()
+    items = [Item(item_id=1, name="caf\u00e9")]
+
+    assert formatter.to_json(items) == json.dumps(items, indent=4, cls=formatter.get_json_encoder())
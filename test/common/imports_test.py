@@ -0,0 +1,27 @@
+import sys
+import subprocess
+
+import pytest
+
+
+HEAVY_MODULES = ['jaydebeapi', 'jpype', 'pymysql', 'bcrypt', 'dotenv', 'xml.dom.minidom']
+ENTRY_MODULES = ['app.users.main', 'app.orders.main', 'app.driver.driver', 'app.restaurant.producer']
+
+
+def _loaded_modules(module: str) -> list:
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize('module', ENTRY_MODULES)
+def test_entry_points_do_not_import_heavy_modules(module):
+    loaded = _loaded_modules(module)
+    assert [heavy for heavy in HEAVY_MODULES if heavy in loaded] == []
+
+
+@pytest.mark.parametrize('module', ['app.users', 'app.orders'])
+def test_help_does_not_need_database(module):
+    result = subprocess.run([sys.executable, '-m', module, '--help'], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert 'usage' in result.stdout
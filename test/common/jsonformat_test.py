@@ -0,0 +1,67 @@
+import json
+import uuid
+
+import pytest
+
+from app.common.jsonformat import JsonBackend, get_json_backend, json_default
+from app.users.formatter import UserFormatter
+from app.users.model import User
+
+
+def _user() -> User:
+    return User(user_id=uuid.uuid4(), user_role=User.Role.ADMIN, password='p"w', email='me@me.com')
+
+
+@pytest.mark.parametrize('name', ['json', 'orjson'])
+def test_json_backend_round_trip(name):
+    if name != 'json':
+        pytest.importorskip(name)
+    backend = get_json_backend(name)
+    user = _user()
+
+    for pretty in (True, False):
+        data = backend.loads(backend.dumps([user], pretty=pretty))
+        assert data == [dict(vars(user), id=str(user.id))]
+    assert backend.loads(backend.dumpb([1, 'a', None])) == [1, 'a', None]
+
+
+def test_json_backend_matches_json_module():
+    user = _user()
+    encoder = UserFormatter().get_json_encoder()
+
+    assert JsonBackend().dumps([user], pretty=True, encoder=encoder) == json.dumps([user], indent=4, cls=encoder)
+    assert JsonBackend().dumps({'a': [1, 2]}) == '{"a":[1,2]}'
+
+
+def test_json_default():
+    user_id = uuid.uuid4()
+
+    assert json_default(user_id) == str(user_id)
+    assert json_default(_user())['email'] == 'me@me.com'
+
+
+def test_orjson_backend_encoder():
+    pytest.importorskip('orjson')
+    backend = get_json_backend('orjson')
+    user = _user()
+
+    class Encoder(json.JSONEncoder):
+        def default(self, obj):
+            return {'email': obj.email}
+
+    class CustomEncoder(json.JSONEncoder):
+        def encode(self, obj):
+            return '[]'
+
+    assert backend.loads(backend.dumps([user], encoder=Encoder)) == [{'email': 'me@me.com'}]
+    with pytest.raises(ValueError):
+        backend.dumps([user], encoder=CustomEncoder)
+
+
+def test_get_json_backend():
+    assert get_json_backend('json') is get_json_backend('json')
+    assert get_json_backend().name == 'json'
+    assert get_json_backend(fastest=True).name in ('orjson', 'json')
+
+    with pytest.raises(ValueError):
+        get_json_backend('yaml')
@@ -0,0 +1,71 @@
+import shutil
+import urllib.request
+
+from pathlib import Path
+from app.common.metrics import Counter, Gauge, Histogram, Registry, TextfileExporter, start_http_server
+
+
+TEST_DATA_DIR = "./tmp/test-metrics"
+
+
+def _registry():
+    registry = Registry()
+    rows = registry.register(Counter('rows_total', 'Rows written.'))
+    connections = registry.register(Gauge('open_connections', 'Open connections.'))
+    latency = registry.register(Histogram('batch_seconds', 'Batch latency.', buckets=(0.1, 1.0)))
+    return registry, rows, connections, latency
+
+
+def test_counter_and_gauge():
+    registry, rows, connections, _ = _registry()
+    rows.inc(table='user')
+    rows.inc(5, table='user')
+    rows.inc(table='order "x"')
+    connections.set_function(lambda: 2)
+
+    assert rows.value(table='user') == 6
+    text = registry.expose()
+    assert '# TYPE rows_total counter' in text
+    assert 'rows_total{table="user"} 6' in text
+    assert 'rows_total{table="order \\"x\\""} 1' in text
+    assert 'open_connections 2' in text
+
+
+def test_histogram():
+    registry, _, _, latency = _registry()
+    latency.observe(0.05, table='user')
+    latency.observe(0.5, table='user')
+    latency.observe(3, table='user')
+
+    text = registry.expose()
+    assert 'batch_seconds_bucket{table="user",le="0.1"} 1' in text
+    assert 'batch_seconds_bucket{table="user",le="1"} 2' in text
+    assert 'batch_seconds_bucket{table="user",le="+Inf"} 3' in text
+    assert 'batch_seconds_sum{table="user"} 3.55' in text
+    assert 'batch_seconds_count{table="user"} 3' in text
+    assert latency.count(table='user') == 3
+
+
+def test_http_server():
+    registry, rows, _, _ = _registry()
+    rows.inc(3)
+    server = start_http_server(0, registry=registry)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert 'rows_total 3' in response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_textfile_exporter():
+    registry, rows, _, _ = _registry()
+    rows.inc(2)
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    exporter = TextfileExporter(f"{TEST_DATA_DIR}/producer.prom", interval=60, registry=registry)
+    exporter.start()
+    exporter.stop()
+
+    with open(f"{TEST_DATA_DIR}/producer.prom") as file:
+        assert 'rows_total 2' in file.read()
+    shutil.rmtree(TEST_DATA_DIR)
@@ -0,0 +1,131 @@
+import os
+import csv
+import gzip
+import shutil
+
+import pytest
+
+import app.common.parallel as parallel
+from app.common.parallel import split_ranges, read_range, map_csv_rows
+from app.users.formatter import UserFormatter
+from app.users.generator import UserGenerator
+from app.users.model import User
+from app.menuitems.formatter import MenuItemFormatter
+from app.menuitems.generator import MenuItemGenerator
+
+
+TEST_DATA_DIR = "./tmp/test-parallel"
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    yield
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def _write_rows(path: str, count: int) -> list:
+    rows = [[str(i), f"name {i}", 'x' * (i % 7)] for i in range(count)]
+    with open(path, 'w') as file:
+        file.write('id,name,pad\n')
+        for row in rows:
+            file.write(','.join(row) + '\n')
+    return rows
+
+
+def test_split_ranges_at_line_boundaries():
+    path = f"{TEST_DATA_DIR}/rows.csv"
+    rows = _write_rows(path, 1000)
+
+    ranges = split_ranges(path, 4, start=len('id,name,pad\n'), min_size=100)
+    assert len(ranges) == 4
+    assert ranges[0][0] == len('id,name,pad\n')
+    assert ranges[-1][1] == os.path.getsize(path)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+
+    read = [row for start, end in ranges for row in read_range(path, start, end)]
+    assert read == rows
+
+
+def test_split_ranges_small_file():
+    path = f"{TEST_DATA_DIR}/rows.csv"
+    _write_rows(path, 10)
+
+    assert split_ranges(path, 4) == [(0, os.path.getsize(path))]
+
+
+def test_map_csv_rows_keeps_order(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_RANGE_BYTES', 100)
+    path = f"{TEST_DATA_DIR}/rows.csv"
+    rows = _write_rows(path, 1000)
+
+    assert map_csv_rows(path, tuple, 4, start=len('id,name,pad\n')) == [tuple(row) for row in rows]
+
+
+def test_map_csv_rows_compressed():
+    path = f"{TEST_DATA_DIR}/rows.csv.gz"
+    with gzip.open(path, 'wt') as file:
+        file.write('a,b\nc,d\n')
+
+    assert map_csv_rows(path, tuple, 4) == [('a', 'b'), ('c', 'd')]
+
+
+def test_read_csv_file_workers(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_RANGE_BYTES', 100)
+    formatter = UserFormatter()
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(20)]
+    path = f"{TEST_DATA_DIR}/users.csv"
+    with open(path, 'w') as file:
+        file.write(formatter.to_csv(users))
+
+    read = formatter.read_csv_file(path, workers=4)
+    assert len(read) == 20
+    assert formatter.to_csv(read) == formatter.to_csv(formatter.read_csv_file(path))
+
+
+def test_read_csv_file_workers_field_count(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_RANGE_BYTES', 10)
+    path = f"{TEST_DATA_DIR}/users.csv"
+    with open(path, 'w') as file:
+        file.write('a,b\n' * 20)
+
+    with pytest.raises(IndexError):
+        UserFormatter().read_csv_file(path, workers=2)
+
+
+def test_read_range_rejects_rows_spanning_lines():
+    path = f"{TEST_DATA_DIR}/rows.csv"
+    with open(path, 'w', newline='') as file:
+        file.write('a,"b\nc",d\ne,f\n')
+
+    with pytest.raises(parallel.RangeSplitError):
+        read_range(path, 0, os.path.getsize(path))
+    # a range ending inside the quoted value
+    with pytest.raises(parallel.RangeSplitError):
+        read_range(path, 0, len('a,"b\n'))
+
+
+def test_map_csv_rows_quoted_line_breaks(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_RANGE_BYTES', 100)
+    path = f"{TEST_DATA_DIR}/rows.csv"
+    rows = _write_rows(path, 1000)
+    rows[700][1] = 'two\nlines'
+    with open(path, 'w', newline='') as file:
+        file.write('id,name,pad\n')
+        csv.writer(file, lineterminator='\n').writerows(rows)
+
+    assert map_csv_rows(path, tuple, 4, start=len('id,name,pad\n')) == [tuple(row) for row in rows]
+
+
+def test_read_csv_file_workers_quoted_line_breaks(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_RANGE_BYTES', 100)
+    formatter = MenuItemFormatter()
+    items = MenuItemGenerator.generate_menu(restaurant_id=1, count=100)
+    items[60].description = 'first line\nsecond line'
+    path = f"{TEST_DATA_DIR}/menuitems.csv"
+    with open(path, 'w', newline='') as file:
+        formatter.write_csv(items, file)
+
+    read = formatter.read_csv_file(path, workers=4)
+    assert [vars(item) for item in read] == [vars(item) for item in items]
@@ -0,0 +1,46 @@
+import io
+import os
+import pstats
+import shutil
+
+from pathlib import Path
+from app.common.profiling import RunProfiler, enable_profiling
+
+
+TEST_DATA_DIR = "./tmp/test-profiling"
+
+
+def _work():
+    return sorted(str(i) for i in range(1000))
+
+
+def test_run_profiler_writes_pstats():
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    path = f"{TEST_DATA_DIR}/run.pstats"
+    profiler = RunProfiler(path, top=5)
+    profiler.start()
+    _work()
+    out = io.StringIO()
+    profiler.stop(file=out)
+
+    assert '_work' in out.getvalue()
+    assert any('_work' in func[2] for func in pstats.Stats(path).stats)
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_run_profiler_memory_snapshot():
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    path = f"{TEST_DATA_DIR}/run.pstats"
+    profiler = RunProfiler(path, top=3, memory=True)
+    profiler.start()
+    _work()
+    out = io.StringIO()
+    profiler.stop(file=out)
+
+    assert 'Peak traced memory' in out.getvalue()
+    assert os.path.exists(path + '.tracemalloc')
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_enable_profiling_not_requested():
+    assert enable_profiling({'profile': None}) is None
@@ -0,0 +1,59 @@
+import io
+import logging
+
+from app.common.progress import ProgressReporter, NULL_PROGRESS, start_progress, set_progress_mode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_progress_is_throttled():
+    clock = FakeClock()
+    out = io.StringIO()
+    progress = ProgressReporter(100, 'users saved', stream=out, interval=1.0, clock=clock)
+    progress.update(10)
+    assert out.getvalue() == ''
+
+    clock.now = 2.0
+    progress.update(10, rejected=2)
+    line = out.getvalue()
+    assert '20/100 users saved (20%)' in line
+    assert '10/s' in line
+    assert 'ETA 00:00:08' in line
+    assert '2 rejected' in line
+
+    progress.update(10)
+    assert out.getvalue() == line
+
+
+def test_progress_finish():
+    clock = FakeClock()
+    out = io.StringIO()
+    progress = ProgressReporter(None, 'rows', stream=out, clock=clock)
+    progress.update(50)
+    clock.now = 5.0
+    progress.finish()
+    assert out.getvalue().endswith('50 rows, 10/s, 00:00:05 elapsed\x1b[K\n')
+
+
+def test_progress_log_mode(caplog):
+    clock = FakeClock()
+    progress = ProgressReporter(10, 'orders saved', mode='log', clock=clock)
+    progress.update(5)
+    clock.now = 1.0
+    with caplog.at_level(logging.INFO, logger='app.progress'):
+        progress.finish()
+    assert 'progress label="orders saved" done=5 total=10 rate=5.0 eta=1.0 rejected=0 final=true' in caplog.text
+
+
+def test_start_progress_off():
+    set_progress_mode({'progress': 'off'})
+    assert start_progress(10) is NULL_PROGRESS
+    set_progress_mode({'progress': 'bar'})
+    assert isinstance(start_progress(10), ProgressReporter)
+    set_progress_mode({'progress': 'auto'})
@@ -0,0 +1,117 @@
+import io
+import os
+import shutil
+
+import pytest
+
+from app.common.records import RecordWriter, read_records, pack_values, unpack_values
+from app.users.producer import UsersProducer
+from app.users.formatter import UserFormatter
+from app.users.generator import UserGenerator
+from app.users.model import User
+from test.db.common import FakeDatabase
+
+
+TEST_DATA_DIR = "./tmp/test-records"
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    yield
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+VALUES = ['', 'a', 'x' * 31, 'x' * 32, 'x' * 300, 'x' * 70000, 'é', 0, 127, 128, -1, -32, -33, 2 ** 40, -2 ** 40,
+          2 ** 64 - 1, 1.5, -0.25, True, False, None]
+
+
+def test_pack_values_round_trip():
+    assert unpack_values(pack_values(VALUES)) == VALUES
+    assert unpack_values(pack_values([])) == []
+    assert unpack_values(pack_values(list(range(20)))) == list(range(20))
+
+
+def test_pack_values_is_messagepack():
+    assert pack_values([1, 'a', None, True]) == b'\x94\x01\xa1a\xc0\xc3'
+    # the smallest encodings used by other MessagePack writers are read as well
+    assert unpack_values(b'\x93\xcc\x80\xd0\xdf\xca\x3f\xc0\x00\x00') == [128, -33, 1.5]
+
+
+def test_pack_values_matches_msgpack():
+    msgpack = pytest.importorskip('msgpack')
+    assert unpack_values(msgpack.packb(VALUES)) == VALUES
+    assert msgpack.unpackb(pack_values(VALUES)) == VALUES
+
+
+@pytest.mark.parametrize('write_codec', ['struct', 'msgpack'])
+def test_record_files_between_codecs(monkeypatch, write_codec):
+    msgpack = pytest.importorskip('msgpack')
+    codecs = {
+        'struct': (pack_values, unpack_values),
+        'msgpack': (msgpack.packb, lambda data: msgpack.unpackb(data, raw=False)),
+    }
+    read_codec = 'msgpack' if write_codec == 'struct' else 'struct'
+    file = io.BytesIO()
+    monkeypatch.setattr('app.common.records._codec', lambda: codecs[write_codec])
+    RecordWriter(file, ['values']).write([VALUES, [1, 'a']])
+
+    file.seek(0)
+    monkeypatch.setattr('app.common.records._codec', lambda: codecs[read_codec])
+    assert list(read_records(file)) == [['values'], VALUES, [1, 'a']]
+
+
+def test_record_writer_round_trip():
+    file = io.BytesIO()
+    writer = RecordWriter(file, ['id', 'name'])
+    writer.write([[1, 'a'], [2, 'b']])
+    writer.write([[3, None]])
+
+    file.seek(0)
+    assert list(read_records(file)) == [['id', 'name'], [1, 'a'], [2, 'b'], [3, None]]
+    assert writer.count == 3
+
+
+def test_read_truncated_records():
+    file = io.BytesIO()
+    RecordWriter(file, ['id', 'name']).write([[1, 'a']])
+
+    with pytest.raises(ValueError):
+        list(read_records(io.BytesIO(file.getvalue()[:-1])))
+
+
+def test_formatter_records_round_trip():
+    formatter = UserFormatter()
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(5)]
+    file = io.BytesIO()
+    with formatter.writer('msgpack', file) as writer:
+        writer.write(users[:2])
+        writer.write(users[2:])
+
+    file.seek(0)
+    assert formatter.to_csv(formatter.read_records(file)) == formatter.to_csv(users)
+
+
+def test_formatter_records_in_other_field_order():
+    formatter = UserFormatter()
+    user = UserGenerator.generate_user(User.Role.CUSTOMER)
+    names = list(reversed(formatter.get_attr_list()))
+    file = io.BytesIO()
+    RecordWriter(file, names + ['extra']).write([list(reversed(formatter.to_records([user])[0])) + [1]])
+
+    file.seek(0)
+    assert formatter.to_csv(formatter.read_records(file)) == formatter.to_csv([user])
+
+
+def test_convert_files_to_and_from_records():
+    formatter = UserFormatter()
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(5)]
+    with open(f"{TEST_DATA_DIR}/users.csv", 'w') as file:
+        file.write(formatter.to_csv(users))
+    producer = UsersProducer(FakeDatabase())
+
+    producer.convert_files(f"{TEST_DATA_DIR}/users.csv", f"{TEST_DATA_DIR}/users.msgpack")
+    producer.convert_files(f"{TEST_DATA_DIR}/users.msgpack", f"{TEST_DATA_DIR}/users.json")
+
+    with open(f"{TEST_DATA_DIR}/users.json") as file:
+        assert file.read() == formatter.to_json(users)
@@ -0,0 +1,96 @@
+import os
+import random
+import shutil
+
+from pathlib import Path
+from app.common.refdata import LineIndex, load_lines, build_bundle, load_entry, reference_data, \
+    INDEX_SUFFIX, BUNDLE_NAME, DATA_DIR
+
+
+TEST_DATA_DIR = "./tmp/test-refdata"
+
+
+def write_lines(name: str, content: str) -> str:
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    path = f"{TEST_DATA_DIR}/{name}"
+    with open(path, "w", newline="") as file:
+        file.write(content)
+    return path
+
+
+def test_line_index():
+    path = write_lines("names.txt", "Alice\nBob\r\n\nCarol")
+    index = LineIndex(path)
+    assert len(index) == 4
+    assert list(index) == ["Alice", "Bob", "", "Carol"]
+    assert index[-1] == "Carol"
+    assert index[1:3] == ["Bob", ""]
+    assert random.choice(index) in ["Alice", "Bob", "", "Carol"]
+    index.close()
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_line_index_trailing_newline_and_empty_file():
+    assert list(LineIndex(write_lines("names.txt", "Alice\nBob\n"))) == ["Alice", "Bob"]
+    assert len(LineIndex(write_lines("empty.txt", ""))) == 0
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_line_index_cache_invalidated_on_change():
+    path = write_lines("names.txt", "Alice\nBob\n")
+    assert len(LineIndex(path)) == 2
+    assert os.path.exists(path + INDEX_SUFFIX)
+    assert list(LineIndex(path)) == ["Alice", "Bob"]
+
+    write_lines("names.txt", "Dave\nErin\nFrank\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+    assert list(load_lines(path)) == ["Dave", "Erin", "Frank"]
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_load_lines_shared():
+    path = write_lines("names.txt", "Alice\n")
+    assert load_lines(path) is load_lines(path)
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def write_reference_data():
+    write_lines("addresses.csv", '"1 Main St, Apt 2",Reno,NV,89501\n2 Main St,Reno,NV,89501\n')
+    write_lines("first_names.txt", "Alice\nBob\n")
+    write_lines("last_names.txt", "Smith\n")
+    write_lines("restaurant-names.txt", "Pizza Place\n")
+
+
+def test_build_and_load_bundle():
+    write_reference_data()
+    bundle = build_bundle(TEST_DATA_DIR)
+    assert os.path.exists(f"{TEST_DATA_DIR}/{BUNDLE_NAME}")
+    assert bundle == {"addresses": [["1 Main St, Apt 2", "Reno", "NV", "89501"], ["2 Main St", "Reno", "NV", "89501"]]}
+
+    loaded = load_entry("addresses", TEST_DATA_DIR)
+    assert loaded == bundle["addresses"]
+    assert load_entry("addresses", TEST_DATA_DIR) is loaded
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_load_entry_rebuilds_when_source_changes():
+    write_reference_data()
+    load_entry("addresses", TEST_DATA_DIR)
+    write_lines("addresses.csv", "3 Main St,Reno,NV,89501\n")
+    assert load_entry("addresses", TEST_DATA_DIR) == [["3 Main St", "Reno", "NV", "89501"]]
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_reference_data_names_are_line_indexes():
+    names = reference_data("first_names")
+    assert isinstance(names, LineIndex)
+    assert names is load_lines(f"{DATA_DIR}/first_names.txt")
+
+
+def test_reference_data_custom_path():
+    path = write_lines("names.txt", "Alice\nBob\n")
+    names = reference_data("first_names", path)
+    assert isinstance(names, LineIndex)
+    assert list(names) == ["Alice", "Bob"]
+    shutil.rmtree(TEST_DATA_DIR)
@@ -0,0 +1,77 @@
+import csv
+import json
+import pytest
+import shutil
+
+from pathlib import Path
+from app.common.rejects import RejectSink, RejectReason, reject_format_for
+
+
+TEST_DATA_DIR = "./tmp/test-rejects"
+
+
+class Item:
+    def __init__(self, item_id: int, name: str):
+        self.id = item_id
+        self.name = name
+
+
+def test_reject_format_for():
+    assert reject_format_for('csv') == 'csv'
+    assert reject_format_for('json') == 'ndjson'
+    assert reject_format_for('xml') == 'ndjson'
+
+
+def test_reject_sink_counts_without_file(capsys):
+    sink = RejectSink(print_limit=1)
+    sink.reject(['1'], RejectReason.FIELD_COUNT, 'first')
+    sink.reject(['2'], RejectReason.FIELD_COUNT, 'second')
+    sink.reject({'id': 3}, RejectReason.MISSING_FIELD, 'third')
+    sink.close()
+
+    output = capsys.readouterr().out
+    assert 'first' in output
+    assert 'second' not in output
+    assert '3 records rejected (FIELD_COUNT: 2, MISSING_FIELD: 1).' in output
+    assert sink.counts == {RejectReason.FIELD_COUNT: 2, RejectReason.MISSING_FIELD: 1}
+
+
+def test_reject_sink_writes_csv():
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    reject_file = f"{TEST_DATA_DIR}/rejects.csv"
+
+    with RejectSink(reject_file, fmt='csv', fields=['id', 'name'], buffer_size=1) as sink:
+        sink.reject(['1', 'one, two'], RejectReason.FIELD_COUNT, 'bad row')
+        sink.reject(Item(2, 'two'), RejectReason.DUPLICATE_ID)
+
+    with open(reject_file) as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0] == ['id', 'name', 'reject_reason', 'reject_message']
+    assert rows[1] == ['1', 'one, two', RejectReason.FIELD_COUNT, 'bad row']
+    assert rows[2] == ['2', 'two', RejectReason.DUPLICATE_ID, '']
+
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_reject_sink_writes_ndjson():
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    reject_file = f"{TEST_DATA_DIR}/rejects.ndjson"
+
+    with RejectSink(reject_file, fmt='ndjson') as sink:
+        sink.reject({'id': 1}, RejectReason.MISSING_FIELD, 'name is missing!')
+        sink.reject(Item(2, 'two'), RejectReason.DATABASE_ERROR, 'duplicate key')
+
+    with open(reject_file) as f:
+        lines = [json.loads(line) for line in f]
+
+    assert lines[0] == {'id': 1, 'reject_reason': RejectReason.MISSING_FIELD, 'reject_message': 'name is missing!'}
+    assert lines[1] == {'id': 2, 'name': 'two', 'reject_reason': RejectReason.DATABASE_ERROR,
+                        'reject_message': 'duplicate key'}
+
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_reject_sink_bad_format():
+    with pytest.raises(ValueError):
+        RejectSink(fmt='xml')
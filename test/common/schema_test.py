@@ -0,0 +1,88 @@
+import uuid
+import pytest
+
+from app.users.model import User
+from app.driver.model import Driver
+from app.restaurant.model import Restaurant
+from app.common.schema import get_schema, USER_SCHEMA, ORDER_SCHEMA, MENUITEM_SCHEMA, RESTAURANT_SCHEMA, \
+    DRIVER_SCHEMA, DEFAULT_DRIVER_PICTURE, RequiredFields
+
+
+def test_get_schema():
+    assert get_schema('user') is USER_SCHEMA
+    assert get_schema('order') is ORDER_SCHEMA
+
+    with pytest.raises(KeyError):
+        get_schema('nothing')
+
+
+def test_schema_convert_fields():
+    values = ORDER_SCHEMA.convert_fields(['1', 'abc', '2', '3', 'code'])
+    assert values == [1, 'abc', 2, 3, 'code']
+
+
+def test_schema_convert_dict():
+    _dict = {'id': '1', 'customer_id': 'abc', 'restaurant_id': '2', 'delivery_id': '3', 'confirmation_code': 'c'}
+    assert ORDER_SCHEMA.convert_dict(_dict) == [1, 'abc', 2, 3, 'c']
+
+
+def test_schema_convert_columns():
+    columns = USER_SCHEMA.convert_columns({'enabled': ['true', 'False'], 'email': ['a@b.com', 'c@d.com']})
+    assert columns == {'email': ['a@b.com', 'c@d.com'], 'enabled': [True, False]}
+
+
+def test_schema_insert_sql():
+    assert ORDER_SCHEMA.insert_sql('`order`', exclude=('id',)) == \
+           'INSERT INTO `order` (customer_id, restaurant_id, delivery_id, confirmation_code) ' \
+           'VALUES (UNHEX(?), ?, ?, ?)'
+
+
+def test_schema_params_getter():
+    user = User(user_id=uuid.uuid4(), user_role=User.Role.ADMIN, password='p', email='me@me.com')
+    params = USER_SCHEMA.params_getter()(user)
+
+    assert params == (user.id.hex, User.Role.ADMIN, 'p', 'me@me.com', True, True, True, True, True)
+
+
+def test_restaurant_schema_insert():
+    restaurant = Restaurant(restaurant_id=3, address_id=1, owner_id='ab', name='Diner', rating=4.5, price_category=2,
+                            phone='555-555-5555', is_active=True, picture='https://logo.com')
+
+    assert RESTAURANT_SCHEMA.insert_sql('restaurant', exclude=('id',)) == \
+           'INSERT INTO restaurant (address_id, owner_id, name, rating, price_category, phone, is_active, picture) ' \
+           'VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+    assert RESTAURANT_SCHEMA.params_getter()(restaurant) == \
+           (3, 1, 'ab', 'Diner', 4.5, 2, '555-555-5555', True, 'https://logo.com')
+
+
+def test_driver_schema_insert():
+    driver = Driver('ab', 1, 'Jo', 'Smith', '555-555-5555', '01/01/2000', '12345', 4.0, 'waiting')
+
+    assert DRIVER_SCHEMA.insert_sql('driver') == \
+           'INSERT INTO driver (id, address_id, first_name, last_name, phone, dob, license_num, rating, picture, ' \
+           'status) VALUES (UNHEX(?), ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    assert DRIVER_SCHEMA.params_getter()(driver) == \
+           ('ab', 1, 'Jo', 'Smith', '555-555-5555', '01/01/2000', '12345', 4.0, DEFAULT_DRIVER_PICTURE, 'active')
+
+
+def test_schema_column_types():
+    types = MENUITEM_SCHEMA.column_types()
+
+    assert [types[name] for name in MENUITEM_SCHEMA.names] == [int, int, str, float, str, str, int, str, float]
+    assert USER_SCHEMA.column_types()['enabled'] is bool
+
+
+def test_required_fields_missing():
+    fields = RequiredFields(['id', 'name', 'email'])
+
+    assert fields.missing({'email': 'a', 'name': 'b', 'id': 'c', 'extra': 'd'}) is None
+    assert fields.missing({'email': 'a'}) == 'id'
+
+
+def test_schema_compact_values():
+    user_id = uuid.uuid4()
+    values = USER_SCHEMA.convert_compact([str(user_id), 'ROLE_CUSTOMER', 'pw', 'a@b.com', '1', '0', '1', '1', '1'])
+
+    assert values == (user_id.int, 'ROLE_CUSTOMER', 'pw', 'a@b.com', True, False, True, True, True)
+    assert USER_SCHEMA.expand_compact(values)[0] == user_id
+    assert ORDER_SCHEMA.expand_compact((1, 'abc', 2, 3, 'c')) == (1, 'abc', 2, 3, 'c')
@@ -0,0 +1,84 @@
+import json
+import shutil
+
+from pathlib import Path
+from app.common.stats import Stats, StageStats, STATS, timed, enable_stats
+
+
+TEST_DATA_DIR = "./tmp/test-stats"
+
+
+def test_disabled_stats_record_nothing():
+    stats = Stats()
+    with stats.timer('parse') as timer:
+        timer.rows = 10
+    stats.count('rejected')
+    assert stats.stages == {}
+    assert stats.counters == {}
+
+
+def test_timer_records_rows_and_calls():
+    stats = Stats()
+    stats.enable()
+    with stats.timer('parse') as timer:
+        timer.rows = 10
+    with stats.timer('parse', rows=5):
+        pass
+    stats.count('rejected', 2)
+
+    summary = stats.summary()
+    assert summary['stages']['parse']['calls'] == 2
+    assert summary['stages']['parse']['rows'] == 15
+    assert summary['counters'] == {'rejected': 2}
+
+
+def test_stage_percentiles():
+    stage = StageStats('save')
+    for ms in range(1, 101):
+        stage.add(ms / 1000, 1)
+    assert stage.percentile(50) == 0.051
+    assert stage.percentile(99) == 0.1
+    assert stage.to_dict()['rows_per_second'] == round(100 / stage.total, 2)
+
+
+def test_timed_decorator():
+    @timed('format', count_arg=0)
+    def _format(items):
+        return ','.join(items)
+
+    @timed('parse')
+    def _parse(value):
+        return value.split(',')
+
+    STATS.reset()
+    _parse('a,b,c')
+    assert STATS.stages == {}
+
+    STATS.enable()
+    try:
+        _format(['a', 'b'])
+        _parse('a,b,c')
+        assert STATS.stages['format'].rows == 2
+        assert STATS.stages['parse'].rows == 3
+    finally:
+        STATS.enabled = False
+        STATS.reset()
+
+
+def test_report_and_dump(capsys):
+    stats = Stats()
+    stats.enable()
+    stats.record('save', 0.5, 100)
+    stats.report()
+    assert 'save' in capsys.readouterr().err
+
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    stats.dump(f"{TEST_DATA_DIR}/stats.json")
+    with open(f"{TEST_DATA_DIR}/stats.json") as file:
+        assert json.load(file)['stages']['save']['rows_per_second'] == 200.0
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_enable_stats_not_requested():
+    enable_stats({'stats': False, 'stats_json': None})
+    assert not STATS.enabled
@@ -0,0 +1,66 @@
+import io
+
+from xml.dom import minidom
+
+from app.common.xmlformat import XmlWriter, escape_text, iter_elements
+
+
+def _minidom_xml(rows: list, names: list, pretty: bool = True) -> str:
+    doc = minidom.Document()
+    root = doc.createElement('items')
+    doc.appendChild(root)
+    for values in rows:
+        el = doc.createElement('item')
+        for name, value in zip(names, values):
+            child_el = doc.createElement(name)
+            child_el.appendChild(doc.createTextNode(str(value)))
+            el.appendChild(child_el)
+        root.appendChild(el)
+    if not pretty:
+        return doc.toxml()
+    return doc.toprettyxml(indent=' ' * 4)[0:-1]
+
+
+def _write(rows: list, names: list, chunk_size: int, pretty: bool = True) -> str:
+    file = io.StringIO()
+    writer = XmlWriter(file, 'items', 'item', names, pretty=pretty)
+    for i in range(0, len(rows), chunk_size):
+        writer.write(rows[i:i + chunk_size])
+    writer.close()
+    return file.getvalue()
+
+
+ROWS = [[1, 'plain'], [2, 'a < b & "c" > d'], [3, ''], [4, None], [5, 'two\nlines']]
+
+
+def test_xml_writer_matches_minidom():
+    for chunk_size in (1, 2, 5):
+        assert _write(ROWS, ['id', 'name'], chunk_size) == _minidom_xml(ROWS, ['id', 'name'])
+
+
+def test_xml_writer_matches_minidom_not_pretty():
+    assert _write(ROWS, ['id', 'name'], 2, pretty=False) == _minidom_xml(ROWS, ['id', 'name'], pretty=False)
+
+
+def test_xml_writer_without_rows():
+    assert _write([], ['id', 'name'], 1) == _minidom_xml([], ['id', 'name'])
+    assert _write([], ['id', 'name'], 1, pretty=False) == _minidom_xml([], ['id', 'name'], pretty=False)
+
+
+def test_escape_text():
+    assert escape_text('a < b & "c" > d') == 'a &lt; b &amp; &quot;c&quot; &gt; d'
+    assert escape_text('plain') == 'plain'
+
+
+def test_iter_elements():
+    xml_str = _write(ROWS, ['id', 'name'], 5)
+
+    entries = list(iter_elements(io.StringIO(xml_str), 'item'))
+    assert entries == [{'id': str(values[0]), 'name': str(values[1]) if values[1] != '' else None} for values in ROWS]
+
+
+def test_iter_elements_by_tag():
+    xml_str = '<items><item><id>1</id></item><other><id>2</id></other><item><id>3</id><x><id>4</id></x></item></items>'
+
+    assert list(iter_elements(io.BytesIO(xml_str.encode()), 'item')) == [{'id': '1'}, {'id': '3', 'x': None}]
+    assert len(list(iter_elements(io.BytesIO(xml_str.encode())))) == 3
@@ -0,0 +1,156 @@
+from app.db.addresses import AddressCache, AddressResolver, normalize_address
+from app.restaurant.model import Restaurant
+from test.db.common import FakeConnection, FakeCursor, FakeDatabase
+
+
+class FakeAddressCursor(FakeCursor):
+    def execute(self, sql, params=None):
+        super().execute(sql, params)
+        table = self.conn.table
+        if sql.startswith("SELECT MAX(id)"):
+            self.conn.fetch_result = (max((row[0] for row in table), default=None),)
+            for address in self.conn.concurrent:
+                self.conn.insert(address)
+        elif "WHERE id > ?" in sql:
+            self.conn.fetch_rows = [row for row in table if row[0] > params[0]]
+        else:
+            self.conn.fetch_rows = list(table)
+
+
+class FakeAddressConnection(FakeConnection):
+    """
+    An address table whose ids are assigned by the database. Committed rows get
+    the next auto increment id, addresses in concurrent are inserted by another
+    writer right after the maximum id is read.
+    """
+
+    def __init__(self, rows: list = None, next_id: int = 1):
+        super().__init__()
+        self.table = [(row[0], row[1], row[2], row[3], row[4]) for row in rows or []]
+        self.next_id = next_id
+        self.concurrent = []
+        self.fail_when = lambda param: False
+
+    def cursor(self):
+        return FakeAddressCursor(self)
+
+    def insert(self, address: tuple):
+        self.table.append((self.next_id, address[0], address[1], address[2], address[3]))
+        self.next_id += 1
+
+    def commit(self):
+        for line1, _, city, state, zipcode in self.pending:
+            self.insert((line1, city, state, zipcode))
+        super().commit()
+
+
+def _address_db(rows: list = None, next_id: int = 1) -> FakeDatabase:
+    db = FakeDatabase()
+    db.fake_conn = FakeAddressConnection(rows, next_id)
+    return db
+
+
+def test_normalize_address():
+    assert normalize_address(' 1 Main  St ', 'Reno ', 'nv', 89501) == ('1 main st', 'reno', 'NV', '89501')
+    assert normalize_address('1 MAIN ST', 'RENO', 'NV', '89501') == normalize_address('1 main st', 'Reno', 'nv', '89501')
+
+
+def test_address_resolver_deduplicates_and_reads_back_ids():
+    db = _address_db(next_id=42)
+    resolver = AddressResolver(db)
+
+    first = resolver.add('1 Main St', 'Reno', 'NV', '89501')
+    second = resolver.add('2 Main St', 'Reno', 'NV', '89501')
+    duplicate = resolver.add('1 main  st ', 'RENO', 'NV', '89501')
+    assert resolver.pending == 2
+
+    resolver.resolve()
+
+    assert resolver.id_for(first) == 42
+    assert resolver.id_for(second) == 43
+    assert resolver.id_for(duplicate) == 42
+    assert resolver.pending == 0
+    assert db.fake_conn.committed == [('1 Main St', '', 'Reno', 'NV', '89501'),
+                                      ('2 Main St', '', 'Reno', 'NV', '89501')]
+
+
+def test_address_resolver_failed_address():
+    db = _address_db()
+    db.fake_conn.fail_when = lambda param: param[0] == 'bad'
+    resolver = AddressResolver(db)
+
+    good = resolver.add('1 Main St', 'Reno', 'NV', '89501')
+    bad = resolver.add('bad', 'Reno', 'NV', '89501')
+    resolver.resolve()
+
+    assert resolver.id_for(good) == 1
+    assert resolver.id_for(bad) is None
+
+
+def test_address_cache_evicts_least_recently_used():
+    cache = AddressCache(max_size=2)
+    cache.put(('a',), 1)
+    cache.put(('b',), 2)
+    assert cache.get(('a',)) == 1
+    cache.put(('c',), 3)
+
+    assert len(cache) == 2
+    assert cache.get(('b',)) is None
+    assert cache.get(('a',)) == 1
+    assert cache.get(('c',)) == 3
+
+
+def test_address_resolver_reuses_existing_addresses():
+    db = _address_db([(7, '1 Main St', 'Reno', 'NV', '89501')], next_id=8)
+    resolver = AddressResolver(db)
+
+    existing = resolver.add('1 MAIN ST', 'Reno', 'NV', '89501')
+    new = resolver.add('2 Main St', 'Reno', 'NV', '89501')
+    resolver.resolve()
+
+    assert resolver.id_for(existing) == 7
+    assert resolver.id_for(new) == 8
+    assert db.fake_conn.committed == [('2 Main St', '', 'Reno', 'NV', '89501')]
+    assert resolver.cache.get(new) == 8
+
+
+def test_address_resolver_concurrent_writer():
+    db = _address_db([(1, '1 Main St', 'Reno', 'NV', '89501')], next_id=2)
+    db.fake_conn.concurrent = [('2 Main St', 'Reno', 'NV', '89501'), ('3 Main St', 'Reno', 'NV', '89501')]
+    resolver = AddressResolver(db)
+
+    shared = resolver.add('2 Main St', 'Reno', 'NV', '89501')
+    new = resolver.add('4 Main St', 'Reno', 'NV', '89501')
+    resolver.resolve()
+
+    assert resolver.id_for(shared) == 2
+    assert resolver.id_for(new) == 5
+    assert len(db.fake_conn.committed) == 2
+
+
+def test_address_resolver_shares_warm_cache():
+    db = _address_db()
+    cache = AddressCache()
+    first = AddressResolver(db, cache=cache)
+    key = first.add('1 Main St', 'Reno', 'NV', '89501')
+    first.resolve()
+
+    second = AddressResolver(db, cache=cache)
+    second.add('1 Main St', 'Reno', 'NV', '89501')
+    second.resolve()
+
+    assert second.id_for(key) == 1
+    assert db.fake_conn.queries.count("SELECT id, line1, city, state, zip FROM address") == 1
+    assert len(db.fake_conn.committed) == 1
+
+
+def test_address_resolver_resolve_items():
+    db = _address_db()
+    db.fake_conn.fail_when = lambda param: param[0] == 'Bad St'
+    resolver = AddressResolver(db)
+    good = Restaurant(name='good', address_key=resolver.add('1 Main St', 'Reno', 'NV', '89501'))
+    bad = Restaurant(name='bad', address_key=resolver.add('Bad St', 'Reno', 'NV', '89501'))
+
+    assert resolver.resolve_items([good, bad]) == [good]
+    assert good.address_id == 1
+    assert bad.address_id is None
@@ -0,0 +1,68 @@
+import pytest
+
+from app.db.batch import BatchWriter
+from test.db.common import FakeDatabase
+
+
+def _write(items, batch_size):
+    db = FakeDatabase()
+    rejects = []
+    writer = BatchWriter(db, 'INSERT', lambda item: (item,), batch_size=batch_size,
+                         on_reject=lambda item, ex: rejects.append(item))
+    written = writer.write(items)
+    return db, writer, written, rejects
+
+
+def test_batch_writer_writes_all_rows():
+    db, writer, written, rejects = _write(list(range(10)), batch_size=3)
+
+    assert written == 10
+    assert rejects == []
+    assert db.fake_conn.committed == [(i,) for i in range(10)]
+    assert db.fake_conn.calls == 4
+    assert db.auto_commit is False
+    assert db.conn is None
+
+
+def test_batch_writer_isolates_bad_rows():
+    items = [0, 1, -2, 3, 4, 5, -6, 7]
+    db, writer, written, rejects = _write(items, batch_size=8)
+
+    assert written == 6
+    assert rejects == [-2, -6]
+    assert sorted(db.fake_conn.committed) == [(i,) for i in [0, 1, 3, 4, 5, 7]]
+    assert writer.written == 6
+    assert writer.rejected == 2
+
+
+def test_batch_writer_keeps_open_connection():
+    db = FakeDatabase()
+    db.open_connection()
+    writer = BatchWriter(db, 'INSERT', lambda item: (item,))
+    writer.write([1, 2])
+
+    assert db.conn is db.fake_conn
+    assert db.auto_commit is True
+
+
+def test_batch_writer_bad_batch_size():
+    with pytest.raises(ValueError):
+        BatchWriter(FakeDatabase(), 'INSERT', lambda item: (item,), batch_size=0)
+
+
+def test_batch_writer_reports_progress():
+    class Progress:
+        done = 0
+        rejected = 0
+
+        def update(self, done=1, rejected=0):
+            self.done += done
+            self.rejected += rejected
+
+    progress = Progress()
+    writer = BatchWriter(FakeDatabase(), 'INSERT', lambda item: (item,), batch_size=3,
+                         on_reject=lambda item, ex: None, progress=progress)
+    writer.write([0, 1, -2, 3, 4])
+
+    assert progress.done == 5
+    assert progress.rejected == 1
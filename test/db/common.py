@@ -0,0 +1,69 @@
+import jaydebeapi
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = conn.description
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.conn.queries.append(sql)
+
+    def fetchone(self):
+        return self.conn.fetch_result
+
+    def fetchmany(self, size):
+        rows = self.conn.fetch_rows[:size]
+        self.conn.fetch_rows = self.conn.fetch_rows[size:]
+        return rows
+
+    def executemany(self, sql, params):
+        self.conn.calls += 1
+        self.conn.queries.append(sql)
+        if any(self.conn.fail_when(param) for param in params):
+            raise jaydebeapi.DatabaseError('bad row')
+        self.conn.pending += params
+
+
+class FakeConnection:
+    def __init__(self):
+        self.calls = 0
+        self.queries = []
+        self.fetch_result = (None,)
+        self.fetch_rows = []
+        self.description = None
+        self.fail_when = lambda param: param[0] < 0
+        self.pending = []
+        self.committed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed += self.pending
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.conn = None
+        self.fake_conn = FakeConnection()
+        self.auto_commit = True
+
+    def open_connection(self):
+        self.conn = self.fake_conn
+
+    def close_connection(self):
+        self.conn = None
+
+    def set_auto_commit(self, auto_commit: bool):
+        self.auto_commit = auto_commit
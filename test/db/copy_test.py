@@ -0,0 +1,78 @@
+import threading
+
+import jaydebeapi
+import pytest
+
+from app.db.copy import COPY_TABLES, copy_levels, copy_table, copy_tables
+from test.db.common import FakeDatabase
+
+
+def _source(rows):
+    db = FakeDatabase()
+    db.fake_conn.description = [('id', jaydebeapi.BINARY), ('name', jaydebeapi.STRING), ('points', None)]
+    db.fake_conn.fetch_rows = list(rows)
+    return db
+
+
+def test_copy_levels_keeps_foreign_key_order():
+    assert copy_levels(['order', 'user', 'delivery', 'driver']) == [['user'], ['driver'], ['delivery'], ['order']]
+    assert [table for level in copy_levels() for table in level] == COPY_TABLES
+
+
+def test_copy_levels_rejects_unknown_tables():
+    with pytest.raises(ValueError):
+        copy_levels(['user', 'menu_item'])
+
+
+def test_copy_table_streams_rows_in_batches():
+    rows = [(f"{i:032X}", f"name {i}", i) for i in range(7)]
+    source, dest = _source(rows), FakeDatabase()
+    dest.fake_conn.fail_when = lambda row: False
+
+    writer = copy_table(source, dest, 'customer', batch_size=3)
+
+    assert writer.written == 7
+    assert dest.fake_conn.committed == rows
+    assert dest.fake_conn.calls == 3
+    assert source.fake_conn.queries[-1] == "SELECT HEX(`id`) AS `id`, `name`, `points` FROM `customer`"
+    assert dest.fake_conn.queries[0] == "INSERT INTO `customer` (`id`, `name`, `points`) VALUES (UNHEX(?), ?, ?)"
+    assert source.conn is None
+    assert dest.conn is None
+
+
+def test_copy_table_rejects_bad_rows():
+    source, dest = _source([(1, 'a', 1), (-2, 'b', 2), (3, 'c', 3)]), FakeDatabase()
+    rejects = []
+
+    writer = copy_table(source, dest, 'address', batch_size=10, on_reject=lambda row, ex: rejects.append(row))
+
+    assert writer.written == 2
+    assert rejects == [(-2, 'b', 2)]
+
+
+def test_copy_tables_copies_levels_in_order():
+    copied = []
+    lock = threading.Lock()
+
+    def database(config):
+        if config == 'source':
+            return _source([(1, 'a', 1), (2, 'b', 2)])
+        db = FakeDatabase()
+        original_commit = db.fake_conn.commit
+
+        def commit():
+            with lock:
+                copied.append(db.fake_conn.queries[-1].split('`')[1])
+            original_commit()
+        db.fake_conn.commit = commit
+        return db
+
+    started = []
+    results = copy_tables('source', 'dest', tables=['order', 'restaurant', 'owner', 'address', 'user'],
+                          batch_size=10, workers=2, database=database,
+                          start_jvm=lambda *configs: started.append((configs, threading.current_thread())))
+
+    assert results == {'user': (2, 0), 'address': (2, 0), 'owner': (2, 0), 'restaurant': (2, 0), 'order': (2, 0)}
+    assert sorted(copied[:2]) == ['address', 'user']
+    assert copied[2:] == ['owner', 'restaurant', 'order']
+    assert started == [(('source', 'dest'), threading.main_thread())]
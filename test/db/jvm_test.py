@@ -0,0 +1,59 @@
+import jpype
+
+from app.db.jvm import ensure_jvm, jvm_args, jvm_classpath
+
+
+class JvmConfig:
+    def __init__(self, heap=None, options=None, jarfile=None):
+        self.db_jvm_heap = heap
+        self.db_jvm_options = options
+        self.db_jarfile = jarfile
+
+
+def test_jvm_args():
+    assert jvm_args(JvmConfig()) == []
+    assert jvm_args(JvmConfig(heap='512m', options='-Xss1m  -XX:+UseSerialGC')) == \
+           ['-Xmx512m', '-Xss1m', '-XX:+UseSerialGC']
+
+
+def test_jvm_classpath(monkeypatch):
+    monkeypatch.setenv('CLASSPATH', 'a.jar:b.jar')
+    assert jvm_classpath(JvmConfig(jarfile='driver.jar')) == ['driver.jar', 'a.jar', 'b.jar']
+    monkeypatch.delenv('CLASSPATH')
+    assert jvm_classpath(JvmConfig()) == []
+    assert jvm_classpath(JvmConfig(jarfile='mysql.jar'), JvmConfig(jarfile='h2.jar'), JvmConfig(jarfile='mysql.jar'),
+                         JvmConfig()) == ['mysql.jar', 'h2.jar']
+
+
+def test_ensure_jvm_with_several_configs(monkeypatch):
+    started = []
+    monkeypatch.setattr(jpype, 'isJVMStarted', lambda: len(started) > 0)
+    monkeypatch.setattr(jpype, 'getDefaultJVMPath', lambda: 'libjvm.so')
+    monkeypatch.setattr(jpype, 'startJVM', lambda *args, **kwargs: started.append((args, kwargs)))
+    monkeypatch.setattr('app.db.jvm._started_classpath', [])
+    monkeypatch.delenv('CLASSPATH', raising=False)
+
+    ensure_jvm(JvmConfig(heap='256m', jarfile='mysql.jar'), JvmConfig(heap='1g', jarfile='h2.jar'))
+
+    args, kwargs = started[0]
+    assert args == ('libjvm.so', '-Xmx256m')
+    assert kwargs['classpath'] == ['mysql.jar', 'h2.jar']
+
+
+def test_ensure_jvm_starts_once(monkeypatch):
+    started = []
+    monkeypatch.setattr(jpype, 'isJVMStarted', lambda: len(started) > 0)
+    monkeypatch.setattr(jpype, 'getDefaultJVMPath', lambda: 'libjvm.so')
+    monkeypatch.setattr(jpype, 'startJVM', lambda *args, **kwargs: started.append((args, kwargs)))
+    monkeypatch.setattr('app.db.jvm._started_classpath', [])
+    monkeypatch.delenv('CLASSPATH', raising=False)
+
+    config = JvmConfig(heap='256m', jarfile='driver.jar')
+    ensure_jvm(config)
+    ensure_jvm(JvmConfig(heap='1g'))
+
+    assert len(started) == 1
+    args, kwargs = started[0]
+    assert args == ('libjvm.so', '-Xmx256m')
+    assert kwargs['classpath'] == ['driver.jar']
+    assert kwargs['convertStrings']
@@ -1,6 +1,8 @@
 import csv
+import pickle
 
-from app.ingestBase import Ingest
+from app.ingestBase import Ingest, RowPlan
+from app.restaurant.model import Restaurant
 
 rest_args = ["street", "city", "state", "zip", "owner_id", "name", "rating", "price_category",
              "phone", "is_active", "picture"]
@@ -76,3 +78,35 @@ def test_handle_xml():
 
     for i in range(len(json_xml_row_data)):
         assert json_xml_row_data[i] == parsed[i]
+
+
+def test_ingest_table():
+    ingest = Ingest("./app/data/restaurants-ingest-test.csv", rest_args, "restaurants", Restaurant, handle_data)
+    assert ingest.table == 'restaurant'
+
+    ingest = Ingest("./app/data/restaurants-ingest-test.csv", rest_args, "restaurants", Restaurant, handle_data,
+                    table='restaurant_copy')
+    assert ingest.table == 'restaurant_copy'
+
+
+def test_row_plan_extract():
+    mapping = ['city', None, 'street', 'rating']
+    plan = RowPlan(mapping, ['street', 'city', 'rating'], {'rating': float})
+
+    assert plan.width == 4
+    assert plan.missing == []
+    assert plan.extract(['Phoenix', 'unused', 'Enim Road', '5']) == ('Enim Road', 'Phoenix', 5.0)
+
+
+def test_row_plan_missing_args():
+    plan = RowPlan(['city'], ['street', 'city'])
+
+    assert plan.missing == ['street']
+    assert plan.extract(['Phoenix']) == ('Phoenix',)
+
+
+def test_row_plan_pickle():
+    plan = pickle.loads(pickle.dumps(RowPlan(['city', None, 'rating'], ['rating', 'city'], {'rating': float})))
+
+    assert plan.width == 3
+    assert plan.extract(['Phoenix', 'unused', '5']) == (5.0, 'Phoenix')
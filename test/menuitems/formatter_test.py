@@ -0,0 +1,70 @@
+import json
+
+from app.menuitems.formatter import MenuItemFormatter
+from app.menuitems.generator import MenuItemGenerator
+
+
+def test_menu_item_formatter_create_object_from_string_fields():
+    fields = ['1', '2', 'Burger', '9.99', '', 'A burger', '1', 'Large', '']
+    item = MenuItemFormatter().create_object_from_string_fields(fields)
+
+    assert item.id == 1
+    assert item.restaurant_id == 2
+    assert item.name == 'Burger'
+    assert item.price == 9.99
+    assert item.picture is None
+    assert item.description == 'A burger'
+    assert item.is_available == 1
+    assert item.size == 'Large'
+    assert item.discount is None
+
+
+def test_menu_item_formatter_create_object_from_string_dict():
+    _dict = {'id': '', 'restaurant_id': '2', 'name': 'Burger', 'price': '9.99', 'picture': None,
+             'description': None, 'is_available': '0', 'size': None, 'discount': '0.25'}
+    item = MenuItemFormatter().create_object_from_string_dict(_dict)
+
+    assert item.id is None
+    assert item.restaurant_id == 2
+    assert item.price == 9.99
+    assert item.picture is None
+    assert item.is_available == 0
+    assert item.discount == 0.25
+
+
+def test_menu_item_formatter_json_decoder():
+    json_str = """
+    [
+        {
+            "id": 1,
+            "restaurant_id": 2,
+            "name": "Burger",
+            "price": 9.99,
+            "picture": null,
+            "description": "A burger",
+            "is_available": 1,
+            "size": null,
+            "discount": 0.1
+        }
+    ]
+    """
+    item = json.loads(json_str, cls=MenuItemFormatter.MenuItemJsonDecoder)[0]
+
+    assert item.id == 1
+    assert item.restaurant_id == 2
+    assert item.name == 'Burger'
+    assert item.picture is None
+    assert item.size is None
+    assert item.discount == 0.1
+
+
+def test_menu_item_formatter_keeps_missing_values():
+    formatter = MenuItemFormatter()
+    items = MenuItemGenerator.generate_menu(restaurant_id=1, count=20)
+    items[0].size = None
+    items[0].discount = None
+
+    expected = [vars(item) for item in items]
+    assert [vars(item) for item in formatter.from_csv(formatter.to_csv(items))] == expected
+    assert [vars(item) for item in formatter.from_json(formatter.to_json(items))] == expected
+    assert [vars(item) for item in formatter.from_xml(formatter.to_xml(items))] == expected
@@ -0,0 +1,30 @@
+from app.menuitems.generator import MenuItemGenerator, PRICES, SIZES, DISCOUNTS
+
+
+def test_menu_item_generator_generate_menu_item():
+    item = MenuItemGenerator.generate_menu_item(restaurant_id=1)
+
+    assert item.id is None
+    assert item.restaurant_id == 1
+    assert item.name is not None
+    assert item.price in PRICES
+
+
+def test_menu_item_generator_generate_menu():
+    items = MenuItemGenerator.generate_menu(restaurant_id=3, count=100)
+
+    assert len(items) == 100
+    assert all(item.restaurant_id == 3 for item in items)
+    assert all(item.id is None and item.picture is None for item in items)
+    assert all(item.description.startswith(item.name) for item in items)
+    assert all(item.is_available in (0, 1) for item in items)
+    assert all(item.size in SIZES and item.discount in DISCOUNTS for item in items)
+
+
+def test_menu_item_generator_generate_menus():
+    items = MenuItemGenerator.generate_menus([1, 2, 3], min_items=5, max_items=10)
+
+    for restaurant_id in (1, 2, 3):
+        count = len([item for item in items if item.restaurant_id == restaurant_id])
+        assert 5 <= count <= 10
+    assert [item.restaurant_id for item in items] == sorted(item.restaurant_id for item in items)
@@ -0,0 +1,33 @@
+import pytest
+
+from app.menuitems.main import main
+
+
+def test_main_produce_random_called_with_correct_arguments(monkeypatch, test_kwargs):
+    monkeypatch.setattr('app.menuitems.producer.MenuItemProducer.produce_random', test_kwargs)
+    monkeypatch.setattr('app.menuitems.main.get_restaurant_ids', lambda _, limit: [3, 4][:limit])
+
+    main(['produce', '--restaurants', '1', '--per-restaurant', '10', '20'])
+    assert test_kwargs.args == {'rest_ids': [3], 'min_items': 10, 'max_items': 20}
+
+
+def test_main_per_restaurant_range_is_invalid(capsys):
+    main(['produce', '--per-restaurant', '20', '10'])
+    output = capsys.readouterr().out
+    assert 'The items per restaurant must be a range of counts greater than 0' in output
+
+
+def test_main_no_restaurants(monkeypatch, capsys):
+    monkeypatch.setattr('app.menuitems.main.get_restaurant_ids', lambda _, limit: [])
+
+    main(['produce'])
+    output = capsys.readouterr().out
+    assert 'There are no restaurants in the database' in output
+
+
+def test_main_ingest_files_do_not_exist(capsys):
+    with pytest.raises(SystemExit):
+        main(['ingest', '--csv', 'nonexistent_file.csv'])
+
+    output = capsys.readouterr().out
+    assert 'nonexistent_file.csv does not exist.' in output
@@ -0,0 +1,30 @@
+from app.menuitems.model import MenuItem
+
+
+def test_menu_item_properties_by_name():
+    item = MenuItem(item_id=1, restaurant_id=2, name='Burger', price=9.99, picture=None, description='A burger',
+                    is_available=1, size='Large', discount=0.1)
+
+    assert item.id == 1
+    assert item.restaurant_id == 2
+    assert item.name == 'Burger'
+    assert item.price == 9.99
+    assert item.picture is None
+    assert item.description == 'A burger'
+    assert item.is_available == 1
+    assert item.size == 'Large'
+    assert item.discount == 0.1
+
+
+def test_menu_item_properties_by_position():
+    item = MenuItem(1, 2, 'Burger', 9.99, 'burger.png', None, 0, None, None)
+
+    assert item.id == 1
+    assert item.restaurant_id == 2
+    assert item.name == 'Burger'
+    assert item.price == 9.99
+    assert item.picture == 'burger.png'
+    assert item.description is None
+    assert item.is_available == 0
+    assert item.size is None
+    assert item.discount is None
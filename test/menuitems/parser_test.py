@@ -0,0 +1,33 @@
+from app.menuitems.parser import MenuItemsArgParser
+from app.menuitems.generator import MIN_ITEMS, MAX_ITEMS
+from app.common.constants import DEFAULT_OUTPUT_LIMIT, DEFAULT_BATCH_SIZE
+
+
+def test_menu_items_arg_parser_commands():
+    assert MenuItemsArgParser(['produce']).args.command == 'produce'
+    assert MenuItemsArgParser(['ingest']).args.command == 'ingest'
+    assert MenuItemsArgParser(['export', 'menuitems.csv']).args.command == 'export'
+
+
+def test_menu_items_arg_parser_produce_args():
+    args = MenuItemsArgParser(['produce']).args
+    assert args.restaurants is None
+    assert args.per_restaurant == [MIN_ITEMS, MAX_ITEMS]
+    assert args.limit == DEFAULT_OUTPUT_LIMIT
+    assert args.batch_size == DEFAULT_BATCH_SIZE
+
+    args = MenuItemsArgParser(['produce', '--restaurants', '5', '--per-restaurant', '10', '20',
+                               '--batch-size', '2000']).args
+    assert args.restaurants == 5
+    assert args.per_restaurant == [10, 20]
+    assert args.batch_size == 2000
+
+
+def test_menu_items_arg_parser_ingest_file_args():
+    args = MenuItemsArgParser(['ingest', '--csv', 'file.csv', '--json', 'file.json', '--xml', 'file.xml',
+                               '--workers', '4']).args
+
+    assert args.csv == 'file.csv'
+    assert args.json == 'file.json'
+    assert args.xml == 'file.xml'
+    assert args.workers == 4
@@ -0,0 +1,91 @@
+import shutil
+import pytest
+
+from pathlib import Path
+from app.menuitems.model import MenuItem
+from app.menuitems.producer import MenuItemProducer, INSERT_MENUITEM_SQL, INSERT_MENUITEM_WITH_ID_SQL
+from app.menuitems.formatter import MenuItemFormatter
+from app.menuitems.generator import MenuItemGenerator
+from test.db.common import FakeDatabase
+
+
+TEST_DATA_DIR = "./tmp/test-menuitems"
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    yield
+    shutil.rmtree(TEST_DATA_DIR)
+
+
+def test_menu_item_producer_save_all_in_batches():
+    db = FakeDatabase()
+    producer = MenuItemProducer(db)
+    producer.set_batch_size(50)
+    items = MenuItemGenerator.generate_menu(restaurant_id=1, count=120)
+    items[0].id = 7
+
+    assert producer.save_all(items) == 120
+    assert db.fake_conn.calls == 4
+    assert db.fake_conn.queries.count(INSERT_MENUITEM_SQL) == 3
+    assert db.fake_conn.queries.count(INSERT_MENUITEM_WITH_ID_SQL) == 1
+    assert len(db.fake_conn.committed) == 120
+
+
+def test_menu_item_producer_save_all_rejects_bad_rows():
+    db = FakeDatabase()
+    producer = MenuItemProducer(db)
+    items = MenuItemGenerator.generate_menu(restaurant_id=1, count=10) + \
+        MenuItemGenerator.generate_menu(restaurant_id=-1, count=1)
+
+    assert producer.save_all(items) == 10
+    assert len(db.fake_conn.committed) == 10
+
+
+def test_menu_item_producer_produce_from_csv_validates_ids(monkeypatch, capsys):
+    monkeypatch.setattr('builtins.input', lambda _: 'y')
+    monkeypatch.setattr('app.menuitems.producer.get_restaurant_ids', lambda _: [1, 2])
+    monkeypatch.setattr('app.menuitems.producer.get_menu_item_ids', lambda _: [5])
+    items = [MenuItem(None, 1, 'Burger', 9.99, None, None, 1, None, None),
+             MenuItem(5, 2, 'Pizza', 12.99, None, None, 1, 'Large', None),
+             MenuItem(6, 3, 'Tacos', 7.99, None, 'Three tacos', 0, None, 0.1),
+             MenuItem(7, 2, 'Salad', 6.99, None, None, 1, None, None)]
+    csv_file = f"{TEST_DATA_DIR}/menuitems.csv"
+    with open(csv_file, 'w') as f:
+        f.write(MenuItemFormatter().to_csv(items))
+
+    db = FakeDatabase()
+    producer = MenuItemProducer(db)
+    producer.produce_from_csv(csv_file)
+
+    assert '2 menuitems created successfully' in capsys.readouterr().out
+    assert [row[0] for row in db.fake_conn.committed] == [1, 7]
+
+
+def test_menu_item_producer_produce_from_xml(monkeypatch, capsys):
+    monkeypatch.setattr('builtins.input', lambda _: 'y')
+    monkeypatch.setattr('app.menuitems.producer.get_restaurant_ids', lambda _: [1])
+    items = MenuItemGenerator.generate_menu(restaurant_id=1, count=3) + \
+        MenuItemGenerator.generate_menu(restaurant_id=2, count=1)
+    xml_file = f"{TEST_DATA_DIR}/menuitems.xml"
+    with open(xml_file, 'w') as f:
+        f.write(MenuItemFormatter().to_xml(items))
+
+    db = FakeDatabase()
+    MenuItemProducer(db).produce_from_xml(xml_file)
+
+    assert '3 menuitems created successfully' in capsys.readouterr().out
+    assert len(db.fake_conn.committed) == 3
+
+
+def test_menu_item_producer_produce_from_xml_missing_field(capsys):
+    xml_file = f"{TEST_DATA_DIR}/menuitems.xml"
+    with open(xml_file, 'w') as f:
+        f.write('<menuitems><menuitem><id>1</id><restaurant_id>2</restaurant_id></menuitem></menuitems>')
+
+    with pytest.raises(SystemExit) as ex:
+        MenuItemProducer(FakeDatabase()).produce_from_xml(xml_file)
+
+    assert ex.value.code == 1
+    assert "Menu item missing 'name'. All fields are required." in capsys.readouterr().out
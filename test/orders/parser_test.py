@@ -62,3 +62,10 @@ def test_orders_arg_parser_ingest_output_args():
     assert args.pretty is True
     assert args.short is True
     assert args.limit == 5
+
+
+def test_orders_arg_parser_export_args():
+    args = OrdersArgParser(['export', 'orders.xml', '--parts', '2']).args
+    assert args.command == 'export'
+    assert args.file == 'orders.xml'
+    assert args.parts == 2
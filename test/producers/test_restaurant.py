@@ -43,8 +43,10 @@ def test_create_random_address():
             assert False
 
     start_quantity = len(get_addr_ids())
-    producer.create_random_address()
+    address_key = producer.create_random_address()
+    producer.address_resolver.resolve()
     end_quantity = len(get_addr_ids())
+    assert producer.address_resolver.id_for(address_key) is not None
     assert end_quantity > start_quantity
 
 
@@ -67,9 +69,12 @@ def test_create_restaurants():
 
     create_quantity = 10
     start_quantity = len(get_restaurant_ids())
+    restaurants = []
     for _ in range(create_quantity):
         restaurant = Restaurant()
         restaurant.create_random(producer)
+        restaurants.append(restaurant)
+    for restaurant in producer.resolve_addresses(restaurants):
         restaurant.save(database)
 
     end_quantity = len(get_restaurant_ids())
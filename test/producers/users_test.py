@@ -1,4 +1,6 @@
 import os
+import bz2
+import gzip
 import re
 import uuid
 import json
@@ -643,6 +645,23 @@ def test_user_producer_convert():
     shutil.rmtree(TEST_DATA_DIR)
 
 
+def test_user_producer_convert_compressed():
+    producer = UsersProducer(Database(Config()))
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    _create_json_file(f"{TEST_DATA_DIR}/users-test.json", custs=2)
+    with open(f"{TEST_DATA_DIR}/users-test.json") as f, gzip.open(f"{TEST_DATA_DIR}/users-test.json.gz", 'wt') as gz:
+        gz.write(f.read())
+
+    producer.convert_files(f"{TEST_DATA_DIR}/users-test.json.gz", f"{TEST_DATA_DIR}/users-test.csv.bz2")
+    producer.convert_files(f"{TEST_DATA_DIR}/users-test.json", f"{TEST_DATA_DIR}/users-test.csv")
+
+    with bz2.open(f"{TEST_DATA_DIR}/users-test.csv.bz2", 'rt') as compressed, \
+            open(f"{TEST_DATA_DIR}/users-test.csv") as plain:
+        assert compressed.read() == plain.read()
+
+    shutil.rmtree(TEST_DATA_DIR)
+
+
 def test_main_csv_file_doesnt_exist(capsys):
     main(['--csv', 'nonexistent_file.csv'])
     output = capsys.readouterr().out
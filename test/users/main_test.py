@@ -3,6 +3,9 @@ import shutil
 
 from pathlib import Path
 from app.users.main import main
+from app.users.model import User
+from app.users.formatter import UserFormatter
+from app.users.generator import UserGenerator
 from test.users.common import TEST_DATA_DIR
 
 
@@ -37,6 +40,27 @@ def test_main_convert_called_with_correct_arguments(monkeypatch, test_kwargs):
     shutil.rmtree(TEST_DATA_DIR)
 
 
+def test_main_convert_json_backend():
+    pytest.importorskip('orjson')
+    Path(TEST_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    users = [UserGenerator.generate_user(User.Role.CUSTOMER) for _ in range(3)]
+    csv_file = f"{TEST_DATA_DIR}/users-test.csv"
+    with open(csv_file, 'w') as f:
+        f.write(UserFormatter().to_csv(users))
+
+    main(['ingest', '--convert', csv_file, f"{TEST_DATA_DIR}/users.json"])
+    main(['ingest', '--convert', csv_file, f"{TEST_DATA_DIR}/users-orjson.json", '--json-backend', 'orjson'])
+
+    with open(f"{TEST_DATA_DIR}/users.json") as f:
+        assert f.read() == UserFormatter().to_json(users)
+    with open(f"{TEST_DATA_DIR}/users-orjson.json") as f:
+        text = f.read()
+    assert text.startswith('[\n  {\n    "id"')
+    assert UserFormatter().to_csv(UserFormatter().from_json(text)) == UserFormatter().to_csv(users)
+
+    shutil.rmtree(TEST_DATA_DIR)
+
+
 def test_main_ingest_files_do_not_exist(capsys):
     with pytest.raises(SystemExit):
         main(['ingest', '--csv', 'nonexistent_file.csv'])
@@ -67,3 +67,14 @@ def test_users_arg_parser_ingest_output_args():
     assert args.pretty is True
     assert args.short is True
     assert args.limit == 5
+
+
+def test_users_arg_parser_export_args():
+    args = UsersArgParser(['export', 'users.csv']).args
+    assert args.command == 'export'
+    assert args.file == 'users.csv'
+    assert args.parts == 1
+
+    args = UsersArgParser(['export', 'users.json', '--parts', '4', '--fetch-size', '1000']).args
+    assert args.parts == 4
+    assert args.fetch_size == 1000